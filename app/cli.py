@@ -1,9 +1,24 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
 import typer
 from rich.console import Console
 
 from app.enums import Domain, SourceType
+from app.services import IngestStats
 from config import settings
 from container.container import Container
+from infra.git.client import GitRepo
+from infra.ingestor.file import find_files, glob_filter
+from infra.ingestor.git import GitIngestor
+from infra.ingestor.slack import SlackIngestor
+from infra.notion.client import NotionClient
+from infra.slack.client import SlackClient
 from infra.vector_store.milvus.base import init_milvus
 
 app = typer.Typer(
@@ -15,16 +30,26 @@ ingest_app = typer.Typer(
     pretty_exceptions_enable=False,
 )
 
+index_app = typer.Typer(
+    pretty_exceptions_enable=False,
+)
+
 app.add_typer(ingest_app, name="ingest")
+app.add_typer(index_app, name="index")
 
 
 @app.callback()
 def _init(ctx: typer.Context):
-    init_milvus(
-        host=settings.MILVUS_HOST,
-        port=settings.MILVUS_PORT,
-        dim=settings.EMBEDDING_DIM,
-    )
+    if settings.VECTOR_STORE == "milvus":
+        init_milvus(
+            host=settings.MILVUS_HOST,
+            port=settings.MILVUS_PORT,
+            dim=settings.EMBEDDING_DIM,
+            layout=settings.MILVUS_LAYOUT,
+            user=settings.MILVUS_USER,
+            password=settings.MILVUS_PASSWORD,
+            db_name=settings.MILVUS_DB_NAME,
+        )
 
     ctx.obj = {"container": Container(), "console": Console()}
 
@@ -33,16 +58,118 @@ def _init(ctx: typer.Context):
 def ask_cmd(
     context: typer.Context,
     query: str = typer.Argument(...),
+    stream: bool = typer.Option(True, "--stream/--no-stream"),
+    use_async: bool = typer.Option(
+        False, "--async", help="async DB/벡터 스토어 경로(ask_async)로 실행 (스트리밍 없음)"
+    ),
 ):
     container = context.obj["container"]
     console = context.obj["console"]
 
     ask_service = container.ask_service()
 
+    if use_async:
+        answer = asyncio.run(ask_service.ask_async(query))
+        ask_service.print_answer(console=console, answer=answer)
+        return
+
+    if stream:
+        ask_service.print_answer_stream(console=console, events=ask_service.ask_stream(query))
+        return
+
     answer = ask_service.ask(query)
     ask_service.print_answer(console=console, answer=answer)
 
 
+@app.command("ask-batch")
+def ask_batch_cmd(
+    context: typer.Context,
+    input: str = typer.Option("-", "--input", "-i", help='JSONL 파일 경로 ("-" 이면 stdin). 각 줄: {"question": ...}'),
+    output: str = typer.Option("-", "--output", "-o", help='결과 JSONL 경로 ("-" 이면 stdout)'),
+    batch_size: int = typer.Option(64, min=1),
+    concurrency: int = typer.Option(8, min=1),
+):
+    container = context.obj["container"]
+    console = Console(stderr=True)
+
+    ask_service = container.ask_service()
+
+    started = time.perf_counter()
+    total = failed = input_tokens = output_tokens = 0
+
+    with ExitStack() as stack:
+        in_fp = sys.stdin if input == "-" else stack.enter_context(Path(input).open(encoding="utf-8"))
+        out_fp = sys.stdout if output == "-" else stack.enter_context(Path(output).open("w", encoding="utf-8"))
+
+        def _write(row: dict) -> None:
+            nonlocal total, failed
+            if row.get("error"):
+                failed += 1
+            total += 1
+            out_fp.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out_fp.flush()
+
+        # ask_batch 의 결과 index -> (입력 줄 번호, 레코드)
+        records: list[tuple[int, dict]] = []
+
+        def _questions():
+            rows = (line.strip() for line in in_fp)
+            for row_no, line in enumerate(filter(None, rows)):
+                # 잘못된 줄은 전체를 중단하지 않고 해당 줄만 error 로 기록
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    _write({"id": row_no, "question": None, "error": f"invalid JSON: {e}"})
+                    continue
+                if isinstance(record, str):
+                    record = {"question": record}
+                if not isinstance(record, dict):
+                    record = {}
+                question = record.get("question")
+                if not isinstance(question, str) or not question.strip():
+                    _write({"id": record.get("id", row_no), "question": None, "error": 'missing "question"'})
+                    continue
+
+                records.append((row_no, record))
+                yield question
+
+        for result in ask_service.ask_batch(_questions(), batch_size=batch_size, concurrency=concurrency):
+            row_no, record = records[result.index]
+            row = {
+                "id": record.get("id", row_no),
+                "question": result.question,
+                "answer": result.answer,
+                "chunk_ids": [hit.chunk_id for hit in result.hits[: ask_service.topk]],
+                "query_log_id": result.query_log_id,
+                "input_tokens": result.input_tokens,
+                "output_tokens": result.output_tokens,
+            }
+            if result.error:
+                row["error"] = result.error
+            _write(row)
+
+            input_tokens += result.input_tokens
+            output_tokens += result.output_tokens
+
+    elapsed = time.perf_counter() - started
+    console.print(
+        f"[green]OK[/green] questions={total} failed={failed} elapsed={elapsed:.1f}s "
+        f"throughput={total / elapsed if elapsed else 0:.2f} q/s "
+        f"input_tokens={input_tokens} output_tokens={output_tokens}"
+    )
+
+
+def _print_ingest_result(console: Console, result: dict) -> None:
+    if not result["changed"]:
+        console.print(f"[green]SKIP[/green] document_id={result['document_id']} unchanged")
+        return
+
+    console.print(
+        f"[green]OK[/green] document_id={result['document_id']} chunks={result['chunks']} "
+        f"kept={result['kept']} deleted={result['deleted']}"
+    )
+
+
 @ingest_app.command("text")
 def ingest_raw_text(
     context: typer.Context,
@@ -63,7 +190,7 @@ def ingest_raw_text(
         content=content,
     )
     result = pipeline.ingest(ingestor=ingestor)
-    console.print(f"[green]OK[/green] document_id={result['document_id']} chunks={result['chunks']}")
+    _print_ingest_result(console, result)
 
 
 @ingest_app.command("notion")
@@ -82,7 +209,118 @@ def ingest_notion(
         source_id=source_id,
     )
     result = pipeline.ingest(ingestor=ingestor)
-    console.print(f"[green]OK[/green] document_id={result['document_id']} chunks={result['chunks']}")
+    _print_ingest_result(console, result)
+
+
+@ingest_app.command("notion-sync")
+def ingest_notion_sync(
+    context: typer.Context,
+    domain: Domain = typer.Option(Domain.CS),
+    database_id: str | None = typer.Option(None, help="이 데이터베이스의 페이지를 동기화"),
+    root_page_id: str | None = typer.Option(None, help="이 페이지 바로 아래의 하위 페이지를 동기화"),
+    workers: int = typer.Option(4, min=1, help="동시에 적재할 페이지 수"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="변경된 페이지 목록만 출력"),
+):
+    if (database_id is None) == (root_page_id is None):
+        raise typer.BadParameter("Specify exactly one of --database-id / --root-page-id")
+    if not settings.NOTION_API_TOKEN:
+        raise typer.BadParameter("NOTION_API_TOKEN is not set in settings.")
+
+    container = context.obj["container"]
+    console = context.obj["console"]
+
+    pipeline = container.ingest_service()
+    factory = container.ingestor_factory()
+    client = NotionClient(token=settings.NOTION_API_TOKEN, rate_limit=settings.NOTION_RATE_LIMIT)
+
+    # 목록(last_edited_time)만 먼저 받고, 저장된 source_version 과 같은 페이지는 블록을 가져오지 않는다
+    refs = list(client.iter_database_pages(database_id) if database_id else client.iter_child_pages(root_page_id))
+    changed = set(pipeline.changed_sources(SourceType.NOTION, {ref.id: ref.last_edited_time for ref in refs}))
+    console.print(f"pages={len(refs)} changed={len(changed)} unchanged={len(refs) - len(changed)}")
+
+    if dry_run:
+        for ref in refs:
+            if ref.id in changed:
+                console.print(f"  {ref.id} {ref.last_edited_time} {ref.title or ''}")
+        return
+
+    ingestors = (
+        factory.create(
+            domain=domain,
+            source_type=SourceType.NOTION,
+            source_id=ref.id,
+            title=ref.title,
+            client=client,
+            last_edited_time=ref.last_edited_time,
+        )
+        for ref in refs
+        if ref.id in changed
+    )
+
+    stats = IngestStats()
+    for result in pipeline.ingest_pipeline(ingestors, workers=workers, executor="thread", stats=stats):
+        if result["error"]:
+            console.print(f"[red]FAIL[/red] {result['source_id']}: {result['error']}")
+
+    console.print(
+        f"{'[green]OK[/green]' if not stats.failed else '[yellow]DONE[/yellow]'} "
+        f"ingested={stats.documents - stats.failed} failed={stats.failed} chunks={stats.chunks} "
+        f"embedded={stats.embedded_chunks} elapsed={stats.elapsed:.1f}s"
+    )
+
+
+@ingest_app.command("slack")
+def ingest_slack(
+    context: typer.Context,
+    channel: list[str] = typer.Option(..., "--channel", help="채널 ID (여러 번 지정 가능)"),
+    domain: Domain = typer.Option(Domain.CS),
+    workers: int = typer.Option(4, min=1, help="동시에 적재할 스레드(답글 조회) 수"),
+    lookback_days: float = typer.Option(settings.SLACK_LOOKBACK_DAYS, min=0.0, help="답글을 다시 확인할 기간"),
+    full: bool = typer.Option(False, "--full", help="저장된 watermark 를 무시하고 전체 history 를 다시 훑음"),
+):
+    if not settings.SLACK_BOT_TOKEN:
+        raise typer.BadParameter("SLACK_BOT_TOKEN is not set in settings.")
+
+    container = context.obj["container"]
+    console = context.obj["console"]
+
+    pipeline = container.ingest_service()
+    factory = container.ingestor_factory()
+    sync_state = container.sync_state_repo()
+    client = SlackClient(token=settings.SLACK_BOT_TOKEN)
+
+    for channel_id in channel:
+        since = None if full else sync_state.get(SourceType.SLACK, channel_id)
+        newest = since
+
+        def _ingestors(channel_id: str = channel_id, since: str | None = since):
+            # history 를 페이지 단위로 읽으면서 스레드별 ingestor 를 만든다 (채널 전체를 메모리에 올리지 않음)
+            nonlocal newest
+            for message in client.iter_updated_threads(channel_id, since=since, lookback=lookback_days * 86400):
+                watermark = client.thread_watermark(message)
+                newest = watermark if newest is None else max(newest, watermark, key=float)
+                yield factory.create(
+                    domain=domain,
+                    source_type=SourceType.SLACK,
+                    source_id=SlackIngestor.thread_source_id(channel_id, message["ts"]),
+                    client=client,
+                    message=message,
+                )
+
+        stats = IngestStats()
+        for result in pipeline.ingest_pipeline(_ingestors(), workers=workers, executor="thread", stats=stats):
+            if result["error"]:
+                console.print(f"[red]FAIL[/red] {result['source_id']}: {result['error']}")
+
+        # 실패한 스레드가 있으면 watermark 를 올리지 않고 다음 실행에서 다시 시도
+        if not stats.failed and newest and newest != since:
+            sync_state.set(SourceType.SLACK, channel_id, newest)
+
+        console.print(
+            f"{'[green]OK[/green]' if not stats.failed else '[yellow]DONE[/yellow]'} channel={channel_id} "
+            f"threads={stats.documents} skipped={stats.skipped} failed={stats.failed} chunks={stats.chunks} "
+            f"watermark={sync_state.get(SourceType.SLACK, channel_id)} elapsed={stats.elapsed:.1f}s"
+        )
 
 
 @ingest_app.command("file")
@@ -101,4 +339,204 @@ def ingest_file(
         source_id=source_id,
     )
     result = pipeline.ingest(ingestor=ingestor)
-    console.print(f"[green]OK[/green] document_id={result['document_id']} chunks={result['chunks']}")
+    _print_ingest_result(console, result)
+
+
+@ingest_app.command("dir")
+def ingest_dir(
+    context: typer.Context,
+    root: str = typer.Argument(..., help="적재할 디렉토리"),
+    domain: Domain = typer.Option(Domain.CS),
+    include: list[str] = typer.Option(["**/*.md", "**/*.txt"], "--include", help="root 기준 glob (여러 번 지정 가능)"),
+    exclude: list[str] = typer.Option([], "--exclude", help="제외할 glob (예: **/node_modules/**)"),
+    workers: int = typer.Option(4, min=0, help="읽기/청킹 프로세스 수 (0 이면 현재 프로세스)"),
+    queue_size: int = typer.Option(64, min=1, help="단계 사이 큐 크기 (문서 수)"),
+    embed_batch_rows: int = typer.Option(1024, min=1, help="한 번에 임베딩할 청크 수"),
+    report_every: float = typer.Option(5.0, min=0.0, help="진행 상황 출력 간격(초), 0 이면 끝날 때만"),
+):
+    container = context.obj["container"]
+    console = context.obj["console"]
+
+    if not Path(root).is_dir():
+        raise typer.BadParameter(f"Not a directory: {root}")
+
+    pipeline = container.ingest_service()
+    factory = container.ingestor_factory()
+    ingestors = (
+        factory.create(domain=domain, source_type=SourceType.FILE, source_id=str(path))
+        for path in find_files(root, include, exclude)
+    )
+
+    stats = IngestStats()
+
+    def _report(prefix: str) -> None:
+        files_per_sec, chunks_per_sec, tokens_per_sec = stats.rates()
+        console.print(
+            f"{prefix} files={stats.documents} skipped={stats.skipped} failed={stats.failed} "
+            f"chunks={stats.chunks} embedded={stats.embedded_chunks} elapsed={stats.elapsed:.1f}s "
+            f"files/s={files_per_sec:.1f} chunks/s={chunks_per_sec:.1f} tokens/s={tokens_per_sec:.0f}"
+        )
+
+    last_report = time.perf_counter()
+    for result in pipeline.ingest_pipeline(
+        ingestors,
+        workers=workers,
+        queue_size=queue_size,
+        embed_batch_rows=embed_batch_rows,
+        stats=stats,
+    ):
+        if result["error"]:
+            console.print(f"[red]FAIL[/red] {result['source_id']}: {result['error']}")
+
+        if report_every and time.perf_counter() - last_report >= report_every:
+            _report("[cyan]..[/cyan]")
+            last_report = time.perf_counter()
+
+    _report("[green]OK[/green]" if not stats.failed else "[yellow]DONE[/yellow]")
+
+
+@ingest_app.command("git")
+def ingest_git(
+    context: typer.Context,
+    repo_path: str = typer.Argument(..., help="로컬 git clone 경로"),
+    domain: Domain = typer.Option(Domain.DEV),
+    name: str | None = typer.Option(None, help="source_id 접두어 (기본: 디렉토리 이름)"),
+    rev: str = typer.Option("HEAD", help="적재할 커밋/브랜치"),
+    include: list[str] = typer.Option(["**/*.md", "**/*.py"], "--include", help="저장소 기준 glob (여러 번 지정 가능)"),
+    exclude: list[str] = typer.Option([], "--exclude", help="제외할 glob"),
+    workers: int = typer.Option(4, min=1, help="동시에 적재할 파일 수"),
+    full: bool = typer.Option(False, "--full", help="저장된 커밋을 무시하고 전체 파일과 비교 (include 를 바꿨을 때)"),
+):
+    container = context.obj["container"]
+    console = context.obj["console"]
+
+    repo = GitRepo(repo_path)
+    try:
+        commit = repo.resolve(rev)
+    except subprocess.CalledProcessError as e:
+        raise typer.BadParameter(f"Not a git repository or unknown revision: {repo_path} {rev}") from e
+    name = name or Path(repo_path).resolve().name
+
+    pipeline = container.ingest_service()
+    factory = container.ingestor_factory()
+    sync_state = container.sync_state_repo()
+
+    last = None if full else sync_state.get(SourceType.GITHUB, name)
+    if last == commit:
+        console.print(f"[green]OK[/green] {name} is up to date at {commit[:12]}")
+        return
+    if last and not repo.has_commit(last):
+        console.print(f"[yellow]last ingested commit {last[:12]} not found, falling back to a full sync[/yellow]")
+        last = None
+
+    # 마지막 커밋 대비 diff 만 적재 (없으면 빈 트리 대비 = 전체 파일)
+    match = glob_filter(include, exclude)
+    changes = [c for c in repo.changes(last, commit) if match(c.path)]
+    upserts = [c.path for c in changes if c.status != "D" and not c.binary]
+    if last:
+        removed = [GitIngestor.file_source_id(name, c.path) for c in changes if c.status == "D"]
+    else:
+        # 전체 비교: 저장돼 있지만 이 커밋에 (더 이상) 해당하지 않는 파일은 삭제
+        present = {GitIngestor.file_source_id(name, path) for path in upserts}
+        removed = [
+            source_id
+            for source_id in pipeline.list_source_ids(SourceType.GITHUB, prefix=f"{name}:")
+            if source_id not in present
+        ]
+    console.print(f"{name} {(last or 'empty')[:12]}..{commit[:12]} changed={len(upserts)} removed={len(removed)}")
+
+    ingestors = (
+        factory.create(
+            domain=domain,
+            source_type=SourceType.GITHUB,
+            source_id=GitIngestor.file_source_id(name, path),
+            repo=repo,
+            commit=commit,
+        )
+        for path in upserts
+    )
+
+    stats = IngestStats()
+    try:
+        for result in pipeline.ingest_pipeline(ingestors, workers=workers, executor="thread", stats=stats):
+            if result["error"]:
+                console.print(f"[red]FAIL[/red] {result['source_id']}: {result['error']}")
+    finally:
+        repo.close()
+
+    deleted = sum(pipeline.delete_source(SourceType.GITHUB, source_id) for source_id in removed)
+
+    # 실패한 파일이 있으면 커밋을 기록하지 않고 다음 실행에서 같은 diff 를 다시 적재
+    if not stats.failed:
+        sync_state.set(SourceType.GITHUB, name, commit)
+
+    console.print(
+        f"{'[green]OK[/green]' if not stats.failed else '[yellow]DONE[/yellow]'} "
+        f"files={stats.documents} skipped={stats.skipped} failed={stats.failed} deleted={deleted} "
+        f"chunks={stats.chunks} embedded={stats.embedded_chunks} elapsed={stats.elapsed:.1f}s"
+    )
+
+
+def _milvus_collections(domain: Domain | None) -> dict[str, str]:
+    """label -> collection(alias) 이름"""
+    from infra.vector_store.milvus.base import PARTITIONED_COLLECTION
+    from infra.vector_store.milvus.impl import MilvusRepositoryImpl
+
+    if settings.VECTOR_STORE != "milvus":
+        raise typer.BadParameter(f"index commands require VECTOR_STORE=milvus (current: {settings.VECTOR_STORE})")
+
+    if settings.MILVUS_LAYOUT == "partitioned":
+        # 모든 도메인이 하나의 컬렉션을 공유
+        return {"ALL": PARTITIONED_COLLECTION}
+
+    collection_map = MilvusRepositoryImpl.collection_map
+    domains = [domain] if domain else list(collection_map)
+    return {d.value: collection_map[d] for d in domains}
+
+
+@index_app.command("status")
+def index_status(
+    context: typer.Context,
+    domain: Domain | None = typer.Option(None),
+):
+    from pymilvus import Collection
+
+    from infra.vector_store.milvus.base import describe_index_plan, resolve_alias
+    from infra.vector_store.milvus.index import advise_index
+
+    console = context.obj["console"]
+
+    for label, name in _milvus_collections(domain).items():
+        col = Collection(name=name)
+        current = describe_index_plan(col)
+        advised = advise_index(col.num_entities)
+        ok = advised.matches(current.index_type, current.build_params)
+        console.print(
+            f"{'[green]OK[/green]' if ok else '[yellow]REBUILD[/yellow]'} domain={label} "
+            f"collection={resolve_alias(name) or name} rows={col.num_entities} "
+            f"index={current.index_type}{current.build_params} advised={advised.index_type}{advised.build_params}"
+        )
+
+
+@index_app.command("rebuild")
+def index_rebuild(
+    context: typer.Context,
+    domain: Domain | None = typer.Option(None),
+    force: bool = typer.Option(False, help="추천 인덱스와 같아도 재구성"),
+    batch_size: int = typer.Option(1000, min=1),
+):
+    from infra.vector_store.milvus.base import rebuild_collection
+
+    console = context.obj["console"]
+
+    for label, name in _milvus_collections(domain).items():
+        started = time.perf_counter()
+        result = rebuild_collection(name, settings.EMBEDDING_DIM, force=force, batch_size=batch_size)
+        if result.skipped:
+            console.print(f"[green]SKIP[/green] domain={label} index={result.plan.index_type} already matches")
+            continue
+
+        console.print(
+            f"[green]OK[/green] domain={label} {result.previous} -> {result.current} rows={result.row_count} "
+            f"index={result.plan.index_type}{result.plan.build_params} elapsed={time.perf_counter() - started:.1f}s"
+        )
@@ -0,0 +1,150 @@
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from app.models.base import VectorSearchChunk
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ContextBlock", "ContextPacker", "PackedContext", "count_tokens"]
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str | None):
+    """
+    tiktoken 인코딩 로드. 모델명에 provider prefix(`openai:`, `openai-responses:`)가 붙어 있을 수 있어 제거.
+    tiktoken 이 없거나 인코딩 파일을 받을 수 없으면 None (-> 문자 수 기반 추정)
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    # 인코딩 파일 다운로드 실패(requests 예외는 OSError 하위)나 파일 해시 불일치(ValueError)는 추정으로 대체
+    name = (model or "").split(":")[-1]
+    try:
+        return tiktoken.encoding_for_model(name)
+    except KeyError:
+        pass
+    except (OSError, ValueError):
+        logger.warning("failed to load tiktoken encoding for %r; falling back to estimation", name, exc_info=True)
+        return None
+
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except (OSError, ValueError):
+        logger.warning("failed to load tiktoken o200k_base encoding; falling back to estimation", exc_info=True)
+        return None
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        # 대략적인 추정: 영문 기준 4자/토큰
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass(slots=True)
+class ContextBlock:
+    chunk_ids: list[int]
+    document_id: int | None
+    context_id: int
+    score: float
+    text: str
+
+
+@dataclass(slots=True)
+class PackedContext:
+    text: str
+    token_count: int
+    blocks: list[ContextBlock] = field(default_factory=list)
+
+    @property
+    def chunk_ids(self) -> list[int]:
+        return [chunk_id for block in self.blocks for chunk_id in block.chunk_ids]
+
+
+class ContextPacker:
+    """
+    검색/확장된 청크를 토큰 예산 안에서 프롬프트 컨텍스트로 구성.
+    1. chunk_hash 기준 중복 제거 (점수가 높은 쪽 유지)
+    2. 같은 (document_id, context_id) 내 연속된 chunk_index 는 하나의 블록으로 병합
+    3. 점수 내림차순으로 예산에 들어가는 블록을 채움 (넘치는 블록은 건너뛰고 다음 블록 시도)
+    """
+
+    def __init__(self, max_tokens: int, model: str | None = None):
+        self.max_tokens = max_tokens
+        self.model = model
+
+    @staticmethod
+    def _dedupe(contexts: list[VectorSearchChunk]) -> list[VectorSearchChunk]:
+        best: dict[str, VectorSearchChunk] = {}
+        for context in contexts:
+            key = context.chunk.chunk_hash or f"id:{context.chunk_id}"
+            current = best.get(key)
+            if current is None or context.score > current.score:
+                best[key] = context
+        return list(best.values())
+
+    @staticmethod
+    def _merge_runs(contexts: list[VectorSearchChunk]) -> list[ContextBlock]:
+        ordered = sorted(
+            contexts,
+            key=lambda c: (c.chunk.document_id or 0, c.chunk.context_id, c.chunk.chunk_index),
+        )
+
+        blocks: list[ContextBlock] = []
+        prev: VectorSearchChunk | None = None
+        for context in ordered:
+            chunk = context.chunk
+            text = chunk.chunk_text.strip()
+            adjacent = (
+                prev is not None
+                and prev.chunk.document_id == chunk.document_id
+                and prev.chunk.context_id == chunk.context_id
+                and prev.chunk.chunk_index + 1 == chunk.chunk_index
+            )
+            if adjacent:
+                block = blocks[-1]
+                block.chunk_ids.append(context.chunk_id)
+                block.score = max(block.score, context.score)
+                block.text = f"{block.text}\n{text}"
+            else:
+                blocks.append(
+                    ContextBlock(
+                        chunk_ids=[context.chunk_id],
+                        document_id=chunk.document_id,
+                        context_id=chunk.context_id,
+                        score=context.score,
+                        text=text,
+                    )
+                )
+            prev = context
+        return blocks
+
+    @staticmethod
+    def _format_block(idx: int, block: ContextBlock) -> str:
+        chunk_ids = ",".join(str(chunk_id) for chunk_id in block.chunk_ids)
+        header = f"[{idx}] chunk_id={chunk_ids} score={block.score:.4f} context_id={block.context_id!r}"
+        return f"{header}\n{block.text}\n"
+
+    def pack(self, contexts: list[VectorSearchChunk]) -> PackedContext:
+        blocks = self._merge_runs(self._dedupe(contexts))
+        blocks.sort(key=lambda b: b.score, reverse=True)
+
+        parts: list[str] = []
+        used: list[ContextBlock] = []
+        total = 0
+        separator_tokens = count_tokens("\n", self.model)
+        for block in blocks:
+            formatted = self._format_block(len(used) + 1, block)
+            tokens = count_tokens(formatted, self.model) + (separator_tokens if parts else 0)
+            if total + tokens > self.max_tokens:
+                continue
+            parts.append(formatted)
+            used.append(block)
+            total += tokens
+
+        logger.debug("packed %d/%d context blocks into %d tokens", len(used), len(blocks), total)
+        return PackedContext(text="\n".join(parts), token_count=total, blocks=used)
@@ -4,6 +4,13 @@ from dataclasses import dataclass, field
 from app.enums import Domain, SourceType
 
 
+@dataclass(frozen=True, slots=True)
+class StreamedContent:
+    """스트리밍으로 계산한 문서 내용의 해시 (raw_content 를 메모리에 두지 않는 큰 문서용, 본문은 저장하지 않음)"""
+
+    content_hash: str
+
+
 @dataclass(slots=True)
 class Document:
     domain: Domain
@@ -16,6 +23,25 @@ class Document:
     content_hash: str | None = None
     version: int = 1
     id: int | None = None
+    # 출처 쪽 버전 (Notion last_edited_time 등). 같으면 내용을 가져오지 않고 건너뛸 수 있음
+    source_version: str | None = None
+    # 있으면 raw_content 는 비어 있고, 저장소는 이 해시만 저장한다 (본문은 출처 파일에만 있음)
+    streamed: StreamedContent | None = None
+
+
+@dataclass(slots=True)
+class DocumentHeader:
+    """본문 없이 메타데이터만 (해시 비교, id 조회 등 본문이 필요 없는 조회용)"""
+
+    id: int
+    domain: Domain
+    source_type: SourceType
+    source_id: str
+
+    title: str | None
+    content_hash: str
+    version: int
+    source_version: str | None = None
 
 
 @dataclass(slots=True)
@@ -47,6 +73,8 @@ class QueryLog:
     selected_chunk_ids: list[int] | None = None
     expended_chunk_ids: list[int] | None = None
     answer: str | None = None
+    meta: dict | None = None
+    query_embedding: list[float] | None = None
 
 
 @dataclass
@@ -55,6 +83,8 @@ class QueryLogMeta:
     hit_chunk_ids: dict[Domain, list[int]] = field(default_factory=dict)
     selected_chunk_ids: list[int] = field(default_factory=list)
     expended_chunk_ids: list[int] = field(default_factory=list)
+    chunk_hashes: dict[int, str] = field(default_factory=dict)
+    cached_query_log_id: int | None = None
 
     def to_dict(self) -> dict:
         return {
@@ -62,6 +92,8 @@ class QueryLogMeta:
             "hit_chunk_ids": {domain.value: chunk_ids for domain, chunk_ids in self.hit_chunk_ids.items()},
             "selected_chunk_ids": self.selected_chunk_ids,
             "expended_chunk_ids": self.expended_chunk_ids,
+            "chunk_hashes": {str(chunk_id): chunk_hash for chunk_id, chunk_hash in self.chunk_hashes.items()},
+            "cached_query_log_id": self.cached_query_log_id,
         }
 
     def to_json(self) -> str:
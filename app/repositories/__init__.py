@@ -1,16 +1,23 @@
-from .chunk import ChunkRepository
+from .chunk import AsyncChunkRepository, ChunkRepository
 from .document import DocumentRepository
+from .embedding_store import EmbeddingStoreRepository
 from .ingestor import Ingestor
 from .llm import Answerer, Embedder
-from .query_log import QueryLogRepository
-from .vector_store import VectorStoreRepository
+from .query_log import AsyncQueryLogRepository, QueryLogRepository
+from .sync_state import SyncStateRepository
+from .vector_store import AsyncVectorStoreRepository, VectorStoreRepository
 
 __all__ = [
+    "Answerer",
+    "AsyncChunkRepository",
+    "AsyncQueryLogRepository",
+    "AsyncVectorStoreRepository",
     "ChunkRepository",
     "DocumentRepository",
-    "Ingestor",
     "Embedder",
-    "Answerer",
+    "EmbeddingStoreRepository",
+    "Ingestor",
     "QueryLogRepository",
+    "SyncStateRepository",
     "VectorStoreRepository",
 ]
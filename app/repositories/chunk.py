@@ -25,10 +25,35 @@ class ChunkRepository(Protocol):
         offset: int = 0,
     ) -> list[Chunk]: ...
 
+    def list_keys_by_document(
+        self,
+        document_id: int,
+        after_id: int = 0,
+        limit: int = 500,
+    ) -> list[Chunk]: ...
+
     def list_by_context(
         self,
         document_id: int,
         context_id: int,
     ) -> list[Chunk]: ...
 
+    def list_by_contexts(
+        self,
+        pairs: list[tuple[int, int]],
+    ) -> dict[tuple[int, int], list[Chunk]]: ...
+
     def delete_by_document(self, document_id: int) -> None: ...
+
+    def delete_by_ids(self, document_id: int, chunk_ids: list[int]) -> None: ...
+
+    def update_positions(self, document_id: int, chunks: list[Chunk]) -> None: ...
+
+
+class AsyncChunkRepository(Protocol):
+    async def get_by_ids(self, chunk_ids: list[int]) -> list[Chunk]: ...
+
+    async def list_by_contexts(
+        self,
+        pairs: list[tuple[int, int]],
+    ) -> dict[tuple[int, int], list[Chunk]]: ...
@@ -1,7 +1,7 @@
 from typing import Protocol
 
 from app.enums import Domain, SourceType
-from app.models.base import Document
+from app.models.base import Document, DocumentHeader, StreamedContent
 
 
 class DocumentRepository(Protocol):
@@ -22,6 +22,14 @@ class DocumentRepository(Protocol):
         source_id: str,
     ) -> Document | None: ...
 
+    def get_header(self, id: int) -> DocumentHeader | None: ...
+
+    def get_header_by_source(
+        self,
+        source_type: SourceType,
+        source_id: str,
+    ) -> DocumentHeader | None: ...
+
     def update(self, document: Document) -> Document: ...
 
     def upsert(
@@ -31,6 +39,18 @@ class DocumentRepository(Protocol):
         source_id: str,
         title: str | None,
         raw_content: str,
-    ) -> Document: ...
+        source_version: str | None = None,
+        streamed: StreamedContent | None = None,
+    ) -> tuple[DocumentHeader, bool]: ...
+
+    def finalize(self, document: DocumentHeader) -> None: ...
+
+    def get_source_versions(
+        self,
+        source_type: SourceType,
+        source_ids: list[str],
+    ) -> dict[str, str | None]: ...
+
+    def list_source_ids(self, source_type: SourceType, prefix: str = "") -> list[str]: ...
 
     def delete(self, id: int) -> None: ...
@@ -0,0 +1,9 @@
+from typing import Protocol
+
+
+class EmbeddingStoreRepository(Protocol):
+    """chunk_hash -> 임베딩 (모델/차원은 구현체가 고정)"""
+
+    def get_many(self, chunk_hashes: list[str]) -> dict[str, list[float]]: ...
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None: ...
@@ -1,5 +1,6 @@
 import re
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from typing import ClassVar
 
 from app.enums import Domain, SourceType
@@ -25,7 +26,8 @@ class Ingestor(ABC):
     @abstractmethod
     def build_document(self) -> Document: ...
 
-    def get_chunks(self, doc: Document) -> list[Chunk]:
+    def get_chunks(self, doc: Document) -> Iterable[Chunk]:
+        """문서의 청크 (순서대로). 큰 문서는 한 번만 순회할 수 있는 lazy iterator 일 수 있다"""
         pairs = self.context_chunking(doc.raw_content)
         out: list[Chunk] = []
 
@@ -66,35 +68,35 @@ class Ingestor(ABC):
         return chunks
 
     @classmethod
-    def _split_into_heading_blocks(cls, lines: list[str]) -> list[list[str]]:
-        def is_heading_boundary(line: str) -> bool:
-            return bool(cls._MD_HEADING_RE.match(line.strip()))
+    def context_chunking(cls, text: str, max_chars: int = 900) -> list[tuple[int, str]]:
+        return list(cls.iter_context_chunks(text.splitlines(), max_chars=max_chars))
 
-        blocks: list[list[str]] = []
+    @classmethod
+    def iter_context_chunks(cls, lines: Iterable[str], max_chars: int = 900) -> Iterator[tuple[int, str]]:
+        """
+        context_chunking 의 스트리밍 버전 (결과 동일): 헤딩 블록 = 컨텍스트, 블록 안에서 max_chars 단위로 자름.
+        줄을 하나씩 소비하므로 메모리는 청크 하나 크기만큼만 쓴다. lines 는 str.splitlines() 와 같은 기준으로 나뉜 줄.
+        """
+        ctx_id = -1
         buf: list[str] = []
+        size = 0
 
         for ln in lines:
-            if is_heading_boundary(ln) and buf:
-                blocks.append(buf)
-                buf = []
-            buf.append(ln)
-
-        if buf:
-            blocks.append(buf)
-
-        return blocks
+            ln = ln.strip()
+            if not ln:
+                continue
 
-    @classmethod
-    def context_chunking(cls, text: str, max_chars: int = 900) -> list[tuple[int, str]]:
-        lines = [ln.rstrip() for ln in text.splitlines()]
-        lines = [ln for ln in lines if ln.strip()]
-        if not lines:
-            return []
+            if ctx_id < 0 or cls._MD_HEADING_RE.match(ln):
+                if buf:
+                    yield ctx_id, "\n".join(buf)
+                    buf, size = [], 0
+                ctx_id += 1
+            elif size + len(ln) + 1 > max_chars and buf:
+                yield ctx_id, "\n".join(buf)
+                buf, size = [], 0
 
-        blocks = cls._split_into_heading_blocks(lines)
+            buf.append(ln)
+            size += len(ln) + 1
 
-        out: list[tuple[int, str]] = []
-        for ctx_id, block_lines in enumerate(blocks):
-            for chunk_text in cls._chunk_lines(block_lines, max_chars=max_chars):
-                out.append((ctx_id, chunk_text))
-        return out
+        if buf:
+            yield ctx_id, "\n".join(buf)
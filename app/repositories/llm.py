@@ -1,12 +1,54 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
-from pydantic_ai import RunUsage
+from pydantic_ai import Agent, RunUsage
 
+from app.context_packer import ContextPacker, PackedContext, count_tokens
 from app.models.base import VectorSearchChunk
 from app.models.llm import Output
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class EmbedBatchPolicy:
+    """embed_documents 요청 분할 기준: 요청당 최대 입력 수/토큰 수, 동시 요청 수, 배치별 재시도"""
+
+    max_items: int = 256
+    max_tokens: int = 100_000
+    concurrency: int = 4
+    retries: int = 3
+    backoff: float = 0.5
+
+
+class EmbeddingBatchError(RuntimeError):
+    """
+    일부 배치가 재시도 후에도 실패.
+    embeddings 는 입력 순서 그대로이며, 성공한 배치의 벡터는 채워져 있고 실패한 위치는 None.
+    """
+
+    def __init__(self, message: str, embeddings: list[list[float] | None]):
+        super().__init__(message)
+        self.embeddings = embeddings
+
 
 class Embedder(ABC):
+    """
+    embed_documents 는 입력을 토큰/개수 기준 배치로 나눠 동시에 요청하고 입력 순서대로 합친다.
+    구현체는 요청 한 번에 해당하는 _embed_batch (비동기 클라이언트가 있으면 _aembed_batch 도) 를 구현한다.
+    """
+
+    _batch_policy: EmbedBatchPolicy = EmbedBatchPolicy()
+    # 토큰 수 계산용 모델명 (tiktoken 인코딩 선택, 없으면 기본 인코딩)
+    _token_model: str | None = None
+
     @property
     @abstractmethod
     def dim(self) -> int: ...
@@ -14,27 +56,187 @@ class Embedder(ABC):
     @abstractmethod
     def embed_query(self, text: str) -> list[float]: ...
 
+    async def aembed_query(self, text: str) -> list[float]:
+        return await asyncio.to_thread(self.embed_query, text)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """질의 여러 개를 임베딩. 기본은 embed_query 를 하나씩 호출 (질의용 임베딩이 문서용과 다를 수 있으므로)"""
+        return [self.embed_query(text) for text in texts]
+
+    def count_tokens(self, text: str) -> int:
+        return count_tokens(text, self._token_model)
+
     @abstractmethod
-    def embed_documents(self, texts: list[str]) -> list[list[float]]: ...
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]: ...
+
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.to_thread(self._embed_batch, texts)
+
+    def _split_batches(self, texts: list[str], token_counts: list[int] | None = None) -> list[tuple[int, list[str]]]:
+        """
+        (시작 위치, 입력) 목록. 한도를 넘는 단일 입력은 혼자 한 배치가 된다.
+        token_counts 가 있으면 (호출 측에서 이미 센 입력별 토큰 수) 다시 세지 않는다.
+        """
+        policy = self._batch_policy
+        if token_counts is None:
+            token_counts = [self.count_tokens(text) for text in texts]
+        batches: list[tuple[int, list[str]]] = []
+        start, tokens = 0, 0
+        for idx, n in enumerate(token_counts):
+            if idx > start and (idx - start >= policy.max_items or tokens + n > policy.max_tokens):
+                batches.append((start, texts[start:idx]))
+                start, tokens = idx, 0
+            tokens += n
+        if start < len(texts):
+            batches.append((start, texts[start:]))
+        return batches
+
+    @staticmethod
+    def _check_batch(texts: list[str], vectors: list[list[float]]) -> list[list[float]]:
+        if len(vectors) != len(texts):
+            raise RuntimeError(f"Embedding count mismatch: sent {len(texts)} inputs, got {len(vectors)} vectors")
+        return vectors
+
+    def _embed_batch_with_retry(self, texts: list[str]) -> list[list[float]]:
+        policy = self._batch_policy
+        for attempt in range(policy.retries + 1):
+            try:
+                return self._check_batch(texts, self._embed_batch(texts))
+            except Exception as e:
+                if attempt >= policy.retries:
+                    raise
+                delay = policy.backoff * 2**attempt
+                logger.warning("embedding batch of %d failed (%s), retrying in %.1fs", len(texts), e, delay)
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _aembed_batch_with_retry(self, texts: list[str]) -> list[list[float]]:
+        policy = self._batch_policy
+        for attempt in range(policy.retries + 1):
+            try:
+                return self._check_batch(texts, await self._aembed_batch(texts))
+            except Exception as e:
+                if attempt >= policy.retries:
+                    raise
+                delay = policy.backoff * 2**attempt
+                logger.warning("embedding batch of %d failed (%s), retrying in %.1fs", len(texts), e, delay)
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _assemble(
+        size: int,
+        batches: list[tuple[int, list[str]]],
+        results: list[list[list[float]] | BaseException],
+    ) -> list[list[float]]:
+        out: list[list[float] | None] = [None] * size
+        errors: list[BaseException] = []
+        for (start, texts), result in zip(batches, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                errors.append(result)
+                continue
+            out[start : start + len(texts)] = result
+
+        if errors:
+            raise EmbeddingBatchError(
+                f"{len(errors)}/{len(batches)} embedding batches failed: {errors[0]}",
+                out,
+            ) from errors[0]
+        return out
+
+    def embed_documents(self, texts: list[str], token_counts: list[int] | None = None) -> list[list[float]]:
+        if not texts:
+            return []
+
+        batches = self._split_batches(texts, token_counts)
+        results: list[list[list[float]] | BaseException] = []
+        workers = max(1, min(self._batch_policy.concurrency, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="koo-embed") as executor:
+            futures = [executor.submit(self._embed_batch_with_retry, batch) for _, batch in batches]
+            for future in futures:
+                # 실패한 배치가 있어도 나머지 배치 결과는 모두 받는다
+                results.append(future.exception() or future.result())
+        return self._assemble(len(texts), batches, results)
+
+    async def aembed_documents(self, texts: list[str], token_counts: list[int] | None = None) -> list[list[float]]:
+        if not texts:
+            return []
+
+        batches = self._split_batches(texts, token_counts)
+        semaphore = asyncio.Semaphore(max(1, self._batch_policy.concurrency))
+
+        async def _run(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._aembed_batch_with_retry(batch)
+
+        results = await asyncio.gather(*(_run(batch) for _, batch in batches), return_exceptions=True)
+        return self._assemble(len(texts), batches, results)
+
+
+@dataclass(slots=True)
+class AnswerStreamEvent:
+    delta: str = ""
+    # 마지막 이벤트에만 채워짐
+    output: Output | None = None
+    usage: RunUsage | None = None
 
 
 class Answerer(ABC):
     @abstractmethod
     def answer(self, question: str, contexts: list[VectorSearchChunk]) -> tuple[Output, RunUsage]: ...
 
-    def _build_context(self, contexts: list[VectorSearchChunk], max_chars: int = 6000) -> str:
-        parts: list[str] = []
-        total = 0
-        for idx, context in enumerate(contexts, start=1):
-            header = (
-                f"[{idx}] chunk_id={context.chunk_id} score={context.score:.4f} context_id={context.chunk.context_id!r}"
-                # f"title={context.chunk.!r}"
-            )
-            body = context.chunk.chunk_text.strip()
-
-            block = f"{header}\n{body}\n"
-            if total + len(block) > max_chars:
-                break
-            parts.append(block)
-            total += len(block)
-        return "\n".join(parts)
+    async def aanswer(self, question: str, contexts: list[VectorSearchChunk]) -> tuple[Output, RunUsage]:
+        return await asyncio.to_thread(self.answer, question, contexts)
+
+    def answer_stream(self, question: str, contexts: list[VectorSearchChunk]) -> Iterator[AnswerStreamEvent]:
+        """답변 텍스트를 도착하는 대로 delta 로 전달하고, 마지막 이벤트에 output/usage 를 담는다."""
+        output, usage = self.answer(question=question, contexts=contexts)
+        yield AnswerStreamEvent(delta=output.answer, output=output, usage=usage)
+
+    @staticmethod
+    def _stream_agent(agent: Agent, prompt: str) -> Iterator[AnswerStreamEvent]:
+        """Agent.run_stream(async)을 별도 스레드의 이벤트 루프에서 돌리고, 결과를 동기 iterator 로 전달"""
+        events: queue.Queue = queue.Queue()
+        done = object()
+
+        async def _run() -> None:
+            async with agent.run_stream(prompt) as result:
+                sent = ""
+                async for partial in result.stream_output(debounce_by=None):
+                    text = partial.answer or ""
+                    if len(text) > len(sent) and text.startswith(sent):
+                        events.put(AnswerStreamEvent(delta=text[len(sent) :]))
+                        sent = text
+
+                output = await result.get_output()
+                rest = output.answer[len(sent) :] if output.answer.startswith(sent) else ""
+                events.put(AnswerStreamEvent(delta=rest, output=output, usage=result.usage()))
+
+        def _worker() -> None:
+            try:
+                asyncio.run(_run())
+            except BaseException as e:  # noqa: BLE001 - 소비하는 쪽(generator)에서 다시 raise
+                events.put(e)
+            finally:
+                events.put(done)
+
+        threading.Thread(target=_worker, name="koo-answer-stream", daemon=True).start()
+
+        while True:
+            item = events.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    _packer: ContextPacker | None = None
+
+    def _pack_context(self, contexts: list[VectorSearchChunk]) -> PackedContext:
+        packer = self._packer or ContextPacker(max_tokens=1500)
+        return packer.pack(contexts)
+
+    def _build_context(self, contexts: list[VectorSearchChunk]) -> str:
+        return self._pack_context(contexts).text
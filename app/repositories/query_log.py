@@ -12,6 +12,8 @@ class QueryLogRepository(Protocol):
 
     def get(self, *, query_log_id: int) -> QueryLog | None: ...
 
+    def list_answered(self, limit: int) -> list[QueryLog]: ...
+
     def update(
         self,
         id: int,
@@ -21,6 +23,27 @@ class QueryLogRepository(Protocol):
         input_tokens: int | None = None,
         output_tokens: int | None = None,
         meta: dict | None = None,
-    ) -> QueryLog: ...
+        query_embedding: list[float] | None = None,
+    ) -> QueryLog | None: ...
 
     def delete(self, id: int) -> None: ...
+
+
+class AsyncQueryLogRepository(Protocol):
+    async def create(
+        self,
+        query_text: str,
+        topk: int,
+    ) -> QueryLog: ...
+
+    async def update(
+        self,
+        id: int,
+        selected_chunk_ids: list[int] | None = None,
+        expended_chunk_ids: list[int] | None = None,
+        answer: str | None = None,
+        input_tokens: int | None = None,
+        output_tokens: int | None = None,
+        meta: dict | None = None,
+        query_embedding: list[float] | None = None,
+    ) -> QueryLog: ...
@@ -0,0 +1,11 @@
+from typing import Protocol
+
+from app.enums import SourceType
+
+
+class SyncStateRepository(Protocol):
+    """증분 동기화 위치 (source_type, source_key) -> value. 예: Slack 채널 -> 마지막 메시지 ts"""
+
+    def get(self, source_type: SourceType, source_key: str) -> str | None: ...
+
+    def set(self, source_type: SourceType, source_key: str, value: str) -> None: ...
@@ -1,9 +1,35 @@
+from contextlib import AbstractContextManager, nullcontext
 from typing import Protocol
 
 from app.enums import Domain, SourceType
 
 
+class VectorStoreWriter(Protocol):
+    def upsert(
+        self,
+        domain: Domain,
+        source_type: SourceType,
+        chunk_id: int,
+        embedding: list[float],
+    ) -> None: ...
+
+    def bulk_upsert(
+        self,
+        domain: Domain,
+        source_type: SourceType,
+        chunk_ids: list[int],
+        embeddings: list[list[float]],
+    ) -> None: ...
+
+    def delete(self, domain: Domain, chunk_id: int) -> None: ...
+
+    def bulk_delete(self, domain: Domain, chunk_ids: list[int]) -> None: ...
+
+
 class VectorStoreRepository(Protocol):
+    # True 면 search_domains 가 여러 도메인을 한 번의 검색으로 처리
+    supports_cross_domain: bool = False
+
     def upsert(
         self,
         domain: Domain,
@@ -22,6 +48,15 @@ class VectorStoreRepository(Protocol):
 
     def delete(self, domain: Domain, chunk_id: int) -> None: ...
 
+    def bulk_delete(self, domain: Domain, chunk_ids: list[int]) -> None: ...
+
+    def ingest_session(self, flush_rows: int | None = None) -> AbstractContextManager[VectorStoreWriter]:
+        """
+        여러 문서의 쓰기를 모아서 반영하는 세션 (대량 적재용).
+        기본 구현은 버퍼링 없이 저장소 자신을 그대로 사용한다.
+        """
+        return nullcontext(self)
+
     def search(
         self,
         domain: Domain,
@@ -29,3 +64,41 @@ class VectorStoreRepository(Protocol):
         top_k: int,
         filter_expr: str | None = None,
     ) -> list[tuple[int, float]]: ...
+
+    def search_batch(
+        self,
+        domain: Domain,
+        embeddings: list[list[float]],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[list[tuple[int, float]]]: ...
+
+    def search_domains(
+        self,
+        domains: list[Domain],
+        embeddings: list[list[float]],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[list[tuple[Domain, int, float]]]:
+        """
+        질의별 (domain, chunk_id, score) 목록 (점수 내림차순).
+        기본 구현은 도메인별 search_batch 결과를 합친다.
+        """
+        merged: list[list[tuple[Domain, int, float]]] = [[] for _ in embeddings]
+        for domain in domains:
+            for hits, pairs in zip(merged, self.search_batch(domain, embeddings, top_k, filter_expr)):
+                hits.extend((domain, chunk_id, score) for chunk_id, score in pairs)
+
+        for hits in merged:
+            hits.sort(key=lambda x: x[2], reverse=True)
+        return merged
+
+
+class AsyncVectorStoreRepository(Protocol):
+    async def search(
+        self,
+        domain: Domain,
+        embedding: list[float],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[tuple[int, float]]: ...
@@ -1,7 +1,10 @@
+from .answer_cache import AnswerCache
 from .ask import AskService
-from .ingest import IngestService
+from .ingest import IngestService, IngestStats
 
 __all__ = [
+    "AnswerCache",
     "AskService",
     "IngestService",
+    "IngestStats",
 ]
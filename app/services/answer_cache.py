@@ -0,0 +1,184 @@
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.enums import Domain
+from app.models.base import Chunk, QueryLog
+from app.repositories.chunk import ChunkRepository
+from app.repositories.query_log import QueryLogRepository
+
+__all__ = ["AnswerCache", "CachedAnswer"]
+
+
+@dataclass(slots=True)
+class CachedAnswer:
+    query_log_id: int
+    answer: str
+    similarity: float
+    # 원래 답변이 근거로 고른 청크 (selected 순서, 도메인 포함)
+    sources: list[tuple[Chunk, Domain]]
+
+
+@dataclass(slots=True)
+class _Entry:
+    query_log_id: int
+    answer: str
+    chunk_hashes: dict[int, str]
+    sources: dict[int, Domain]
+
+
+class AnswerCache:
+    """
+    QueryLog 에 저장된 (질의 임베딩, 답변, 사용 청크 해시) 기반 시맨틱 답변 캐시.
+    - 코사인 유사도가 threshold 이상인 과거 질문을 찾고
+    - 해당 답변이 사용한 청크가 모두 존재하며 chunk_hash 가 그대로일 때만 재사용
+    질의 벡터는 정규화해 (max_entries, dim) 행렬에 링 버퍼로 보관하고, 조회는 행렬-벡터 곱 한 번으로 계산한다.
+    """
+
+    def __init__(
+        self,
+        query_log_repo: QueryLogRepository,
+        chunk_repo: ChunkRepository,
+        *,
+        threshold: float = 0.95,
+        max_entries: int = 2000,
+        max_candidates: int = 3,
+    ):
+        self.query_log_repo = query_log_repo
+        self.chunk_repo = chunk_repo
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_candidates = max_candidates
+
+        self._loaded = False
+        self._matrix: np.ndarray | None = None
+        self._entries: list[_Entry | None] = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: list[float]) -> np.ndarray | None:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        if v.ndim != 1 or norm == 0:
+            return None
+        return v / norm
+
+    @staticmethod
+    def _sources_from_meta(meta: dict) -> dict[int, Domain]:
+        domain_by_chunk = {
+            chunk_id: Domain(domain)
+            for domain, chunk_ids in (meta.get("hit_chunk_ids") or {}).items()
+            for chunk_id in chunk_ids
+        }
+        return {
+            chunk_id: domain_by_chunk[chunk_id]
+            for chunk_id in meta.get("selected_chunk_ids") or []
+            if chunk_id in domain_by_chunk
+        }
+
+    def _append(self, vector: np.ndarray, entry: _Entry) -> None:
+        # 호출 측에서 self._lock 을 잡고 있어야 함
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        if vector.shape[0] != self._matrix.shape[1]:
+            # 임베딩 모델(차원)이 바뀐 이전 기록은 비교할 수 없으므로 무시
+            return
+
+        self._matrix[self._next] = vector
+        self._entries[self._next] = entry
+        self._next = (self._next + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def _load(self) -> None:
+        # 호출 측에서 self._lock 을 잡고 있어야 함
+        if self._loaded:
+            return
+        self._loaded = True
+
+        # list_answered 는 최신순 -> 오래된 것부터 넣어 최신 항목이 링 버퍼 뒤쪽에 오도록
+        for query_log in reversed(self.query_log_repo.list_answered(limit=self.max_entries)):
+            self._add_query_log(query_log)
+
+    def _add_query_log(self, query_log: QueryLog) -> None:
+        meta = query_log.meta or {}
+        chunk_hashes = meta.get("chunk_hashes")
+        if not query_log.query_embedding or not query_log.answer or not chunk_hashes:
+            return
+
+        vector = self._normalize(query_log.query_embedding)
+        if vector is None:
+            return
+
+        entry = _Entry(
+            query_log_id=query_log.id,
+            answer=query_log.answer,
+            chunk_hashes={int(chunk_id): chunk_hash for chunk_id, chunk_hash in chunk_hashes.items()},
+            sources=self._sources_from_meta(meta),
+        )
+        self._append(vector, entry)
+
+    def _fresh_chunks(self, entry: _Entry) -> dict[int, Chunk] | None:
+        """근거 청크가 모두 그대로면 chunk_id -> Chunk, 아니면 None"""
+        chunks = self.chunk_repo.get_by_ids(list(entry.chunk_hashes.keys()))
+        current = {chunk.id: chunk for chunk in chunks}
+        if {chunk_id: chunk.chunk_hash for chunk_id, chunk in current.items()} != entry.chunk_hashes:
+            return None
+        return current
+
+    def lookup(self, embedding: list[float]) -> CachedAnswer | None:
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            self._load()
+            if self._matrix is None or self._size == 0 or query.shape[0] != self._matrix.shape[1]:
+                return None
+
+            similarities = self._matrix[: self._size] @ query
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            top = candidates[np.argsort(similarities[candidates])[::-1][: self.max_candidates]]
+            scored = [(float(similarities[i]), self._entries[i]) for i in top]
+
+        # 청크 신선도 확인(DB 조회)은 lock 밖에서
+        for similarity, entry in scored:
+            chunks = self._fresh_chunks(entry)
+            if chunks is not None:
+                return CachedAnswer(
+                    query_log_id=entry.query_log_id,
+                    answer=entry.answer,
+                    similarity=similarity,
+                    sources=[
+                        (chunks[chunk_id], domain) for chunk_id, domain in entry.sources.items() if chunk_id in chunks
+                    ],
+                )
+
+        return None
+
+    def add(
+        self,
+        query_log_id: int,
+        embedding: list[float],
+        answer: str,
+        chunk_hashes: dict[int, str],
+        sources: dict[int, Domain],
+    ) -> None:
+        if not chunk_hashes:
+            return
+
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        entry = _Entry(
+            query_log_id=query_log_id,
+            answer=answer,
+            chunk_hashes=chunk_hashes,
+            sources=sources,
+        )
+        with self._lock:
+            self._load()
+            self._append(vector, entry)
@@ -1,15 +1,25 @@
+import asyncio
+import logging
 from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
+from itertools import batched
 
+from pydantic_ai import RunUsage
 from rich.console import Console
 from rich.table import Table
 
 from app.enums import Domain
-from app.models.base import QueryLogMeta, VectorSearchChunk
-from app.repositories.chunk import ChunkRepository
+from app.models.base import Chunk, QueryLogMeta, VectorSearchChunk
+from app.models.llm import Output
+from app.repositories.chunk import AsyncChunkRepository, ChunkRepository
 from app.repositories.llm import Answerer, Embedder
-from app.repositories.query_log import QueryLogRepository
-from app.repositories.vector_store import VectorStoreRepository
+from app.repositories.query_log import AsyncQueryLogRepository, QueryLogRepository
+from app.repositories.vector_store import AsyncVectorStoreRepository, VectorStoreRepository
+from app.services.answer_cache import AnswerCache, CachedAnswer
+
+logger = logging.getLogger(__name__)
 
 __all__ = ["AskService"]
 
@@ -18,6 +28,26 @@ __all__ = ["AskService"]
 class AskResult:
     answer: str
     hits: list[VectorSearchChunk]
+    cached_query_log_id: int | None = None
+
+
+@dataclass(slots=True)
+class BatchAskResult:
+    index: int
+    question: str
+    answer: str
+    hits: list[VectorSearchChunk]
+    query_log_id: int | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class AskStreamEvent:
+    hits: list[VectorSearchChunk] | None = None
+    delta: str = ""
+    result: AskResult | None = None
 
 
 class AskService:
@@ -29,6 +59,11 @@ class AskService:
         embedder: Embedder,
         answerer: Answerer,
         topk: int,
+        search_max_workers: int = 4,
+        answer_cache: AnswerCache | None = None,
+        async_chunk_repo: AsyncChunkRepository | None = None,
+        async_query_log_repo: AsyncQueryLogRepository | None = None,
+        async_vector_store_repo: AsyncVectorStoreRepository | None = None,
     ):
         self.chunk_repo = chunk_repo
         self.query_log_repo = query_log_repo
@@ -36,6 +71,11 @@ class AskService:
         self.embedder = embedder
         self.answerer = answerer
         self.topk = topk
+        self.search_max_workers = search_max_workers
+        self.answer_cache = answer_cache
+        self.async_chunk_repo = async_chunk_repo
+        self.async_query_log_repo = async_query_log_repo
+        self.async_vector_store_repo = async_vector_store_repo
 
     def ask(self, question: str) -> AskResult:
         query_log = self.query_log_repo.create(
@@ -43,52 +83,177 @@ class AskService:
             topk=self.topk,
         )
 
+        embedding = self.embedder.embed_query(question)
+
+        cached = self._answer_from_cache(query_log_id=query_log.id, embedding=embedding)
+        if cached is not None:
+            return cached
+
         # 벡터 서치 및 답변 생성
-        hits = self.search_all_domain(query=question)
+        hits, selected, contexts = self._retrieve(question=question, embedding=embedding)
+
+        output, usage = self.answerer.answer(question=question, contexts=contexts)
+
+        self._record_answer(
+            query_log_id=query_log.id,
+            embedding=embedding,
+            hits=hits,
+            selected=selected,
+            contexts=contexts,
+            output=output,
+            usage=usage,
+        )
+        return AskResult(answer=output.answer, hits=hits)
+
+    def ask_stream(self, question: str) -> Iterator[AskStreamEvent]:
+        """
+        ask()의 스트리밍 버전.
+        - 첫 이벤트: 검색 결과(hits)
+        - 이후: 답변 텍스트 조각(delta)
+        - 마지막 이벤트: 최종 결과(result), query_log 기록 이후에 전달
+        """
+        query_log = self.query_log_repo.create(
+            query_text=question,
+            topk=self.topk,
+        )
+
+        embedding = self.embedder.embed_query(question)
+
+        cached = self._answer_from_cache(query_log_id=query_log.id, embedding=embedding)
+        if cached is not None:
+            yield AskStreamEvent(hits=cached.hits)
+            yield AskStreamEvent(delta=cached.answer)
+            yield AskStreamEvent(result=cached)
+            return
+
+        hits, selected, contexts = self._retrieve(question=question, embedding=embedding)
+        yield AskStreamEvent(hits=hits)
+
+        output: Output | None = None
+        usage: RunUsage | None = None
+        for event in self.answerer.answer_stream(question=question, contexts=contexts):
+            if event.delta:
+                yield AskStreamEvent(delta=event.delta)
+            if event.output is not None:
+                output, usage = event.output, event.usage
+
+        if output is None or usage is None:
+            raise RuntimeError("Answer stream finished without a final output.")
+
+        self._record_answer(
+            query_log_id=query_log.id,
+            embedding=embedding,
+            hits=hits,
+            selected=selected,
+            contexts=contexts,
+            output=output,
+            usage=usage,
+        )
+        yield AskStreamEvent(result=AskResult(answer=output.answer, hits=hits))
+
+    def _answer_from_cache(self, query_log_id: int, embedding: list[float]) -> AskResult | None:
+        # 유사 질문의 답변이 있고 근거 청크가 그대로라면 LLM 호출 없이 재사용
+        if self.answer_cache is None:
+            return None
+
+        cached = self.answer_cache.lookup(embedding)
+        if cached is None:
+            return None
+
+        meta = QueryLogMeta(topk=self.topk, cached_query_log_id=cached.query_log_id)
+        self.query_log_repo.update(
+            id=query_log_id,
+            answer=cached.answer,
+            meta=meta.to_dict(),
+        )
+        return self._to_cached_result(cached)
+
+    @staticmethod
+    def _to_cached_result(cached: CachedAnswer) -> AskResult:
+        # 캐시된 답변의 근거 청크를 hits 로 돌려준다 (score 는 과거 질문과의 유사도)
+        hits = [
+            VectorSearchChunk(chunk_id=chunk.id, chunk=chunk, score=cached.similarity, domain=domain)
+            for chunk, domain in cached.sources
+        ]
+        return AskResult(answer=cached.answer, hits=hits, cached_query_log_id=cached.query_log_id)
+
+    def _retrieve(
+        self,
+        question: str,
+        embedding: list[float],
+    ) -> tuple[list[VectorSearchChunk], list[VectorSearchChunk], list[VectorSearchChunk]]:
+        hits = self.search_all_domain(query=question, embedding=embedding)
 
         selected = hits[: self.topk]
         contexts = self._expand_by_context(selected)
+        return hits, selected, contexts
 
-        output, usage = self.answerer.answer(question=question, contexts=contexts)
-
-        # meta 정보 구성
+    def _build_meta(
+        self,
+        hits: list[VectorSearchChunk],
+        selected: list[VectorSearchChunk],
+        contexts: list[VectorSearchChunk],
+    ) -> QueryLogMeta:
         hit_chunk_ids = defaultdict(list)
         for hit in hits:
             hit_chunk_ids[hit.domain].append(hit.chunk_id)
-        meta = QueryLogMeta(
+        return QueryLogMeta(
             topk=self.topk,
             hit_chunk_ids=hit_chunk_ids,
             selected_chunk_ids=[c.chunk_id for c in selected],
             expended_chunk_ids=[c.chunk_id for c in contexts],
+            chunk_hashes={c.chunk_id: c.chunk.chunk_hash for c in contexts},
         )
 
+    def _record_answer(
+        self,
+        query_log_id: int,
+        embedding: list[float],
+        hits: list[VectorSearchChunk],
+        selected: list[VectorSearchChunk],
+        contexts: list[VectorSearchChunk],
+        output: Output,
+        usage: RunUsage,
+    ) -> None:
+        meta = self._build_meta(hits=hits, selected=selected, contexts=contexts)
+
         # DB 정보 업데이트
         self.query_log_repo.update(
-            id=query_log.id,
+            id=query_log_id,
             selected_chunk_ids=meta.selected_chunk_ids,
             expended_chunk_ids=meta.expended_chunk_ids,
             answer=output.answer,
             input_tokens=usage.input_tokens,
             output_tokens=usage.output_tokens,
             meta=meta.to_dict(),
+            query_embedding=embedding,
         )
-
-        return AskResult(answer=output.answer, hits=hits)
+        if self.answer_cache is not None:
+            self.answer_cache.add(
+                query_log_id=query_log_id,
+                embedding=embedding,
+                answer=output.answer,
+                chunk_hashes=meta.chunk_hashes,
+                sources={c.chunk_id: c.domain for c in selected},
+            )
 
     def _expand_by_context(self, hits: list[VectorSearchChunk]) -> list[VectorSearchChunk]:
         targets = {(hit.chunk.document_id, hit.chunk.context_id): hit for hit in hits}
+        if not targets:
+            return []
+
+        # 모든 (document_id, context_id) 쌍을 한 번의 DB 조회로 확장
+        chunks_by_context = self.chunk_repo.list_by_contexts(pairs=list(targets.keys()))
+        return self._to_expanded_chunks(targets=targets, chunks_by_context=chunks_by_context)
 
+    @staticmethod
+    def _to_expanded_chunks(
+        targets: dict[tuple[int, int], VectorSearchChunk],
+        chunks_by_context: dict[tuple[int, int], list[Chunk]],
+    ) -> list[VectorSearchChunk]:
         expanded_chunks: list[VectorSearchChunk] = []
         for uk, search_chunk in targets.items():
-            search_chunk: VectorSearchChunk
-            document_id, context_id = uk
-
-            chunks = self.chunk_repo.list_by_context(
-                document_id=document_id,
-                context_id=context_id,
-            )
-
-            for chunk in chunks:
+            for chunk in chunks_by_context.get(uk, []):
                 expanded_chunks.append(
                     VectorSearchChunk(
                         chunk_id=chunk.id,
@@ -105,15 +270,41 @@ class AskService:
         console: Console,
         answer: AskResult,
     ):
+        self._print_hits(console=console, hits=answer.hits)
+
+        if answer.cached_query_log_id is not None:
+            console.print(f"[dim](cached answer from query_log_id={answer.cached_query_log_id})[/dim]")
+
+        console.print("\n[bold]Answer[/bold]")
+        console.print(answer.answer)
+
+    def print_answer_stream(
+        self,
+        console: Console,
+        events: Iterable[AskStreamEvent],
+    ) -> AskResult | None:
+        result: AskResult | None = None
+        for event in events:
+            if event.hits is not None:
+                self._print_hits(console=console, hits=event.hits)
+                console.print("\n[bold]Answer[/bold]")
+            if event.delta:
+                console.out(event.delta, end="", highlight=False)
+            if event.result is not None:
+                result = event.result
+                console.out("")
+                if result.cached_query_log_id is not None:
+                    console.print(f"[dim](cached answer from query_log_id={result.cached_query_log_id})[/dim]")
+        return result
+
+    def _print_hits(self, console: Console, hits: list[VectorSearchChunk]):
         table = Table(title=f"koo ask (topk={self.topk})")
         table.add_column("rank", justify="right")
         table.add_column("chunk_id", justify="right")
         table.add_column("score", justify="right")
         table.add_column("chunk_text")
 
-        selected_ids = []
-        for idx, hit in enumerate(answer.hits, start=1):
-            selected_ids.append(hit.chunk_id)
+        for idx, hit in enumerate(hits, start=1):
             preview = hit.chunk.chunk_text.replace("\n", " ")
             if len(preview) > 120:
                 preview = preview[:120] + "..."
@@ -121,30 +312,41 @@ class AskService:
 
         console.print(table)
 
-        console.print("\n[bold]Answer[/bold]")
-        console.print(answer.answer)
-
     def search_similar_chunks(
         self,
         domain: Domain,
         query: str,
         *,
         filter_expr: str | None = None,
+    ) -> list[VectorSearchChunk]:
+        embedding = self.embedder.embed_query(query)
+        return self.search_similar_chunks_by_embedding(domain, embedding, filter_expr=filter_expr)
+
+    def search_similar_chunks_by_embedding(
+        self,
+        domain: Domain,
+        embedding: list[float],
+        *,
+        filter_expr: str | None = None,
     ) -> list[VectorSearchChunk]:
         pairs = self.vector_store_repo.search(
             domain=domain,
-            embedding=self.embedder.embed_query(query),
+            embedding=embedding,
             top_k=self.topk,
             filter_expr=filter_expr,
         )
         if not pairs:
             return []
 
-        chunk_ids = [cid for cid, _ in pairs]
-
-        chunks = self.chunk_repo.get_by_ids(chunk_ids)
-        chunk_map = {chunk.id: chunk for chunk in chunks}
+        chunks = self.chunk_repo.get_by_ids([cid for cid, _ in pairs])
+        return self._to_search_chunks(domain=domain, pairs=pairs, chunk_map={chunk.id: chunk for chunk in chunks})
 
+    @staticmethod
+    def _to_search_chunks(
+        domain: Domain,
+        pairs: list[tuple[int, float]],
+        chunk_map: dict[int, Chunk],
+    ) -> list[VectorSearchChunk]:
         results = []
         for cid, score in pairs:
             chunk = chunk_map.get(int(cid))
@@ -162,16 +364,267 @@ class AskService:
         results.sort(key=lambda x: x.score, reverse=True)
         return results
 
+    def _hits_from_triples(
+        self,
+        triples: list[tuple[Domain, int, float]],
+        chunk_map: dict[int, Chunk],
+    ) -> list[VectorSearchChunk]:
+        pairs_by_domain: dict[Domain, list[tuple[int, float]]] = defaultdict(list)
+        for domain, chunk_id, score in triples:
+            pairs_by_domain[domain].append((chunk_id, score))
+
+        hits = [
+            hit
+            for domain, pairs in pairs_by_domain.items()
+            for hit in self._to_search_chunks(domain=domain, pairs=pairs, chunk_map=chunk_map)
+        ]
+        hits.sort(key=lambda x: x.score, reverse=True)
+        return hits
+
     def search_all_domain(
         self,
         query: str,
         *,
+        embedding: list[float] | None = None,
         filter_expr: str | None = None,
+        domains: list[Domain] | None = None,
     ) -> list[VectorSearchChunk]:
-        hits = []
-        for domain in Domain:
-            result = self.search_similar_chunks(domain, query, filter_expr=filter_expr)
-            hits.extend(result)
+        # 질문 임베딩은 한 번만 계산하고, 도메인별 검색(+청크 조회)은 병렬로 수행
+        if embedding is None:
+            embedding = self.embedder.embed_query(query)
+        domains = domains or list(Domain)
+
+        if self.vector_store_repo.supports_cross_domain:
+            # 단일 컬렉션(partition key) 레이아웃: 전체 도메인을 한 번에 검색
+            triples = self.vector_store_repo.search_domains(
+                domains, [embedding], self.topk * len(domains), filter_expr
+            )[0]
+            chunks = self.chunk_repo.get_by_ids([chunk_id for _, chunk_id, _ in triples])
+            return self._hits_from_triples(triples, {chunk.id: chunk for chunk in chunks})
+
+        max_workers = max(1, min(self.search_max_workers, len(domains)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="koo-search") as executor:
+            futures = [
+                executor.submit(
+                    self.search_similar_chunks_by_embedding,
+                    domain,
+                    embedding,
+                    filter_expr=filter_expr,
+                )
+                for domain in domains
+            ]
+            hits = [hit for future in futures for hit in future.result()]
 
         hits.sort(key=lambda x: x.score, reverse=True)
         return hits
+
+    # =============================================
+    # Batch
+    # =============================================
+
+    def ask_batch(
+        self,
+        questions: Iterable[str],
+        *,
+        batch_size: int = 64,
+        concurrency: int = 8,
+    ) -> Iterator[BatchAskResult]:
+        """
+        대량 질문 처리. batch_size 단위로
+        질의 임베딩(embed_queries) -> 도메인별 다중 벡터 검색 -> 청크 일괄 조회/확장 을 수행하고,
+        답변 생성은 concurrency 개까지 동시에 진행한다. 결과는 완료되는 순서대로 반환.
+        검색이 실패한 배치는 중단하지 않고 해당 질문마다 error 가 담긴 결과로 반환한다.
+        """
+        pending: set[Future[BatchAskResult]] = set()
+        offset = 0
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="koo-answer") as executor:
+            for batch in batched(questions, batch_size):
+                try:
+                    retrieved = self._retrieve_batch(list(batch))
+                except Exception as e:
+                    logger.exception("batch retrieval failed: questions %d-%d", offset, offset + len(batch) - 1)
+                    for idx, question in enumerate(batch, start=offset):
+                        yield BatchAskResult(index=idx, question=question, answer="", hits=[], error=repr(e))
+                    offset += len(batch)
+                    continue
+
+                for idx, (question, embedding, hits, selected, contexts) in enumerate(retrieved, start=offset):
+                    pending.add(executor.submit(self._answer_one, idx, question, embedding, hits, selected, contexts))
+                offset += len(batch)
+
+                # 다음 배치 검색은 답변 생성과 겹쳐서 진행하되, 대기 작업이 쌓이지 않도록 제한
+                while len(pending) > concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            for future in as_completed(pending):
+                yield future.result()
+
+    def _retrieve_batch(
+        self,
+        questions: list[str],
+    ) -> list[tuple[str, list[float], list[VectorSearchChunk], list[VectorSearchChunk], list[VectorSearchChunk]]]:
+        embeddings = self.embedder.embed_queries(questions)
+        domains = list(Domain)
+
+        if self.vector_store_repo.supports_cross_domain:
+            triples_per_question = self.vector_store_repo.search_domains(domains, embeddings, self.topk * len(domains))
+        else:
+            max_workers = max(1, min(self.search_max_workers, len(domains)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="koo-search") as executor:
+                futures = [
+                    executor.submit(self.vector_store_repo.search_batch, domain, embeddings, self.topk)
+                    for domain in domains
+                ]
+                pairs_by_domain = {domain: future.result() for domain, future in zip(domains, futures)}
+
+            triples_per_question = [
+                [(domain, cid, score) for domain in domains for cid, score in pairs_by_domain[domain][i]]
+                for i in range(len(questions))
+            ]
+
+        chunk_ids = {cid for triples in triples_per_question for _, cid, _ in triples}
+        chunk_map = {chunk.id: chunk for chunk in self.chunk_repo.get_by_ids(list(chunk_ids))}
+
+        hits_per_question = [self._hits_from_triples(triples, chunk_map) for triples in triples_per_question]
+
+        # 배치 전체의 컨텍스트 확장도 한 번의 조회로 처리
+        targets_per_question = [
+            {(hit.chunk.document_id, hit.chunk.context_id): hit for hit in hits[: self.topk]}
+            for hits in hits_per_question
+        ]
+        pairs = list(dict.fromkeys(key for targets in targets_per_question for key in targets))
+        chunks_by_context = self.chunk_repo.list_by_contexts(pairs=pairs) if pairs else {}
+
+        out = []
+        for question, embedding, hits, targets in zip(questions, embeddings, hits_per_question, targets_per_question):
+            contexts = self._to_expanded_chunks(targets=targets, chunks_by_context=chunks_by_context)
+            out.append((question, embedding, hits, hits[: self.topk], contexts))
+        return out
+
+    def _answer_one(
+        self,
+        index: int,
+        question: str,
+        embedding: list[float],
+        hits: list[VectorSearchChunk],
+        selected: list[VectorSearchChunk],
+        contexts: list[VectorSearchChunk],
+    ) -> BatchAskResult:
+        try:
+            query_log = self.query_log_repo.create(query_text=question, topk=self.topk)
+            output, usage = self.answerer.answer(question=question, contexts=contexts)
+            self._record_answer(
+                query_log_id=query_log.id,
+                embedding=embedding,
+                hits=hits,
+                selected=selected,
+                contexts=contexts,
+                output=output,
+                usage=usage,
+            )
+        except Exception as e:
+            logger.exception("batch answer failed: question %d", index)
+            return BatchAskResult(index=index, question=question, answer="", hits=hits, error=repr(e))
+
+        return BatchAskResult(
+            index=index,
+            question=question,
+            answer=output.answer,
+            hits=hits,
+            query_log_id=query_log.id,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+        )
+
+    # =============================================
+    # Async
+    # =============================================
+
+    async def ask_async(self, question: str) -> AskResult:
+        if self.async_chunk_repo is None or self.async_query_log_repo is None or self.async_vector_store_repo is None:
+            raise RuntimeError("ask_async requires async chunk/query_log/vector_store repositories.")
+
+        # query_log 생성과 질문 임베딩은 서로 독립적이므로 동시에 수행
+        query_log, embedding = await asyncio.gather(
+            self.async_query_log_repo.create(query_text=question, topk=self.topk),
+            self.embedder.aembed_query(question),
+        )
+
+        if self.answer_cache is not None:
+            cached = await asyncio.to_thread(self.answer_cache.lookup, embedding)
+            if cached is not None:
+                meta = QueryLogMeta(topk=self.topk, cached_query_log_id=cached.query_log_id)
+                await self.async_query_log_repo.update(id=query_log.id, answer=cached.answer, meta=meta.to_dict())
+                return self._to_cached_result(cached)
+
+        hits = await self.search_all_domain_async(embedding=embedding)
+        selected = hits[: self.topk]
+        contexts = await self._expand_by_context_async(selected)
+
+        output, usage = await self.answerer.aanswer(question=question, contexts=contexts)
+
+        meta = self._build_meta(hits=hits, selected=selected, contexts=contexts)
+        await self.async_query_log_repo.update(
+            id=query_log.id,
+            selected_chunk_ids=meta.selected_chunk_ids,
+            expended_chunk_ids=meta.expended_chunk_ids,
+            answer=output.answer,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            meta=meta.to_dict(),
+            query_embedding=embedding,
+        )
+        if self.answer_cache is not None:
+            self.answer_cache.add(
+                query_log_id=query_log.id,
+                embedding=embedding,
+                answer=output.answer,
+                chunk_hashes=meta.chunk_hashes,
+                sources={c.chunk_id: c.domain for c in selected},
+            )
+
+        return AskResult(answer=output.answer, hits=hits)
+
+    async def search_similar_chunks_async(
+        self,
+        domain: Domain,
+        embedding: list[float],
+        *,
+        filter_expr: str | None = None,
+    ) -> list[VectorSearchChunk]:
+        pairs = await self.async_vector_store_repo.search(
+            domain=domain,
+            embedding=embedding,
+            top_k=self.topk,
+            filter_expr=filter_expr,
+        )
+        if not pairs:
+            return []
+
+        chunks = await self.async_chunk_repo.get_by_ids([cid for cid, _ in pairs])
+        return self._to_search_chunks(domain=domain, pairs=pairs, chunk_map={chunk.id: chunk for chunk in chunks})
+
+    async def search_all_domain_async(
+        self,
+        embedding: list[float],
+        *,
+        filter_expr: str | None = None,
+    ) -> list[VectorSearchChunk]:
+        results = await asyncio.gather(
+            *(self.search_similar_chunks_async(domain, embedding, filter_expr=filter_expr) for domain in Domain)
+        )
+
+        hits = [hit for result in results for hit in result]
+        hits.sort(key=lambda x: x.score, reverse=True)
+        return hits
+
+    async def _expand_by_context_async(self, hits: list[VectorSearchChunk]) -> list[VectorSearchChunk]:
+        targets = {(hit.chunk.document_id, hit.chunk.context_id): hit for hit in hits}
+        if not targets:
+            return []
+
+        chunks_by_context = await self.async_chunk_repo.list_by_contexts(pairs=list(targets.keys()))
+        return self._to_expanded_chunks(targets=targets, chunks_by_context=chunks_by_context)
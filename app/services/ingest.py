@@ -1,12 +1,114 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from itertools import batched
+
+from app.enums import SourceType
+from app.models.base import Chunk, Document, DocumentHeader
 from app.repositories.chunk import ChunkRepository
 from app.repositories.document import DocumentRepository
+from app.repositories.embedding_store import EmbeddingStoreRepository
 from app.repositories.ingestor import Ingestor
-from app.repositories.llm import Embedder
+from app.repositories.llm import Embedder, EmbeddingBatchError
 from app.repositories.query_log import QueryLogRepository
-from app.repositories.vector_store import VectorStoreRepository
+from app.repositories.vector_store import VectorStoreRepository, VectorStoreWriter
+from app.utils import compute_content_hash
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ChunkDiff:
+    added: list[Chunk] = field(default_factory=list)
+    # 그대로 유지된 청크는 개수만 센다 (큰 문서에서 전부 들고 있지 않도록)
+    kept: int = 0
+    moved: list[Chunk] = field(default_factory=list)
+    removed: list[Chunk] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class IngestStats:
+    """ingest_pipeline 진행 상황 (처리량 출력용)"""
+
+    started: float = field(default_factory=time.perf_counter)
+    documents: int = 0
+    skipped: int = 0
+    failed: int = 0
+    chunks: int = 0
+    embedded_chunks: int = 0
+    embedded_tokens: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def rates(self) -> tuple[float, float, float]:
+        """(documents/s, chunks/s, embedding tokens/s)"""
+        elapsed = max(self.elapsed, 1e-9)
+        return self.documents / elapsed, self.chunks / elapsed, self.embedded_tokens / elapsed
+
+
+@dataclass(slots=True)
+class _PipelineItem:
+    source_id: str
+    ingestor: Ingestor | None = None
+    doc: Document | None = None
+    # None 이면 큰 문서: 청크는 쓰기 단계에서 ingestor.get_chunks 로 흘려 가며 배치 단위로 처리
+    chunks: list[Chunk] | None = None
+    document: DocumentHeader | None = None
+    diff: ChunkDiff | None = None
+    embeddings: list[list[float]] = field(default_factory=list)
+    result: dict | None = None
+    error: str | None = None
+
+
+_DONE = object()
+_POLL_SECONDS = 0.5
+
+
+def _put(q: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """stop 되면 False (소비자가 사라진 경우 블로킹 방지)"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> object | None:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return None
+
+
+def _prepare_document(ingestor: Ingestor) -> tuple[Document, list[Chunk] | None]:
+    """
+    프로세스 풀 작업: 읽기 -> 청킹 -> chunk_hash 계산.
+    스트리밍으로 읽은 큰 문서(streamed)는 청크를 만들지 않는다 (전체 청크를 메모리에 두거나 프로세스 간에 넘기지 않도록)
+    """
+    doc = ingestor.build_document()
+    if doc.streamed is not None:
+        return doc, None
+    chunks = [replace(c, chunk_hash=compute_content_hash(c.chunk_text)) for c in ingestor.get_chunks(doc)]
+    return doc, chunks
 
 
 class IngestService:
+    _LIST_PAGE_SIZE = 500
+    # 문서 하나의 새 청크를 이 개수씩 임베딩/저장 (큰 문서도 청크/벡터는 배치 하나만큼만 메모리에 둠)
+    _WRITE_BATCH_ROWS = 500
+
     def __init__(
         self,
         *,
@@ -15,36 +117,460 @@ class IngestService:
         query_log_repo: QueryLogRepository,
         vector_store_repo: VectorStoreRepository,
         embedder: Embedder,
+        embedding_store: EmbeddingStoreRepository | None = None,
     ):
         self.chunk_repo = chunk_repo
         self.document_repo = document_repo
         self.query_log_repo = query_log_repo
         self.vector_store_repo = vector_store_repo
         self.embedder = embedder
+        self.embedding_store = embedding_store
 
     def ingest(self, ingestor: Ingestor) -> dict:
+        return self._ingest(ingestor, self.vector_store_repo)
+
+    def changed_sources(self, source_type: SourceType, versions: dict[str, str]) -> list[str]:
+        """
+        출처에서 받은 source_id -> 버전 중 저장된 source_version 과 다른(또는 처음 보는) source_id.
+        내용을 가져오기 전에 걸러내는 용도라, 버전을 알려주는 출처(Notion last_edited_time 등)에서만 의미가 있다.
+        """
+        stored = self.document_repo.get_source_versions(source_type=source_type, source_ids=list(versions))
+        return [source_id for source_id, version in versions.items() if stored.get(source_id) != version]
+
+    def list_source_ids(self, source_type: SourceType, prefix: str = "") -> list[str]:
+        """저장된(삭제되지 않은) 문서 중 source_id 가 prefix 로 시작하는 것. 출처 전체 비교로 사라진 문서를 찾는 용도"""
+        return self.document_repo.list_source_ids(source_type=source_type, prefix=prefix)
+
+    def delete_source(self, source_type: SourceType, source_id: str) -> bool:
+        """출처에서 사라진 문서를 청크/벡터와 함께 삭제. 저장된 문서가 없으면 False"""
+        document = self.document_repo.get_header_by_source(source_type=source_type, source_id=source_id)
+        if document is None:
+            return False
+
+        chunk_ids = [c.id for c in self._list_chunk_keys(document.id)]
+        if chunk_ids:
+            self.vector_store_repo.bulk_delete(domain=document.domain, chunk_ids=chunk_ids)
+            self.chunk_repo.delete_by_ids(document_id=document.id, chunk_ids=chunk_ids)
+        self.document_repo.delete(document.id)
+        return True
+
+    def ingest_many(self, ingestors: Iterable[Ingestor], *, flush_rows: int | None = None) -> Iterator[dict]:
+        """
+        여러 문서를 하나의 벡터 저장소 세션으로 적재 (쓰기 버퍼링, flush 는 세션 종료 시 한 번).
+        문서 단위 결과는 DB 반영 직후 반환되며, 벡터는 세션이 끝날 때까지 검색에 보이지 않을 수 있다.
+        """
+        with self.vector_store_repo.ingest_session(flush_rows=flush_rows) as session:
+            for ingestor in ingestors:
+                yield self._ingest(ingestor, session)
+
+    def ingest_pipeline(
+        self,
+        ingestors: Iterable[Ingestor],
+        *,
+        workers: int = 4,
+        executor: str = "process",
+        queue_size: int = 64,
+        embed_batch_rows: int = 1024,
+        flush_rows: int | None = None,
+        stats: IngestStats | None = None,
+    ) -> Iterator[dict]:
+        """
+        대량 적재용 스트리밍 파이프라인. 각 단계는 크기가 제한된 큐로 연결된다.
+        1. 읽기/청킹: executor="process" 면 프로세스 풀 (파일 등 CPU 위주),
+           "thread" 면 스레드 풀 (Notion 등 API 호출 위주). workers=0 이면 2번 단계 스레드에서 직접
+        2. 문서 upsert + 청크 diff: 스레드
+        3. 여러 문서의 새 청크를 embed_batch_rows 단위로 모아 임베딩: 스레드
+        4. 청크 bulk insert + 벡터 저장 (ingest_session): 호출한 스레드.
+           스트리밍으로 읽은 큰 문서(streamed)는 여기서 청크를 읽어 가며 배치 단위로 임베딩/저장한다
+        결과는 완료 순서대로 반환. 실패한 문서는 error 를 채워 반환하고 나머지는 계속 진행한다.
+        """
+        stats = stats if stats is not None else IngestStats()
+        stop = threading.Event()
+        to_embed: queue.Queue = queue.Queue(maxsize=queue_size)
+        to_write: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        threads = [
+            threading.Thread(
+                target=self._pipeline_prepare,
+                args=(ingestors, workers, executor, queue_size, to_embed, stop),
+                name="koo-ingest-prepare",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._pipeline_embed,
+                args=(to_embed, to_write, embed_batch_rows, stats, stop),
+                name="koo-ingest-embed",
+                daemon=True,
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            with self.vector_store_repo.ingest_session(flush_rows=flush_rows) as session:
+                while True:
+                    item = to_write.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield self._pipeline_write(item, session, stats)
+        finally:
+            # 중간에 멈춰도 upsert 까지만 된 문서는 content_hash 가 비어 있어 다음 적재에서 다시 처리됨
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _prepared_items(
+        self,
+        ingestors: Iterable[Ingestor],
+        workers: int,
+        executor: str,
+        max_pending: int,
+        stop: threading.Event,
+    ) -> Iterator[_PipelineItem]:
+        if workers <= 0:
+            for ingestor in ingestors:
+                try:
+                    doc, chunks = _prepare_document(ingestor)
+                except Exception as e:
+                    logger.exception("ingest failed: %s", ingestor.source_id)
+                    yield _PipelineItem(source_id=ingestor.source_id, error=f"{type(e).__name__}: {e}")
+                    continue
+                yield _PipelineItem(source_id=ingestor.source_id, ingestor=ingestor, doc=doc, chunks=chunks)
+            return
+
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="koo-ingest-read")
+        else:
+            # fork 는 실행 중인 스레드(저장소 백그라운드 작업 등)와 섞이면 위험하므로 spawn 사용
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pending: dict[Future, Ingestor] = {}
+        it = iter(ingestors)
+        exhausted = False
+        try:
+            while not stop.is_set():
+                while not exhausted and len(pending) < max_pending:
+                    ingestor = next(it, None)
+                    if ingestor is None:
+                        exhausted = True
+                        break
+                    pending[pool.submit(_prepare_document, ingestor)] = ingestor
+
+                if not pending:
+                    return
+
+                done, _ = wait(pending, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ingestor = pending.pop(future)
+                    try:
+                        doc, chunks = future.result()
+                    except Exception as e:
+                        logger.exception("ingest failed: %s", ingestor.source_id)
+                        yield _PipelineItem(source_id=ingestor.source_id, error=f"{type(e).__name__}: {e}")
+                        continue
+                    yield _PipelineItem(source_id=ingestor.source_id, ingestor=ingestor, doc=doc, chunks=chunks)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _pipeline_prepare(
+        self,
+        ingestors: Iterable[Ingestor],
+        workers: int,
+        executor: str,
+        max_pending: int,
+        out: queue.Queue,
+        stop: threading.Event,
+    ) -> None:
+        try:
+            for item in self._prepared_items(ingestors, workers, executor, max_pending, stop):
+                if item.error is None:
+                    self._pipeline_diff(item)
+                if not _put(out, item, stop):
+                    return
+            _put(out, _DONE, stop)
+        except BaseException as e:  # noqa: BLE001 - 쓰기 단계(호출 스레드)에서 다시 raise
+            _put(out, e, stop)
+
+    def _pipeline_diff(self, item: _PipelineItem) -> None:
+        doc = item.doc
+        try:
+            item.document, changed = self.document_repo.upsert(
+                domain=doc.domain,
+                source_type=doc.source_type,
+                source_id=doc.source_id,
+                title=doc.title,
+                raw_content=doc.raw_content,
+                source_version=doc.source_version,
+                streamed=doc.streamed,
+            )
+            if not changed:
+                item.result = {"document_id": item.document.id, "chunks": 0, "changed": False, "kept": 0, "deleted": 0}
+                return
+            if item.chunks is None:
+                # 큰 문서는 diff 도 쓰기 단계(_sync_chunks)에서 청크를 흘려 가며 계산
+                return
+            item.diff = self._diff_chunks(self._list_chunk_keys(item.document.id), item.chunks)
+        except Exception as e:
+            logger.exception("ingest failed: %s", item.source_id)
+            self._fail(item, e)
+
+    def _pipeline_embed(
+        self,
+        inp: queue.Queue,
+        out: queue.Queue,
+        batch_rows: int,
+        stats: IngestStats,
+        stop: threading.Event,
+    ) -> None:
+        try:
+            while True:
+                item = _get(inp, stop)
+                if item is None:
+                    return
+
+                # 밀려 있는 문서를 batch_rows 까지 모아서 한 번에 임베딩 (upstream 이 느리면 있는 만큼만)
+                batch: list[_PipelineItem] = []
+                rows = 0
+                while isinstance(item, _PipelineItem):
+                    batch.append(item)
+                    rows += len(item.diff.added) if item.diff else 0
+                    if rows >= batch_rows:
+                        item = None
+                        break
+                    try:
+                        item = inp.get_nowait()
+                    except queue.Empty:
+                        item = None
+
+                self._embed_items(batch, stats)
+                for pending in batch:
+                    if not _put(out, pending, stop):
+                        return
+                if item is not None:
+                    # _DONE 또는 upstream 예외
+                    _put(out, item, stop)
+                    return
+        except BaseException as e:  # noqa: BLE001 - 쓰기 단계(호출 스레드)에서 다시 raise
+            _put(out, e, stop)
+
+    def _embed_items(self, items: list[_PipelineItem], stats: IngestStats) -> None:
+        pending = [item for item in items if item.diff is not None and item.error is None]
+        chunks = [chunk for item in pending for chunk in item.diff.added]
+        error: Exception | None = None
+        try:
+            embeddings = self._embed_chunks(chunks, stats)
+        except EmbeddingBatchError as e:
+            # 벡터를 모두 받은 문서는 계속 진행하고, 실패한 배치에 걸린 문서만 실패 처리
+            embeddings, error = e.embeddings, e
+        except Exception as e:
+            logger.exception("embedding failed: %d documents", len(pending))
+            for item in pending:
+                self._fail(item, e)
+            return
+
+        offset = 0
+        for item in pending:
+            item.embeddings = embeddings[offset : offset + len(item.diff.added)]
+            offset += len(item.diff.added)
+            if error is not None and any(v is None for v in item.embeddings):
+                logger.warning("ingest failed: %s (%s)", item.source_id, error)
+                self._fail(item, error)
+
+    def _pipeline_write(self, item: _PipelineItem, vector_store: VectorStoreWriter, stats: IngestStats) -> dict:
+        if item.error is None and item.result is None:
+            try:
+                if item.diff is None:
+                    item.result = self._sync_chunks(item.ingestor, item.doc, item.document.id, vector_store, stats)
+                else:
+                    added = [(item.diff.added, item.embeddings)]
+                    item.result = self._apply_diff(item.doc, item.document.id, item.diff, added, vector_store)
+                self.document_repo.finalize(item.document)
+            except Exception as e:
+                logger.exception("ingest failed: %s", item.source_id)
+                self._fail(item, e)
+
+        stats.documents += 1
+        if item.error is not None:
+            stats.failed += 1
+            document_id = item.document.id if item.document else None
+            return {"source_id": item.source_id, "document_id": document_id, "error": item.error}
+
+        if not item.result["changed"]:
+            stats.skipped += 1
+        stats.chunks += item.result["chunks"]
+        return {"source_id": item.source_id, **item.result, "error": None}
+
+    @staticmethod
+    def _fail(item: _PipelineItem, error: Exception) -> None:
+        # upsert 까지 된 문서는 content_hash 가 비어 있으므로 다음 적재에서 다시 처리됨
+        item.error = f"{type(error).__name__}: {error}"
+
+    def _ingest(self, ingestor: Ingestor, vector_store: VectorStoreWriter) -> dict:
         doc = ingestor.build_document()
-        document = self.document_repo.upsert(
+        document, changed = self.document_repo.upsert(
             domain=doc.domain,
             source_type=doc.source_type,
             source_id=doc.source_id,
             title=doc.title,
             raw_content=doc.raw_content,
+            source_version=doc.source_version,
+            streamed=doc.streamed,
         )
-        if document and document.id:
-            self.chunk_repo.delete_by_document(document_id=document.id)
+        if not changed:
+            # 내용이 그대로면 청크/임베딩/벡터 모두 건너뜀
+            return {"document_id": document.id, "chunks": 0, "changed": False, "kept": 0, "deleted": 0}
 
-        chunks = ingestor.get_chunks(doc)
-        chunks = self.chunk_repo.bulk_create(document_id=document.id, chunks=chunks)
+        # 실패하면 content_hash 가 비어 있는 채로 남아 다음 적재에서 다시 처리됨
+        result = self._sync_chunks(ingestor, doc, document.id, vector_store)
+        self.document_repo.finalize(document)
+        return result
 
-        texts = [c.chunk_text for c in chunks]
-        embeddings = self.embedder.embed_documents(texts)
+    def _sync_chunks(
+        self,
+        ingestor: Ingestor,
+        doc: Document,
+        document_id: int,
+        vector_store: VectorStoreWriter,
+        stats: IngestStats | None = None,
+    ) -> dict:
+        """
+        chunk_hash 기준 청크 단위 diff.
+        - 같은 텍스트의 청크는 id(=벡터)를 유지하고 위치(context_id, chunk_index)만 갱신
+        - 새 텍스트만 임베딩/벡터 저장, 사라진 청크는 DB/벡터 저장소에서 삭제
+        get_chunks 를 순서대로 소비하면서 새 청크를 _WRITE_BATCH_ROWS 개씩 임베딩 -> 저장하므로
+        문서가 커도 새 청크/벡터는 배치 하나만큼만 메모리에 둔다.
+        """
+        diff = ChunkDiff()
+        added = self._match_chunks(self._list_chunk_keys(document_id), ingestor.get_chunks(doc), diff)
+        # 배치마다 임베딩을 먼저 계산: 실패 시 벡터 없는 청크 행이 남지 않도록
+        embedded = (
+            (batch, self._embed_chunks(batch, stats)) for batch in map(list, batched(added, self._WRITE_BATCH_ROWS))
+        )
+        return self._apply_diff(doc, document_id, diff, embedded, vector_store)
 
-        self.vector_store_repo.bulk_upsert(
-            domain=doc.domain,
-            source_type=doc.source_type,
-            chunk_ids=[c.id for c in chunks],
-            embeddings=embeddings,
+    def _apply_diff(
+        self,
+        doc: Document,
+        document_id: int,
+        diff: ChunkDiff,
+        added: Iterable[tuple[list[Chunk], list[list[float]]]],
+        vector_store: VectorStoreWriter,
+    ) -> dict:
+        """added: (새 청크, 벡터) 배치. 배치를 모두 저장한 뒤 diff 의 moved / removed 를 반영한다"""
+        created = sum(
+            self._create_chunks(doc, document_id, chunks, embeddings, vector_store) for chunks, embeddings in added
         )
 
-        return {"document_id": document.id, "chunks": chunks}
+        if diff.moved:
+            self.chunk_repo.update_positions(document_id=document_id, chunks=diff.moved)
+
+        if diff.removed:
+            removed_ids = [c.id for c in diff.removed]
+            self.chunk_repo.delete_by_ids(document_id=document_id, chunk_ids=removed_ids)
+            vector_store.bulk_delete(domain=doc.domain, chunk_ids=removed_ids)
+
+        return {
+            "document_id": document_id,
+            "chunks": created,
+            "changed": True,
+            "kept": diff.kept,
+            "deleted": len(diff.removed),
+        }
+
+    def _create_chunks(
+        self,
+        doc: Document,
+        document_id: int,
+        chunks: list[Chunk],
+        embeddings: list[list[float]],
+        vector_store: VectorStoreWriter,
+    ) -> int:
+        created = self.chunk_repo.bulk_create(document_id=document_id, chunks=chunks)
+        if created:
+            try:
+                vector_store.bulk_upsert(
+                    domain=doc.domain,
+                    source_type=doc.source_type,
+                    chunk_ids=[c.id for c in created],
+                    embeddings=embeddings,
+                )
+            except Exception:
+                self.chunk_repo.delete_by_ids(document_id=document_id, chunk_ids=[c.id for c in created])
+                raise
+        return len(created)
+
+    def _embed_chunks(self, chunks: list[Chunk], stats: IngestStats | None = None) -> list[list[float]]:
+        """
+        embedding_store 에 있는 chunk_hash 는 재사용하고, 없는 텍스트만(중복 제거 후) provider 로 임베딩
+        """
+        if not chunks:
+            return []
+
+        hashes = [c.chunk_hash or compute_content_hash(c.chunk_text) for c in chunks]
+        vectors = self.embedding_store.get_many(hashes) if self.embedding_store else {}
+
+        misses = {h: c.chunk_text for h, c in zip(hashes, chunks) if h not in vectors}
+        if misses:
+            texts = list(misses.values())
+            # 토큰 수는 한 번만 세서 통계와 배치 분할에 함께 사용
+            token_counts = [self.embedder.count_tokens(text) for text in texts]
+            if stats is not None:
+                stats.embedded_chunks += len(misses)
+                stats.embedded_tokens += sum(token_counts)
+            try:
+                embedded = dict(zip(misses, self.embedder.embed_documents(texts, token_counts)))
+            except EmbeddingBatchError as e:
+                # 성공한 배치는 저장해 두고 재시도 시 실패한 배치만 다시 임베딩
+                partial = {h: v for h, v in zip(misses, e.embeddings) if v is not None}
+                if self.embedding_store:
+                    self.embedding_store.put_many(partial)
+                vectors.update(partial)
+                raise EmbeddingBatchError(str(e), [vectors.get(h) for h in hashes]) from e
+            if self.embedding_store:
+                self.embedding_store.put_many(embedded)
+            vectors.update(embedded)
+
+        return [vectors[h] for h in hashes]
+
+    def _list_chunk_keys(self, document_id: int) -> list[Chunk]:
+        """문서의 청크 키 (chunk_text 없음). id 기준 keyset 페이지로 읽는다"""
+        chunks: list[Chunk] = []
+        while True:
+            page = self.chunk_repo.list_keys_by_document(
+                document_id=document_id,
+                after_id=chunks[-1].id if chunks else 0,
+                limit=self._LIST_PAGE_SIZE,
+            )
+            chunks.extend(page)
+            if len(page) < self._LIST_PAGE_SIZE:
+                return chunks
+
+    @classmethod
+    def _diff_chunks(cls, existing: list[Chunk], chunks: Iterable[Chunk]) -> ChunkDiff:
+        diff = ChunkDiff()
+        diff.added = list(cls._match_chunks(existing, chunks, diff))
+        return diff
+
+    @staticmethod
+    def _match_chunks(existing: list[Chunk], chunks: Iterable[Chunk], diff: ChunkDiff) -> Iterator[Chunk]:
+        """
+        chunks 를 순서대로 기존 청크와 맞춰 보고 새 청크만 반환 (diff.added 는 채우지 않음).
+        diff.kept(개수) / moved 는 소비하는 동안, diff.removed 는 끝까지 소비한 뒤에 채워진다.
+        """
+        by_hash: dict[str, deque[Chunk]] = defaultdict(deque)
+        for chunk in sorted(existing, key=lambda c: c.chunk_index):
+            by_hash[chunk.chunk_hash].append(chunk)
+
+        for chunk in chunks:
+            candidates = by_hash.get(chunk.chunk_hash or compute_content_hash(chunk.chunk_text))
+            if not candidates:
+                yield chunk
+                continue
+
+            old = candidates.popleft()
+            diff.kept += 1
+            if (old.context_id, old.chunk_index) != (chunk.context_id, chunk.chunk_index):
+                diff.moved.append(replace(old, context_id=chunk.context_id, chunk_index=chunk.chunk_index))
+
+        diff.removed = [chunk for candidates in by_hash.values() for chunk in candidates]
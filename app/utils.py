@@ -1,6 +1,8 @@
 import gzip
 import hashlib
 import re
+import struct
+from array import array
 from datetime import datetime
 
 import pytz
@@ -48,5 +50,60 @@ def gzip_compress_text(text: str, *, level: int = 6) -> bytes:
     return gzip.compress(text.encode("utf-8"), compresslevel=level)
 
 
+class ContentDigest:
+    """
+    compute_content_hash 를 텍스트 조각 단위로 계산 (조각을 이어 붙인 결과와 같은 값).
+    정규화의 strip 을 위해 뒤쪽 공백은 다음 조각이 올 때까지 보류한다.
+    """
+
+    def __init__(self):
+        self._sha = hashlib.sha256()
+        self._started = False
+        self._pending = ""
+        self._carry_cr = False
+
+    def update(self, piece: str) -> None:
+        # 조각 경계에 걸친 "\r\n" 도 한 줄바꿈으로
+        if self._carry_cr and piece.startswith("\n"):
+            piece = piece[1:]
+        self._carry_cr = piece.endswith("\r")
+        piece = piece.replace("\r\n", "\n").replace("\r", "\n")
+
+        if not self._started:
+            piece = piece.lstrip()
+            if not piece:
+                return
+            self._started = True
+
+        text = self._pending + piece
+        body = text.rstrip()
+        self._pending = text[len(body) :]
+        # 보류한 공백까지 붙인 뒤 자르므로 [ \t]+ 연속 구간이 조각 경계에서 나뉘지 않는다
+        self._sha.update(re.sub(r"[ \t]+", " ", body).encode("utf-8"))
+
+    def finish(self) -> str:
+        """content_hash"""
+        return self._sha.hexdigest()
+
+
 def gzip_decompress_text(blob: bytes) -> str:
     return gzip.decompress(blob).decode("utf-8")
+
+
+def pack_embedding(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack_embedding(blob: bytes) -> list[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+def pack_embedding_f16(vector: list[float]) -> bytes:
+    """float16 직렬화 (float32 대비 절반 크기, 저장용)"""
+    return struct.pack(f"<{len(vector)}e", *vector)
+
+
+def unpack_embedding_f16(blob: bytes) -> list[float]:
+    return list(struct.unpack(f"<{len(blob) // 2}e", blob))
@@ -14,19 +14,55 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Vector store ("milvus" | "numpy")
+    VECTOR_STORE: str = "milvus"
+    # ingest_session 버퍼가 이 행 수에 도달하면 쓰기 전송
+    VECTOR_STORE_FLUSH_ROWS: int = 10_000
 
     # Milvus
     MILVUS_HOST: str = "127.0.0.1"
     MILVUS_PORT: int = 19530
+    MILVUS_USER: str = ""
+    MILVUS_PASSWORD: str = ""
+    MILVUS_DB_NAME: str = "default"
+    # "per_domain": 도메인별 컬렉션 / "partitioned": 단일 컬렉션 + domain partition key
+    MILVUS_LAYOUT: str = "per_domain"
+    # 이 시간(초) 동안 검색되지 않은 컬렉션은 release (0 이면 release 하지 않음)
+    MILVUS_COLLECTION_IDLE_TTL: float = 1800
+    # 검색 파라미터 (비우면 컬렉션 인덱스에 맞춰 자동 결정). 예: {"nprobe": 32} / {"ef": 128}
+    MILVUS_SEARCH_PARAMS: dict = {}
+    MILVUS_CONSISTENCY_LEVEL: str | None = None
+
+    # NumPy (in-process vector store)
+    NUMPY_VECTOR_STORE_PATH: str = ".koo/vectors"
+    NUMPY_VECTOR_STORE_DTYPE: str = "float32"
+    # 변경된 도메인 파일을 저장하기까지 모으는 시간(초)
+    NUMPY_VECTOR_STORE_FLUSH_INTERVAL: float = 1.0
 
     # Embedding
     EMBEDDING_PROVIDER: str = "openai"
     EMBEDDING_MODEL: str = "openai:text-embedding-3-small"
     EMBEDDING_DIM: int = 1536
+    # embed_documents 요청 분할 (요청당 최대 입력 수/토큰 수), 동시 요청 수, 배치별 재시도 횟수
+    EMBEDDING_BATCH_MAX_ITEMS: int = 256
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100_000
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_BATCH_RETRIES: int = 3
+
+    # Embedding store (chunk_hash 기준 문서 임베딩 재사용)
+    EMBEDDING_STORE_ENABLED: bool = True
+
+    # Embedding cache (질의 임베딩 캐시, SIZE=0 이면 비활성화)
+    EMBEDDING_CACHE_SIZE: int = 1024
+    EMBEDDING_CACHE_PATH: str | None = None
+    EMBEDDING_CACHE_DISK_MAX_ENTRIES: int = 100_000
 
     # LLM
     LLM_PROVIDER: str = "openai"
     LLM_MODEL: str = "openai-responses:gpt-4.1-mini"
+    CONTEXT_MAX_TOKENS: int = 1500
 
     OPENAI_API_KEY: str | None = None
 
@@ -35,9 +71,39 @@ class Settings(BaseSettings):
 
     # Notion
     NOTION_API_TOKEN: str | None = None
+    # 초당 요청 수 (Notion 평균 허용치 3), 블록 트리 동시 조회 수
+    NOTION_RATE_LIMIT: float = 3.0
+    NOTION_MAX_WORKERS: int = 4
+
+    # Slack
+    SLACK_BOT_TOKEN: str | None = None
+    # watermark 이전 스레드에 달린 답글을 찾기 위해 다시 훑는 기간
+    SLACK_LOOKBACK_DAYS: float = 7
+
+    # File ingest: 이보다 큰 파일은 한 번에 읽지 않고 줄 단위로 스트리밍 (해시도 점진적으로 계산하고 본문은 저장하지 않음)
+    FILE_STREAM_THRESHOLD: int = 32 * 1024 * 1024
+
+    # Query log (write-behind)
+    QUERY_LOG_WRITE_BEHIND: bool = True
+    QUERY_LOG_BATCH_SIZE: int = 200
+    QUERY_LOG_FLUSH_INTERVAL: float = 1.0
+    QUERY_LOG_MAX_QUEUE: int = 10_000
+    # 쓰기 전에 id 를 정하기 위해 한 번에 예약하는 query_log id 개수
+    QUERY_LOG_ID_BLOCK_SIZE: int = 1000
+
+    # Chunk cache (청크 read-through 캐시, 0 이면 비활성화)
+    CHUNK_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # 다른 프로세스의 쓰기를 반영하기 위해 캐시된 청크를 다시 조회하는 주기(초)
+    CHUNK_CACHE_TTL: float = 300.0
 
     # Etc
     TOPK: int = 8
+    SEARCH_MAX_WORKERS: int = 4
+
+    # Answer cache (유사 질문 답변 재사용)
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_THRESHOLD: float = 0.95
+    ANSWER_CACHE_MAX_ENTRIES: int = 2000
 
 
 settings = Settings()
@@ -1,10 +1,21 @@
 from dependency_injector import containers, providers
 
-from app.services import AskService, IngestService
+from app.services import AnswerCache, AskService, IngestService
 from config import settings
 from container.factory import IngestorFactory, LLMFactory
-from infra.db.impl import ChunkRepositoryImpl, DocumentRepositoryImpl, QueryLogRepositoryImpl
-from infra.vector_store.milvus.impl import MilvusRepositoryImpl
+from infra.db.impl import (
+    AsyncChunkRepositoryImpl,
+    AsyncQueryLogRepositoryImpl,
+    BufferedQueryLogRepositoryImpl,
+    CachedChunkRepositoryImpl,
+    ChunkRepositoryImpl,
+    DocumentRepositoryImpl,
+    EmbeddingStoreRepositoryImpl,
+    QueryLogRepositoryImpl,
+    SyncStateRepositoryImpl,
+)
+from infra.vector_store.local.impl import AsyncNumpyRepositoryImpl, NumpyRepositoryImpl
+from infra.vector_store.milvus.impl import AsyncMilvusRepositoryImpl, MilvusRepositoryImpl
 
 
 class Container(containers.DeclarativeContainer):
@@ -13,7 +24,7 @@ class Container(containers.DeclarativeContainer):
     ingestor_factory = providers.Singleton(IngestorFactory)
 
     # --- LLM / Embedding ---
-    embedder = providers.Factory(
+    embedder = providers.Singleton(
         lambda factory: factory.create_embedder(settings.EMBEDDING_PROVIDER),
         factory=llm_factory,
     )
@@ -23,10 +34,66 @@ class Container(containers.DeclarativeContainer):
     )
 
     # --- Repositories ---
-    chunk_repo = providers.Singleton(ChunkRepositoryImpl)
+    chunk_db_repo = providers.Singleton(ChunkRepositoryImpl)
+    chunk_repo = providers.Singleton(
+        lambda repo: (
+            CachedChunkRepositoryImpl(repo, max_bytes=settings.CHUNK_CACHE_MAX_BYTES, ttl=settings.CHUNK_CACHE_TTL)
+            if settings.CHUNK_CACHE_MAX_BYTES > 0
+            else repo
+        ),
+        chunk_db_repo,
+    )
     document_repo = providers.Singleton(DocumentRepositoryImpl)
-    query_log_repo = providers.Singleton(QueryLogRepositoryImpl)
+    query_log_repo = providers.Singleton(
+        lambda: (
+            BufferedQueryLogRepositoryImpl(
+                batch_size=settings.QUERY_LOG_BATCH_SIZE,
+                flush_interval=settings.QUERY_LOG_FLUSH_INTERVAL,
+                max_queue=settings.QUERY_LOG_MAX_QUEUE,
+                id_block_size=settings.QUERY_LOG_ID_BLOCK_SIZE,
+            )
+            if settings.QUERY_LOG_WRITE_BEHIND
+            else QueryLogRepositoryImpl()
+        )
+    )
+    sync_state_repo = providers.Singleton(SyncStateRepositoryImpl)
     milvus = providers.Singleton(MilvusRepositoryImpl)
+    numpy_store = providers.Singleton(
+        NumpyRepositoryImpl,
+        path=settings.NUMPY_VECTOR_STORE_PATH,
+        dim=settings.EMBEDDING_DIM,
+        dtype=settings.NUMPY_VECTOR_STORE_DTYPE,
+        flush_interval=settings.NUMPY_VECTOR_STORE_FLUSH_INTERVAL,
+    )
+    vector_store = providers.Selector(
+        providers.Callable(lambda: settings.VECTOR_STORE),
+        milvus=milvus,
+        numpy=numpy_store,
+    )
+
+    # --- Async Repositories (ask_async) ---
+    async_chunk_repo = providers.Singleton(AsyncChunkRepositoryImpl)
+    async_query_log_repo = providers.Singleton(AsyncQueryLogRepositoryImpl)
+    async_vector_store = providers.Selector(
+        providers.Callable(lambda: settings.VECTOR_STORE),
+        milvus=providers.Singleton(AsyncMilvusRepositoryImpl),
+        numpy=providers.Singleton(AsyncNumpyRepositoryImpl, repo=numpy_store),
+    )
+
+    # --- Caches ---
+    embedding_store = providers.Singleton(
+        EmbeddingStoreRepositoryImpl,
+        model=settings.EMBEDDING_MODEL,
+        dim=settings.EMBEDDING_DIM,
+    )
+    answer_cache = providers.Singleton(
+        AnswerCache,
+        query_log_repo=query_log_repo,
+        # 답변 재사용 전 근거 청크 확인은 (다른 프로세스의 쓰기도 보이도록) 캐시를 거치지 않고 DB 에서
+        chunk_repo=chunk_db_repo,
+        threshold=settings.ANSWER_CACHE_THRESHOLD,
+        max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    )
 
     # --- Pipeline / Services ---
     ingest_service = providers.Factory(
@@ -34,15 +101,21 @@ class Container(containers.DeclarativeContainer):
         chunk_repo=chunk_repo,
         document_repo=document_repo,
         query_log_repo=query_log_repo,
-        vector_store_repo=milvus,
+        vector_store_repo=vector_store,
         embedder=embedder,
+        embedding_store=embedding_store if settings.EMBEDDING_STORE_ENABLED else None,
     )
     ask_service = providers.Factory(
         AskService,
         chunk_repo=chunk_repo,
         query_log_repo=query_log_repo,
-        vector_store_repo=milvus,
+        vector_store_repo=vector_store,
         embedder=embedder,
         answerer=answerer,
         topk=settings.TOPK,
+        search_max_workers=settings.SEARCH_MAX_WORKERS,
+        answer_cache=answer_cache if settings.ANSWER_CACHE_ENABLED else None,
+        async_chunk_repo=async_chunk_repo,
+        async_query_log_repo=async_query_log_repo,
+        async_vector_store_repo=async_vector_store,
     )
@@ -11,19 +11,26 @@ class IngestorFactory:
         *,
         title: str | None = None,
         content: str | None = None,
+        **options,
     ) -> Ingestor:
+        """options: ingestor 별 추가 인자 (예: NotionIngestor 의 client, last_edited_time / SlackIngestor 의 client, message / GitIngestor 의 repo, commit)"""
         default_args = {
             "domain": domain,
             "source_id": source_id,
             "title": title,
             "content": content,
+            **options,
         }
 
         match source_type:
             case SourceType.GITHUB:
-                raise NotImplementedError()
+                from infra.ingestor.git import GitIngestor
+
+                return GitIngestor(**default_args)
             case SourceType.SLACK:
-                raise NotImplementedError()
+                from infra.ingestor.slack import SlackIngestor
+
+                return SlackIngestor(**default_args)
             case SourceType.NOTION:
                 from infra.ingestor.notion import NotionIngestor
 
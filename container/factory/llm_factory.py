@@ -1,9 +1,25 @@
 from app.repositories.llm import Answerer as AnswererRepository
 from app.repositories.llm import Embedder as EmbedderRepository
+from config import settings
 
 
 class LLMFactory:
     def create_embedder(self, provider: str) -> EmbedderRepository:
+        embedder = self._create_provider_embedder(provider)
+        if settings.EMBEDDING_CACHE_SIZE <= 0:
+            return embedder
+
+        from infra.llm.impl.cached import CachedEmbedder
+
+        return CachedEmbedder(
+            embedder,
+            model=settings.EMBEDDING_MODEL,
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            disk_path=settings.EMBEDDING_CACHE_PATH,
+            disk_max_entries=settings.EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+        )
+
+    def _create_provider_embedder(self, provider: str) -> EmbedderRepository:
         match provider:
             case "openai":
                 from infra.llm.impl.openai import OpenaiEmbedder
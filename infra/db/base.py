@@ -1,12 +1,43 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
 from config import settings
 
 engine: Engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, future=True)
 Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+_ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+
+
+def _async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+
+    # mysql+pymysql://... -> mysql+aiomysql://...
+    url = make_url(settings.DATABASE_URL)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {url.get_backend_name()}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_session() -> "async_sessionmaker[AsyncSession]":
+    """async 엔진은 ask_async 경로에서 처음 필요할 때 생성 (aiomysql, greenlet 필요)"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(_async_database_url(), pool_pre_ping=True)
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 def get_db():
     db = Session()
     try:
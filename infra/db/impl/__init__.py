@@ -1,9 +1,17 @@
-from .chunk import ChunkRepositoryImpl
+from .chunk import AsyncChunkRepositoryImpl, CachedChunkRepositoryImpl, ChunkRepositoryImpl
 from .document import DocumentRepositoryImpl
-from .query_log import QueryLogRepositoryImpl
+from .embedding_store import EmbeddingStoreRepositoryImpl
+from .query_log import AsyncQueryLogRepositoryImpl, BufferedQueryLogRepositoryImpl, QueryLogRepositoryImpl
+from .sync_state import SyncStateRepositoryImpl
 
 __all__ = [
+    "AsyncChunkRepositoryImpl",
+    "AsyncQueryLogRepositoryImpl",
+    "BufferedQueryLogRepositoryImpl",
+    "CachedChunkRepositoryImpl",
     "ChunkRepositoryImpl",
     "DocumentRepositoryImpl",
+    "EmbeddingStoreRepositoryImpl",
     "QueryLogRepositoryImpl",
+    "SyncStateRepositoryImpl",
 ]
@@ -1,12 +1,21 @@
-from sqlalchemy import asc
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from sqlalchemy import ColumnElement, asc, func, insert, select, tuple_, update
 
 from app.models.base import Chunk as ChunkModel
-from app.repositories.chunk import ChunkRepository
+from app.repositories.chunk import AsyncChunkRepository, ChunkRepository
 from app.utils import compute_content_hash
-from infra.db.base import Session
+from infra.db.base import Session, get_async_session
 from infra.db.orm.base import Chunk as ChunkOrm
 
 
+def _context_keys_clause(keys: list[tuple[int, int]]) -> ColumnElement[bool]:
+    """(document_id, context_id) IN (...) 조건"""
+    return tuple_(ChunkOrm.document_id, ChunkOrm.context_id).in_(keys)
+
+
 class ChunkRepositoryImpl(ChunkRepository):
     @staticmethod
     def _to_model(o: ChunkOrm) -> ChunkModel:
@@ -43,22 +52,40 @@ class ChunkRepositoryImpl(ChunkRepository):
         if not chunks:
             return []
 
-        objects = [
-            ChunkOrm(
-                document_id=document_id,
-                context_id=c.context_id,
-                chunk_index=c.chunk_index,
-                chunk_text=c.chunk_text,
-                chunk_hash=compute_content_hash(c.chunk_text),
-            )
+        rows = [
+            {
+                "document_id": document_id,
+                "context_id": c.context_id,
+                "chunk_index": c.chunk_index,
+                "chunk_text": c.chunk_text,
+                "chunk_hash": compute_content_hash(c.chunk_text),
+            }
             for c in chunks
         ]
+        indexes = [row["chunk_index"] for row in rows]
         with Session() as db:
-            db.add_all(objects)
+            db.execute(insert(ChunkOrm), rows)
+            # 갱신 중에는 같은 chunk_index 의 기존 청크가 아직 남아 있으므로 인덱스마다 가장 큰(방금 넣은) id 를 쓴다
+            ids = dict(
+                db.execute(
+                    select(ChunkOrm.chunk_index, func.max(ChunkOrm.id))
+                    .where(ChunkOrm.document_id == document_id, ChunkOrm.chunk_index.in_(indexes))
+                    .group_by(ChunkOrm.chunk_index)
+                ).all()
+            )
             db.commit()
-            [db.refresh(o) for o in objects]
 
-        return [self._to_model(o) for o in objects]
+        return [
+            ChunkModel(
+                id=ids[row["chunk_index"]],
+                document_id=document_id,
+                context_id=row["context_id"],
+                chunk_index=row["chunk_index"],
+                chunk_text=row["chunk_text"],
+                chunk_hash=row["chunk_hash"],
+            )
+            for row in rows
+        ]
 
     def get(self, id: int) -> ChunkModel | None:
         with Session() as db:
@@ -89,7 +116,33 @@ class ChunkRepositoryImpl(ChunkRepository):
                 .limit(limit)
                 .all()
             )
-            return [self._to_model(o) for o in q.all()]
+            return [self._to_model(o) for o in q]
+
+    def list_keys_by_document(
+        self,
+        document_id: int,
+        after_id: int = 0,
+        limit: int = 500,
+    ) -> list[ChunkModel]:
+        """청크 diff 용: chunk_text 없이 (id, context_id, chunk_index, chunk_hash) 만 id 순 keyset 페이지로 조회"""
+        with Session() as db:
+            rows = db.execute(
+                select(ChunkOrm.id, ChunkOrm.context_id, ChunkOrm.chunk_index, ChunkOrm.chunk_hash)
+                .where(ChunkOrm.document_id == document_id, ChunkOrm.id > after_id)
+                .order_by(ChunkOrm.id.asc())
+                .limit(limit)
+            ).all()
+        return [
+            ChunkModel(
+                id=row.id,
+                document_id=document_id,
+                context_id=row.context_id,
+                chunk_index=row.chunk_index,
+                chunk_text="",
+                chunk_hash=row.chunk_hash,
+            )
+            for row in rows
+        ]
 
     def list_by_context(self, document_id: int, context_id: int) -> list[ChunkModel]:
         with Session() as db:
@@ -104,7 +157,328 @@ class ChunkRepositoryImpl(ChunkRepository):
             )
         return [self._to_model(o) for o in rows]
 
+    def list_by_contexts(self, pairs: list[tuple[int, int]]) -> dict[tuple[int, int], list[ChunkModel]]:
+        """(document_id, context_id) 쌍 목록의 청크를 한 번의 쿼리로 조회해 chunk_index 순으로 묶어 반환"""
+        keys = list(dict.fromkeys(pairs))
+        if not keys:
+            return {}
+
+        with Session() as db:
+            rows = (
+                db.query(ChunkOrm)
+                .filter(_context_keys_clause(keys))
+                .order_by(
+                    asc(ChunkOrm.document_id),
+                    asc(ChunkOrm.context_id),
+                    asc(ChunkOrm.chunk_index),
+                )
+                .all()
+            )
+
+        grouped: dict[tuple[int, int], list[ChunkModel]] = {key: [] for key in keys}
+        for o in rows:
+            grouped[(o.document_id, o.context_id)].append(self._to_model(o))
+        return grouped
+
     def delete_by_document(self, document_id: int) -> None:
         with Session() as db:
             db.query(ChunkOrm).filter(ChunkOrm.document_id == document_id).delete()
             db.commit()
+
+    def delete_by_ids(self, document_id: int, chunk_ids: list[int]) -> None:
+        if not chunk_ids:
+            return
+
+        with Session() as db:
+            db.query(ChunkOrm).filter(
+                ChunkOrm.document_id == document_id,
+                ChunkOrm.id.in_(chunk_ids),
+            ).delete(synchronize_session=False)
+            db.commit()
+
+    def update_positions(self, document_id: int, chunks: list[ChunkModel]) -> None:
+        """청크 텍스트는 그대로 두고 context_id / chunk_index 만 갱신 (id 기준 bulk update)"""
+        if not chunks:
+            return
+
+        with Session() as db:
+            db.execute(
+                update(ChunkOrm),
+                [{"id": c.id, "context_id": c.context_id, "chunk_index": c.chunk_index} for c in chunks],
+            )
+            db.commit()
+
+
+class AsyncChunkRepositoryImpl(AsyncChunkRepository):
+    _to_model = staticmethod(ChunkRepositoryImpl._to_model)
+
+    async def get_by_ids(self, chunk_ids: list[int]) -> list[ChunkModel]:
+        if not chunk_ids:
+            return []
+
+        async with get_async_session()() as db:
+            rows = (await db.execute(select(ChunkOrm).where(ChunkOrm.id.in_(chunk_ids)))).scalars().all()
+            return [self._to_model(o) for o in rows]
+
+    async def list_by_contexts(self, pairs: list[tuple[int, int]]) -> dict[tuple[int, int], list[ChunkModel]]:
+        keys = list(dict.fromkeys(pairs))
+        if not keys:
+            return {}
+
+        stmt = (
+            select(ChunkOrm)
+            .where(_context_keys_clause(keys))
+            .order_by(
+                asc(ChunkOrm.document_id),
+                asc(ChunkOrm.context_id),
+                asc(ChunkOrm.chunk_index),
+            )
+        )
+        async with get_async_session()() as db:
+            rows = (await db.execute(stmt)).scalars().all()
+
+        grouped: dict[tuple[int, int], list[ChunkModel]] = {key: [] for key in keys}
+        for o in rows:
+            grouped[(o.document_id, o.context_id)].append(self._to_model(o))
+        return grouped
+
+
+class CachedChunkRepositoryImpl(ChunkRepository):
+    """
+    ChunkRepository read-through 캐시.
+    - chunk_id -> Chunk, (document_id, context_id) -> chunk_id 목록 을 메모리에 보관
+    - chunk_text 크기와 컨텍스트 목록 크기 합이 max_bytes 를 넘으면 LRU 로 제거 (청크가 빠지면 그 컨텍스트 목록도 제거)
+    - 이 저장소를 통한 쓰기(create/bulk_create/delete_by_document)는 해당 문서의 캐시를 무효화
+    - 다른 프로세스(별도 ingest 등)의 쓰기는 알 수 없으므로, 캐시된 청크는 ttl 초가 지나면 다시 조회 (0 이면 만료 없음)
+    """
+
+    _ENTRY_OVERHEAD = 256
+    _CONTEXT_OVERHEAD = 128
+
+    def __init__(
+        self,
+        repo: ChunkRepository | None = None,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 300.0,
+    ):
+        self._repo = repo or ChunkRepositoryImpl()
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+
+        self._chunks: OrderedDict[int, ChunkModel] = OrderedDict()
+        self._expires: dict[int, float] = {}
+        self._contexts: dict[tuple[int, int], list[int]] = {}
+        self._by_document: dict[int, set[int]] = defaultdict(set)
+        self._bytes = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------
+    # cache helpers (self._lock 를 잡은 상태에서 호출)
+    # -------------------------
+    def _size_of(self, chunk: ChunkModel) -> int:
+        return len(chunk.chunk_text.encode("utf-8")) + self._ENTRY_OVERHEAD
+
+    def _context_size(self, chunk_ids: list[int]) -> int:
+        return self._CONTEXT_OVERHEAD + 8 * len(chunk_ids)
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and self._chunks:
+            self._remove(next(iter(self._chunks)))
+
+    def _remove(self, chunk_id: int) -> None:
+        chunk = self._chunks.pop(chunk_id, None)
+        if chunk is None:
+            return
+
+        self._expires.pop(chunk_id, None)
+        self._bytes -= self._size_of(chunk)
+        chunk_ids = self._by_document.get(chunk.document_id)
+        if chunk_ids is not None:
+            chunk_ids.discard(chunk_id)
+            if not chunk_ids:
+                del self._by_document[chunk.document_id]
+        # 목록의 일부만 남은 컨텍스트는 쓸 수 없으므로 함께 제거
+        self._drop_context((chunk.document_id, chunk.context_id))
+
+    def _drop_context(self, key: tuple[int, int]) -> None:
+        chunk_ids = self._contexts.pop(key, None)
+        if chunk_ids is not None:
+            self._bytes -= self._context_size(chunk_ids)
+
+    def _put(self, chunk: ChunkModel) -> None:
+        old = self._chunks.pop(chunk.id, None)
+        if old is not None:
+            self._bytes -= self._size_of(old)
+
+        self._chunks[chunk.id] = chunk
+        if self._ttl > 0:
+            self._expires[chunk.id] = time.monotonic() + self._ttl
+        self._by_document[chunk.document_id].add(chunk.id)
+        self._bytes += self._size_of(chunk)
+        self._evict()
+
+    def _put_context(self, key: tuple[int, int], chunks: list[ChunkModel]) -> None:
+        # 빈 컨텍스트는 제거할 청크가 없어 LRU 에 걸리지 않으므로 캐시하지 않음
+        if not chunks:
+            return
+
+        for chunk in chunks:
+            self._put(chunk)
+        chunk_ids = [chunk.id for chunk in chunks]
+        if any(chunk_id not in self._chunks for chunk_id in chunk_ids):
+            # max_bytes 보다 큰 컨텍스트
+            return
+
+        self._drop_context(key)
+        self._contexts[key] = chunk_ids
+        self._bytes += self._context_size(chunk_ids)
+        self._evict()
+
+    def _get(self, chunk_id: int) -> ChunkModel | None:
+        chunk = self._chunks.get(chunk_id)
+        if chunk is None:
+            return None
+
+        if self._ttl > 0 and self._expires.get(chunk_id, 0.0) < time.monotonic():
+            self._remove(chunk_id)
+            return None
+
+        self._chunks.move_to_end(chunk_id)
+        return chunk
+
+    def _get_context(self, key: tuple[int, int]) -> list[ChunkModel] | None:
+        chunk_ids = self._contexts.get(key)
+        if chunk_ids is None:
+            return None
+
+        chunks = [self._get(chunk_id) for chunk_id in chunk_ids]
+        if any(chunk is None for chunk in chunks):
+            # 일부 청크가 만료됐으면 컨텍스트 전체를 다시 조회
+            self._drop_context(key)
+            return None
+        return chunks
+
+    def invalidate_document(self, document_id: int) -> None:
+        with self._lock:
+            self._version += 1
+            # 캐시된 컨텍스트는 항상 자기 청크가 캐시에 있으므로 청크를 지우면 컨텍스트도 함께 지워짐
+            for chunk_id in list(self._by_document.get(document_id, ())):
+                self._remove(chunk_id)
+
+    # -------------------------
+    # ChunkRepository
+    # -------------------------
+    def create(
+        self,
+        document_id: int,
+        context_id: int | None,
+        chunk_index: int,
+        chunk_text: str,
+    ) -> ChunkModel:
+        chunk = self._repo.create(
+            document_id=document_id,
+            context_id=context_id,
+            chunk_index=chunk_index,
+            chunk_text=chunk_text,
+        )
+        self.invalidate_document(document_id)
+        return chunk
+
+    def bulk_create(self, document_id: int, chunks: list[ChunkModel]) -> list[ChunkModel]:
+        created = self._repo.bulk_create(document_id=document_id, chunks=chunks)
+        self.invalidate_document(document_id)
+        return created
+
+    def get(self, id: int) -> ChunkModel | None:
+        chunks = self.get_by_ids([id])
+        return chunks[0] if chunks else None
+
+    def get_by_ids(self, chunk_ids: list[int]) -> list[ChunkModel]:
+        if not chunk_ids:
+            return []
+
+        found: dict[int, ChunkModel] = {}
+        with self._lock:
+            for chunk_id in chunk_ids:
+                chunk = self._get(chunk_id)
+                if chunk is not None:
+                    found[chunk_id] = chunk
+            missing = [chunk_id for chunk_id in dict.fromkeys(chunk_ids) if chunk_id not in found]
+            self.hits += len(chunk_ids) - len(missing)
+            self.misses += len(missing)
+            version = self._version
+
+        if missing:
+            loaded = self._repo.get_by_ids(missing)
+            with self._lock:
+                # 조회 중 무효화가 있었으면 (오래됐을 수 있는) 결과를 캐시에 넣지 않음
+                cacheable = version == self._version
+                for chunk in loaded:
+                    if cacheable:
+                        self._put(chunk)
+                    found[chunk.id] = chunk
+
+        return [found[chunk_id] for chunk_id in dict.fromkeys(chunk_ids) if chunk_id in found]
+
+    def list_by_document(
+        self,
+        document_id: int,
+        limit: int = 500,
+        offset: int = 0,
+    ) -> list[ChunkModel]:
+        return self._repo.list_by_document(document_id=document_id, limit=limit, offset=offset)
+
+    def list_keys_by_document(
+        self,
+        document_id: int,
+        after_id: int = 0,
+        limit: int = 500,
+    ) -> list[ChunkModel]:
+        return self._repo.list_keys_by_document(document_id=document_id, after_id=after_id, limit=limit)
+
+    def list_by_context(self, document_id: int, context_id: int) -> list[ChunkModel]:
+        return self.list_by_contexts([(document_id, context_id)])[(document_id, context_id)]
+
+    def list_by_contexts(self, pairs: list[tuple[int, int]]) -> dict[tuple[int, int], list[ChunkModel]]:
+        keys = list(dict.fromkeys(pairs))
+        if not keys:
+            return {}
+
+        grouped: dict[tuple[int, int], list[ChunkModel]] = {}
+        with self._lock:
+            for key in keys:
+                chunks = self._get_context(key)
+                if chunks is not None:
+                    grouped[key] = chunks
+            missing = [key for key in keys if key not in grouped]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+            version = self._version
+
+        if missing:
+            loaded = self._repo.list_by_contexts(missing)
+            with self._lock:
+                cacheable = version == self._version
+                for key, chunks in loaded.items():
+                    if cacheable:
+                        self._put_context(key, chunks)
+                    grouped[key] = chunks
+
+        return {key: grouped.get(key, []) for key in keys}
+
+    def delete_by_document(self, document_id: int) -> None:
+        self._repo.delete_by_document(document_id=document_id)
+        self.invalidate_document(document_id)
+
+    def delete_by_ids(self, document_id: int, chunk_ids: list[int]) -> None:
+        self._repo.delete_by_ids(document_id=document_id, chunk_ids=chunk_ids)
+        self.invalidate_document(document_id)
+
+    def update_positions(self, document_id: int, chunks: list[ChunkModel]) -> None:
+        self._repo.update_positions(document_id=document_id, chunks=chunks)
+        self.invalidate_document(document_id)
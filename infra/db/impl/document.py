@@ -1,25 +1,71 @@
+from dataclasses import replace
+from itertools import batched
+
+from sqlalchemy.orm import undefer
+
 from app.enums import Domain, SourceType
 from app.models.base import Document as DocumentModel
+from app.models.base import DocumentHeader, StreamedContent
 from app.repositories.document import DocumentRepository
-from app.utils import compute_content_hash, gzip_compress_text
+from app.utils import compute_content_hash, gzip_compress_text, gzip_decompress_text
 from infra.db.base import Session
 from infra.db.orm.base import Document as DocumentOrm
 
 
 class DocumentRepositoryImpl(DocumentRepository):
+    _IN_BATCH = 500
+    _INLINE_MAX_BYTES = 32 * 1024
+
+    @classmethod
+    def _content_columns(cls, raw_content: str, streamed: StreamedContent | None) -> tuple[str | None, bytes | None]:
+        """(raw_content, raw_content_gz) 컬럼 값. 원문은 작은 문서만 함께 저장하고, 스트리밍 문서는 본문을 저장하지 않음"""
+        if streamed is not None:
+            return None, None
+
+        raw_bytes_len = len(raw_content.encode("utf-8"))
+        raw_content_for_save = raw_content if raw_bytes_len <= cls._INLINE_MAX_BYTES else None
+        return raw_content_for_save, gzip_compress_text(raw_content, level=6)
+
     @staticmethod
-    def _to_model(o: DocumentOrm) -> DocumentModel:
+    def _to_model(o: DocumentOrm, raw_content: str) -> DocumentModel:
         return DocumentModel(
             id=o.id,
             domain=o.domain,
             source_type=o.source_type,
             source_id=o.source_id,
             title=o.title,
-            raw_content=o.raw_content,
+            raw_content=raw_content,
+            content_hash=o.content_hash,
+            version=o.version,
+            source_version=o.source_version,
+        )
+
+    @staticmethod
+    def _to_header(o: DocumentOrm) -> DocumentHeader:
+        return DocumentHeader(
+            id=o.id,
+            domain=o.domain,
+            source_type=o.source_type,
+            source_id=o.source_id,
+            title=o.title,
             content_hash=o.content_hash,
             version=o.version,
+            source_version=o.source_version,
         )
 
+    @classmethod
+    def _pending_header(cls, o: DocumentOrm, content_hash: str, source_version: str | None) -> DocumentHeader:
+        return replace(cls._to_header(o), content_hash=content_hash, source_version=source_version)
+
+    @staticmethod
+    def _load_content(o: DocumentOrm) -> str:
+        """raw_content 컬럼이 비어 있는 큰 문서만 raw_content_gz 를 그때 읽어서 압축 해제. 스트리밍으로 적재한 파일은 빈 문자열"""
+        if o.raw_content is not None:
+            return o.raw_content
+        if o.raw_content_gz is None:
+            return ""
+        return gzip_decompress_text(o.raw_content_gz)
+
     def create(
         self,
         domain: Domain,
@@ -28,9 +74,7 @@ class DocumentRepositoryImpl(DocumentRepository):
         title: str | None,
         raw_content: str,
     ) -> DocumentModel:
-        raw_bytes_len = len(raw_content.encode("utf-8"))
-        raw_content_gz = gzip_compress_text(raw_content, level=6)
-        raw_content_for_save = raw_content if raw_bytes_len <= 32 * 1024 else None
+        raw_content_for_save, raw_content_gz = self._content_columns(raw_content, None)
 
         o = DocumentOrm(
             domain=domain,
@@ -47,19 +91,20 @@ class DocumentRepositoryImpl(DocumentRepository):
             db.add(o)
             db.commit()
             db.refresh(o)
-            return self._to_model(o)
+            return self._to_model(o, raw_content)
 
     def get(self, id: int) -> DocumentModel | None:
         with Session() as db:
             o = (
                 db.query(DocumentOrm)
+                .options(undefer(DocumentOrm.raw_content))
                 .filter(
                     DocumentOrm.id == id,
                     DocumentOrm.deleted_at.is_(None),
                 )
                 .one_or_none()
             )
-            return self._to_model(o) if o else None
+            return self._to_model(o, self._load_content(o)) if o else None
 
     def get_by_source(
         self,
@@ -69,6 +114,7 @@ class DocumentRepositoryImpl(DocumentRepository):
         with Session() as db:
             o = (
                 db.query(DocumentOrm)
+                .options(undefer(DocumentOrm.raw_content))
                 .filter(
                     DocumentOrm.source_type == source_type,
                     DocumentOrm.source_id == source_id,
@@ -76,7 +122,36 @@ class DocumentRepositoryImpl(DocumentRepository):
                 )
                 .one_or_none()
             )
-            return self._to_model(o) if o else None
+            return self._to_model(o, self._load_content(o)) if o else None
+
+    def get_header(self, id: int) -> DocumentHeader | None:
+        with Session() as db:
+            o = (
+                db.query(DocumentOrm)
+                .filter(
+                    DocumentOrm.id == id,
+                    DocumentOrm.deleted_at.is_(None),
+                )
+                .one_or_none()
+            )
+            return self._to_header(o) if o else None
+
+    def get_header_by_source(
+        self,
+        source_type: SourceType,
+        source_id: str,
+    ) -> DocumentHeader | None:
+        with Session() as db:
+            o = (
+                db.query(DocumentOrm)
+                .filter(
+                    DocumentOrm.source_type == source_type,
+                    DocumentOrm.source_id == source_id,
+                    DocumentOrm.deleted_at.is_(None),
+                )
+                .one_or_none()
+            )
+            return self._to_header(o) if o else None
 
     def update(self, document: DocumentModel) -> DocumentModel:
         if document.id is None:
@@ -94,9 +169,7 @@ class DocumentRepositoryImpl(DocumentRepository):
             if o is None:
                 raise KeyError(f"Document not found: id={document.id}")
 
-            raw_bytes_len = len(document.raw_content.encode("utf-8"))
-            raw_content_gz = gzip_compress_text(document.raw_content, level=6)
-            raw_content_for_save = document.raw_content if raw_bytes_len <= 32 * 1024 else None
+            raw_content_for_save, raw_content_gz = self._content_columns(document.raw_content, document.streamed)
 
             o.domain = document.domain
             o.source_type = document.source_type
@@ -106,11 +179,12 @@ class DocumentRepositoryImpl(DocumentRepository):
             o.raw_content_gz = raw_content_gz
             o.content_hash = document.content_hash
             o.version = document.version
+            o.source_version = document.source_version
 
             db.add(o)
             db.commit()
             db.refresh(o)
-            return self._to_model(o)
+            return self._to_model(o, document.raw_content)
 
     def upsert(
         self,
@@ -119,8 +193,17 @@ class DocumentRepositoryImpl(DocumentRepository):
         source_id: str,
         title: str | None,
         raw_content: str,
-    ) -> DocumentModel:
-        new_hash = compute_content_hash(raw_content)
+        source_version: str | None = None,
+        streamed: StreamedContent | None = None,
+    ) -> tuple[DocumentHeader, bool]:
+        """
+        (document header, changed). 본문 컬럼은 읽지 않고 content_hash 로만 비교한다. 새로 만들었거나 content_hash 가 바뀌었으면 changed=True.
+        changed 인 경우 본문만 저장하고 content_hash / source_version 은 비워 두며 (청크/벡터 반영 전 중단되면 다음 적재에서 다시 처리),
+        반환하는 header 에는 반영 후 finalize() 로 기록할 새 content_hash / source_version 을 담는다.
+        내용이 그대로면 제목/source_version 만 바로 갱신한다.
+        streamed 가 있으면 raw_content 대신 미리 계산된 해시를 쓰고 본문은 저장하지 않는다 (큰 파일 스트리밍).
+        """
+        new_hash = streamed.content_hash if streamed is not None else compute_content_hash(raw_content)
 
         with Session() as db:
             o = (
@@ -128,15 +211,18 @@ class DocumentRepositoryImpl(DocumentRepository):
                 .filter(
                     DocumentOrm.source_type == source_type,
                     DocumentOrm.source_id == source_id,
-                    DocumentOrm.deleted_at.is_(None),
                 )
                 .one_or_none()
             )
 
+            revived = o is not None and o.deleted_at is not None
+            if revived:
+                # 삭제했던 출처가 다시 생긴 경우 (source_type, source_id) 는 unique 라 같은 행을 되살린다.
+                # 청크는 삭제 시 함께 지웠으므로 내용이 같아도 changed 로 취급
+                o.restore()
+
             if o is None:
-                raw_bytes_len = len(raw_content.encode("utf-8"))
-                raw_content_gz = gzip_compress_text(raw_content, level=6)
-                raw_content_for_save = raw_content if raw_bytes_len <= 32 * 1024 else None
+                raw_content_for_save, raw_content_gz = self._content_columns(raw_content, streamed)
 
                 o = DocumentOrm(
                     domain=domain,
@@ -145,26 +231,78 @@ class DocumentRepositoryImpl(DocumentRepository):
                     title=title,
                     raw_content=raw_content_for_save,
                     raw_content_gz=raw_content_gz,
-                    content_hash=new_hash,
+                    content_hash="",
                     version=1,
+                    source_version=None,
                 )
                 db.add(o)
                 db.commit()
                 db.refresh(o)
-                return self._to_model(o)
+                return self._pending_header(o, new_hash, source_version), True
 
-            if o.content_hash == new_hash:
-                return self._to_model(o)
+            if o.content_hash == new_hash and not revived:
+                if (o.title, o.source_version) != (title, source_version):
+                    # 제목/출처 버전만 바뀐 경우: 청크/임베딩에는 영향 없음
+                    o.title = title
+                    o.source_version = source_version
+                    db.commit()
+                    db.refresh(o)
+                return self._to_header(o), False
 
             o.title = title
-            o.raw_content = raw_content
-            o.content_hash = new_hash
+            o.raw_content, o.raw_content_gz = self._content_columns(raw_content, streamed)
+            o.content_hash = ""
             o.version = (o.version or 0) + 1
+            o.source_version = None
 
             db.add(o)
             db.commit()
             db.refresh(o)
-            return self._to_model(o)
+            return self._pending_header(o, new_hash, source_version), True
+
+    def get_source_versions(
+        self,
+        source_type: SourceType,
+        source_ids: list[str],
+    ) -> dict[str, str | None]:
+        """저장된 문서의 source_id -> source_version (없는 문서는 포함하지 않음)"""
+        versions: dict[str, str | None] = {}
+        with Session() as db:
+            for batch in batched(dict.fromkeys(source_ids), self._IN_BATCH):
+                rows = (
+                    db.query(DocumentOrm.source_id, DocumentOrm.source_version)
+                    .filter(
+                        DocumentOrm.source_type == source_type,
+                        DocumentOrm.source_id.in_(batch),
+                        DocumentOrm.deleted_at.is_(None),
+                    )
+                    .all()
+                )
+                versions.update(dict(rows))
+        return versions
+
+    def list_source_ids(self, source_type: SourceType, prefix: str = "") -> list[str]:
+        """삭제되지 않은 문서 중 source_id 가 prefix 로 시작하는 것"""
+        with Session() as db:
+            rows = (
+                db.query(DocumentOrm.source_id)
+                .filter(
+                    DocumentOrm.source_type == source_type,
+                    DocumentOrm.source_id.startswith(prefix, autoescape=True),
+                    DocumentOrm.deleted_at.is_(None),
+                )
+                .all()
+            )
+            return [source_id for (source_id,) in rows]
+
+    def finalize(self, document: DocumentHeader) -> None:
+        """청크/벡터 반영이 끝난 문서에 upsert 가 미뤄 둔 content_hash / source_version 을 기록"""
+        with Session() as db:
+            db.query(DocumentOrm).filter(DocumentOrm.id == document.id).update(
+                {DocumentOrm.content_hash: document.content_hash, DocumentOrm.source_version: document.source_version},
+                synchronize_session=False,
+            )
+            db.commit()
 
     def delete(self, id: int) -> None:
         with Session() as db:
@@ -0,0 +1,93 @@
+import logging
+from itertools import batched
+
+from sqlalchemy import Insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from app.repositories.embedding_store import EmbeddingStoreRepository
+from app.utils import pack_embedding_f16, unpack_embedding_f16
+from infra.db.base import Session
+from infra.db.orm.base import ChunkEmbedding as ChunkEmbeddingOrm
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStoreRepositoryImpl(EmbeddingStoreRepository):
+    """
+    (model, dim, chunk_hash) 로 주소 지정되는 청크 임베딩 저장소.
+    같은 텍스트는 문서/재적재와 무관하게 한 번만 임베딩하고, 벡터는 float16 blob 으로 보관한다.
+    """
+
+    _IN_BATCH = 500
+
+    def __init__(self, model: str, dim: int):
+        self.model = model
+        self.dim = dim
+
+    def get_many(self, chunk_hashes: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with Session() as db:
+            for batch in batched(dict.fromkeys(chunk_hashes), self._IN_BATCH):
+                rows = (
+                    db.query(ChunkEmbeddingOrm.chunk_hash, ChunkEmbeddingOrm.vector)
+                    .filter(
+                        ChunkEmbeddingOrm.model == self.model,
+                        ChunkEmbeddingOrm.dim == self.dim,
+                        ChunkEmbeddingOrm.chunk_hash.in_(batch),
+                    )
+                    .all()
+                )
+                for chunk_hash, vector in rows:
+                    found[chunk_hash] = unpack_embedding_f16(vector)
+        return found
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        if not vectors:
+            return
+
+        existing = set(self.get_many(list(vectors)))
+        rows = [
+            {
+                "model": self.model,
+                "dim": self.dim,
+                "chunk_hash": chunk_hash,
+                "vector": pack_embedding_f16(vector),
+            }
+            for chunk_hash, vector in vectors.items()
+            if chunk_hash not in existing
+        ]
+        if not rows:
+            return
+
+        with Session() as db:
+            stmt = self._insert_ignore(db.get_bind().dialect.name)
+            if stmt is not None:
+                # 동시에 같은 해시를 저장한 경우: 그 행만 건너뛰고 나머지는 저장
+                db.execute(stmt, rows)
+                db.commit()
+                return
+
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        db.add(ChunkEmbeddingOrm(**row))
+                except IntegrityError:
+                    logger.debug("chunk embedding already stored by a concurrent writer: %s", row["chunk_hash"])
+            db.commit()
+
+    @staticmethod
+    def _insert_ignore(dialect: str) -> Insert | None:
+        """unique 충돌 행을 건너뛰는 INSERT (지원하지 않는 dialect 면 None -> 행 단위 저장)"""
+        table = ChunkEmbeddingOrm.__table__
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql_insert(table)
+            # 충돌 시 아무 컬럼도 바꾸지 않는 ON DUPLICATE KEY UPDATE (INSERT IGNORE 는 다른 오류도 무시하므로 사용하지 않음)
+            return stmt.on_duplicate_key_update(chunk_hash=stmt.inserted.chunk_hash)
+        if dialect == "postgresql":
+            return postgresql_insert(table).on_conflict_do_nothing()
+        if dialect == "sqlite":
+            return sqlite_insert(table).on_conflict_do_nothing()
+        return None
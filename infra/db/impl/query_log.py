@@ -1,8 +1,40 @@
+import atexit
+import itertools
+import logging
+import threading
+from collections import defaultdict
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session as OrmSession
+
 from app.models.base import QueryLog as QueryLogModel
-from app.repositories.query_log import QueryLogRepository
-from infra.db.base import Session
+from app.repositories.query_log import AsyncQueryLogRepository, QueryLogRepository
+from app.utils import get_utc_now, pack_embedding, unpack_embedding
+from infra.db.base import Session, get_async_session
+from infra.db.orm.base import IdSequence
 from infra.db.orm.base import QueryLog as QueryLogOrm
 
+logger = logging.getLogger(__name__)
+
+_ID_SEQUENCE = "query_log"
+
+
+def _reserve_ids(db: OrmSession, count: int) -> range:
+    """
+    query_log id 를 count 개 예약 (호출한 쪽에서 commit).
+    UPDATE 로 시퀀스 행을 잠근 뒤 읽으므로 여러 프로세스가 동시에 예약해도 겹치지 않는다.
+    """
+    seq = IdSequence.__table__
+    result = db.execute(update(seq).where(seq.c.name == _ID_SEQUENCE).values(next_id=seq.c.next_id + count))
+    if result.rowcount == 0:
+        # 마이그레이션 없이 create_all 로 만든 DB: 기존 query_log 의 최대 id 다음부터
+        start = (db.execute(select(func.max(QueryLogOrm.id))).scalar() or 0) + 1
+        db.execute(insert(seq).values(name=_ID_SEQUENCE, next_id=start + count))
+        return range(start, start + count)
+
+    end = db.execute(select(seq.c.next_id).where(seq.c.name == _ID_SEQUENCE)).scalar_one()
+    return range(end - count, end)
+
 
 class QueryLogRepositoryImpl(QueryLogRepository):
     @staticmethod
@@ -14,19 +46,43 @@ class QueryLogRepositoryImpl(QueryLogRepository):
             selected_chunk_ids=o.selected_chunk_ids,
             expended_chunk_ids=o.expended_chunk_ids,
             answer=o.answer,
+            meta=o.meta,
+            query_embedding=unpack_embedding(o.query_embedding) if o.query_embedding else None,
         )
 
+    @staticmethod
+    def _apply_update(
+        o: QueryLogOrm,
+        selected_chunk_ids: list[int] | None = None,
+        expended_chunk_ids: list[int] | None = None,
+        answer: str | None = None,
+        input_tokens: int | None = None,
+        output_tokens: int | None = None,
+        meta: dict | None = None,
+        query_embedding: list[float] | None = None,
+    ) -> None:
+        o.selected_chunk_ids = selected_chunk_ids or o.selected_chunk_ids
+        o.expended_chunk_ids = expended_chunk_ids or o.expended_chunk_ids
+        o.answer = answer or o.answer
+        o.input_tokens = input_tokens or o.input_tokens
+        o.output_tokens = output_tokens or o.output_tokens
+        o.total_tokens = (o.input_tokens or 0) + (o.output_tokens or 0)
+        o.meta = meta or o.meta
+        if query_embedding is not None:
+            o.query_embedding = pack_embedding(query_embedding)
+
     def create(
         self,
         query_text: str,
         topk: int,
     ) -> QueryLogModel:
-        o = QueryLogOrm(
-            query_text=query_text,
-            topk=topk,
-        )
-
         with Session() as db:
+            # BufferedQueryLogRepositoryImpl 이 미리 예약한 id 와 겹치지 않도록 autoincrement 대신 시퀀스에서 받는다
+            o = QueryLogOrm(
+                id=_reserve_ids(db, 1)[0],
+                query_text=query_text,
+                topk=topk,
+            )
             db.add(o)
             db.commit()
             db.refresh(o)
@@ -37,6 +93,21 @@ class QueryLogRepositoryImpl(QueryLogRepository):
             o = db.query(QueryLogOrm).filter(QueryLogOrm.id == id).one_or_none()
             return self._to_model(o) if o else None
 
+    def list_answered(self, limit: int) -> list[QueryLogModel]:
+        """임베딩과 답변이 저장된 최근 쿼리 로그 (최신순)"""
+        with Session() as db:
+            rows = (
+                db.query(QueryLogOrm)
+                .filter(
+                    QueryLogOrm.answer.is_not(None),
+                    QueryLogOrm.query_embedding.is_not(None),
+                )
+                .order_by(QueryLogOrm.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return [self._to_model(o) for o in rows]
+
     def update(
         self,
         id: int,
@@ -46,19 +117,23 @@ class QueryLogRepositoryImpl(QueryLogRepository):
         input_tokens: int | None = None,
         output_tokens: int | None = None,
         meta: dict | None = None,
+        query_embedding: list[float] | None = None,
     ) -> QueryLogModel:
         with Session() as db:
             o: QueryLogOrm = db.query(QueryLogOrm).filter(QueryLogOrm.id == id).one_or_none()
             if o is None:
                 raise KeyError(f"QueryLog not found: id={id}")
 
-            o.selected_chunk_ids = selected_chunk_ids or o.selected_chunk_ids
-            o.expended_chunk_ids = expended_chunk_ids or o.expended_chunk_ids
-            o.answer = answer or o.answer
-            o.input_tokens = input_tokens or o.input_tokens
-            o.output_tokens = output_tokens or o.output_tokens
-            o.total_tokens = o.input_tokens + o.output_tokens
-            o.meta = meta or o.meta
+            self._apply_update(
+                o,
+                selected_chunk_ids=selected_chunk_ids,
+                expended_chunk_ids=expended_chunk_ids,
+                answer=answer,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                meta=meta,
+                query_embedding=query_embedding,
+            )
 
             db.add(o)
             db.commit()
@@ -69,3 +144,333 @@ class QueryLogRepositoryImpl(QueryLogRepository):
         with Session() as db:
             db.query(QueryLogOrm).filter(QueryLogOrm.id == id).delete()
             db.commit()
+
+
+class AsyncQueryLogRepositoryImpl(AsyncQueryLogRepository):
+    _to_model = staticmethod(QueryLogRepositoryImpl._to_model)
+    _apply_update = staticmethod(QueryLogRepositoryImpl._apply_update)
+
+    async def create(
+        self,
+        query_text: str,
+        topk: int,
+    ) -> QueryLogModel:
+        async with get_async_session()() as db:
+            ids = await db.run_sync(_reserve_ids, 1)
+            o = QueryLogOrm(
+                id=ids[0],
+                query_text=query_text,
+                topk=topk,
+            )
+            db.add(o)
+            await db.commit()
+            await db.refresh(o)
+            return self._to_model(o)
+
+    async def update(
+        self,
+        id: int,
+        selected_chunk_ids: list[int] | None = None,
+        expended_chunk_ids: list[int] | None = None,
+        answer: str | None = None,
+        input_tokens: int | None = None,
+        output_tokens: int | None = None,
+        meta: dict | None = None,
+        query_embedding: list[float] | None = None,
+    ) -> QueryLogModel:
+        async with get_async_session()() as db:
+            o: QueryLogOrm | None = await db.get(QueryLogOrm, id)
+            if o is None:
+                raise KeyError(f"QueryLog not found: id={id}")
+
+            self._apply_update(
+                o,
+                selected_chunk_ids=selected_chunk_ids,
+                expended_chunk_ids=expended_chunk_ids,
+                answer=answer,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                meta=meta,
+                query_embedding=query_embedding,
+            )
+
+            db.add(o)
+            await db.commit()
+            await db.refresh(o)
+            return self._to_model(o)
+
+
+class BufferedQueryLogRepositoryImpl(QueryLogRepository):
+    """
+    write-behind QueryLog 저장소.
+    - create() 는 미리 예약해 둔 id 블록에서 id 를 정하고 행을 메모리에 둔다 (DB 왕복 없음).
+      다음 블록은 백그라운드 스레드가 미리 예약하고, 예약이 아직 없을 때(시작 직후 등)만 create 가 직접 예약한다
+    - update() 는 아직 쓰지 않은 행이면 그 행에 병합하고, 이미 쓴 행이면 id 별로 병합해 둔다
+    - 백그라운드 스레드가 batch_size / flush_interval 단위로 새 행은 INSERT 한 번(executemany),
+      이미 쓴 행의 업데이트는 갱신할 컬럼 조합별 UPDATE 한 번(executemany)으로 반영
+    - 반영에 실패한 행/업데이트는 버퍼로 되돌려 다음 주기에 다시 시도
+    - 대기 중인 행/업데이트가 max_queue 를 넘으면 create/update 는 자리가 날 때까지 대기
+    - 프로세스 종료 시(atexit) 남은 행/업데이트를 모두 반영 (쓰지 못한 예약 id 는 비어 있는 채로 남음)
+    """
+
+    _COLUMNS = (
+        "selected_chunk_ids",
+        "expended_chunk_ids",
+        "answer",
+        "input_tokens",
+        "output_tokens",
+        "total_tokens",
+        "meta",
+        "query_embedding",
+    )
+
+    def __init__(
+        self,
+        repo: QueryLogRepositoryImpl | None = None,
+        *,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10_000,
+        id_block_size: int = 1000,
+    ):
+        self._repo = repo or QueryLogRepositoryImpl()
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._id_block_size = id_block_size
+
+        # 아직 쓰지 않은 새 행 (query_log id -> 컬럼 값, update 병합 포함)
+        self._rows: dict[int, dict] = {}
+        # 이미 쓴 행의 업데이트 (query_log id -> 병합된 update 필드)
+        self._updates: dict[int, dict] = {}
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+
+        self._id_lock = threading.Lock()
+        self._ids = range(0)
+        self._id_pos = 0
+        self._spare_ids: range | None = None
+
+        self._thread = threading.Thread(target=self._run, name="koo-query-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------------
+    # QueryLogRepository
+    # -------------------------
+    def create(
+        self,
+        query_text: str,
+        topk: int,
+    ) -> QueryLogModel:
+        id = self._next_id()
+        now = get_utc_now()
+        row = {
+            "id": id,
+            "query_text": query_text,
+            "topk": topk,
+            **dict.fromkeys(self._COLUMNS),
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._cond:
+            self._wait_for_capacity()
+            self._rows[id] = row
+            self._notify_if_full()
+
+        return QueryLogModel(id=id, query_text=query_text, topk=topk)
+
+    def update(
+        self,
+        id: int,
+        selected_chunk_ids: list[int] | None = None,
+        expended_chunk_ids: list[int] | None = None,
+        answer: str | None = None,
+        input_tokens: int | None = None,
+        output_tokens: int | None = None,
+        meta: dict | None = None,
+        query_embedding: list[float] | None = None,
+    ) -> QueryLogModel | None:
+        """아직 쓰지 않은 행이면 병합된 행을, 이미 쓴 행이면 None 을 반환"""
+        fields = {
+            "selected_chunk_ids": selected_chunk_ids,
+            "expended_chunk_ids": expended_chunk_ids,
+            "answer": answer,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "meta": meta,
+            "query_embedding": query_embedding,
+        }
+        with self._cond:
+            row = self._rows.get(id)
+            if row is not None:
+                self._merge(row, fields)
+                return self._to_model(row)
+
+            if id not in self._updates:
+                self._wait_for_capacity()
+            self._merge(self._updates.setdefault(id, {}), fields)
+            self._notify_if_full()
+        return None
+
+    def get(self, id: int) -> QueryLogModel | None:
+        self.flush()
+        return self._repo.get(id)
+
+    def list_answered(self, limit: int) -> list[QueryLogModel]:
+        self.flush()
+        return self._repo.list_answered(limit=limit)
+
+    def delete(self, id: int) -> None:
+        with self._cond:
+            pending = self._rows.pop(id, None) is not None
+            if self._updates.pop(id, None) is not None or pending:
+                self._cond.notify_all()
+        self._repo.delete(id)
+
+    # -------------------------
+    # write-behind
+    # -------------------------
+    def flush(self) -> None:
+        """대기 중인 행/업데이트를 모두 반영"""
+        while self._flush_once():
+            pass
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=self._flush_interval * 2)
+        self.flush()
+
+    @staticmethod
+    def _to_model(row: dict) -> QueryLogModel:
+        embedding = row["query_embedding"]
+        return QueryLogModel(
+            id=row["id"],
+            query_text=row["query_text"],
+            topk=row["topk"],
+            selected_chunk_ids=row["selected_chunk_ids"],
+            expended_chunk_ids=row["expended_chunk_ids"],
+            answer=row["answer"],
+            meta=row["meta"],
+            query_embedding=unpack_embedding(embedding) if embedding else None,
+        )
+
+    @staticmethod
+    def _merge(target: dict, fields: dict) -> None:
+        # self._cond 를 잡은 상태에서 호출. QueryLogRepositoryImpl.update 와 같은 `or` 규칙 (값이 있는 필드만 덮어씀).
+        # 컬럼 값으로 저장 (query_embedding 은 pack, total_tokens 는 input + output)
+        for key, value in fields.items():
+            if value:
+                target[key] = pack_embedding(value) if key == "query_embedding" else value
+        if fields.get("input_tokens") or fields.get("output_tokens"):
+            target["total_tokens"] = (target.get("input_tokens") or 0) + (target.get("output_tokens") or 0)
+
+    def _pending(self) -> int:
+        return len(self._rows) + len(self._updates)
+
+    def _notify_if_full(self) -> None:
+        # self._cond 를 잡은 상태에서 호출
+        if self._pending() >= self._batch_size:
+            self._cond.notify_all()
+
+    def _wait_for_capacity(self) -> None:
+        # self._cond 를 잡은 상태에서 호출
+        while self._pending() >= self._max_queue and not self._closed:
+            self._cond.notify_all()
+            self._cond.wait(timeout=self._flush_interval)
+
+    def _next_id(self) -> int:
+        with self._id_lock:
+            if self._id_pos == len(self._ids):
+                block, self._spare_ids = self._spare_ids, None
+                if block is None:
+                    # 백그라운드 예약이 아직 없음 (시작 직후, 또는 한 주기에 블록 하나보다 많이 create)
+                    block = self._reserve_block()
+                self._ids, self._id_pos = block, 0
+            id = self._ids[self._id_pos]
+            self._id_pos += 1
+            return id
+
+    def _reserve_block(self) -> range:
+        with Session() as db:
+            ids = _reserve_ids(db, self._id_block_size)
+            db.commit()
+        return ids
+
+    def _prefetch_ids(self) -> None:
+        # 현재 블록을 절반 넘게 쓰면 다음 블록을 미리 예약 (짧게 끝나는 프로세스가 id 를 많이 버리지 않도록)
+        with self._id_lock:
+            if self._spare_ids is not None or len(self._ids) - self._id_pos > self._id_block_size // 2:
+                return
+        block = self._reserve_block()
+        with self._id_lock:
+            if self._spare_ids is None:
+                self._spare_ids = block
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait(timeout=self._flush_interval)
+            try:
+                self._prefetch_ids()
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush query logs")
+
+    def _take_batch(self) -> tuple[list[dict], dict[int, dict]]:
+        with self._cond:
+            row_ids = list(itertools.islice(self._rows, self._batch_size))
+            rows = [self._rows.pop(id) for id in row_ids]
+            update_ids = list(itertools.islice(self._updates, self._batch_size - len(rows)))
+            return rows, {id: self._updates.pop(id) for id in update_ids}
+
+    def _restore(self, rows: list[dict], updates: dict[int, dict]) -> None:
+        # 반영 실패: 그 사이 들어온 업데이트가 우선하도록 되돌린 값 위에 다시 병합
+        with self._cond:
+            for row in rows:
+                # INSERT 전이므로 그 사이 들어온 업데이트는 _updates 에 있다
+                self._merge(row, self._updates.pop(row["id"], {}))
+                self._rows[row["id"]] = row
+            for id, fields in updates.items():
+                newer = self._updates.pop(id, {})
+                self._updates[id] = fields
+                self._merge(fields, newer)
+
+    @staticmethod
+    def _write_updates(db: OrmSession, updates: dict[int, dict]) -> None:
+        # 갱신할 컬럼 조합별로 UPDATE ... WHERE id = ? 한 번 (executemany)
+        table = QueryLogOrm.__table__
+        groups: dict[tuple[str, ...], list[dict]] = defaultdict(list)
+        for id, fields in updates.items():
+            groups[tuple(sorted(fields))].append({"_id": id, **fields})
+        for params in groups.values():
+            db.execute(update(table).where(table.c.id == bindparam("_id")), params)
+
+    def _flush_once(self) -> bool:
+        with self._flush_lock:
+            rows, updates = self._take_batch()
+            if not rows and not updates:
+                return False
+
+            try:
+                with Session() as db:
+                    if rows:
+                        db.execute(insert(QueryLogOrm.__table__), rows)
+                    if updates:
+                        self._write_updates(db, updates)
+                    db.commit()
+            except BaseException:
+                self._restore(rows, updates)
+                raise
+
+            with self._cond:
+                self._cond.notify_all()
+            return True
@@ -0,0 +1,45 @@
+from sqlalchemy.exc import IntegrityError
+
+from app.enums import SourceType
+from app.repositories.sync_state import SyncStateRepository
+from infra.db.base import Session
+from infra.db.orm.base import SyncState as SyncStateOrm
+
+
+class SyncStateRepositoryImpl(SyncStateRepository):
+    def get(self, source_type: SourceType, source_key: str) -> str | None:
+        with Session() as db:
+            return (
+                db.query(SyncStateOrm.value)
+                .filter(
+                    SyncStateOrm.source_type == source_type,
+                    SyncStateOrm.source_key == source_key,
+                )
+                .scalar()
+            )
+
+    def set(self, source_type: SourceType, source_key: str, value: str) -> None:
+        with Session() as db:
+            o = (
+                db.query(SyncStateOrm)
+                .filter(
+                    SyncStateOrm.source_type == source_type,
+                    SyncStateOrm.source_key == source_key,
+                )
+                .one_or_none()
+            )
+            if o is None:
+                db.add(SyncStateOrm(source_type=source_type, source_key=source_key, value=value))
+            else:
+                o.value = value
+
+            try:
+                db.commit()
+            except IntegrityError:
+                # 동시에 처음 저장한 경우: 다시 조회해서 갱신
+                db.rollback()
+                db.query(SyncStateOrm).filter(
+                    SyncStateOrm.source_type == source_type,
+                    SyncStateOrm.source_key == source_key,
+                ).update({SyncStateOrm.value: value})
+                db.commit()
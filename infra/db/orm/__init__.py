@@ -1,7 +1,10 @@
-from .base import Chunk, Document, QueryLog
+from .base import Chunk, ChunkEmbedding, Document, IdSequence, QueryLog, SyncState
 
 __all__ = [
     "Chunk",
+    "ChunkEmbedding",
     "Document",
+    "IdSequence",
     "QueryLog",
+    "SyncState",
 ]
@@ -9,7 +9,7 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.enums import Domain, SourceType
 from infra.db.base import Base
@@ -44,10 +44,13 @@ class Document(SoftDeleteMixin, TimestampMixin, Base):
     source_type = Column(Enum(SourceType), nullable=False, comment="문서 출처 유형")
     source_id = Column(String(255), nullable=False, comment="출처에서 제공하는 문서 ID")
     title = Column(String(512), nullable=True, comment="문서 제목")
-    raw_content = Column(Text, nullable=True, comment="문서 내용")
-    raw_content_gz = Column(LargeBinary, nullable=False, comment="압축된 문서 내용")
+    # 본문/압축본은 기본 조회에서 제외하고 접근할 때 따로 읽는다 (메타데이터 조회가 큰 blob 을 옮기지 않도록)
+    raw_content = deferred(Column(Text, nullable=True, comment="문서 내용"))
+    # 스트리밍으로 적재한 큰 파일은 본문을 저장하지 않는다 (raw_content / raw_content_gz 모두 NULL)
+    raw_content_gz = deferred(Column(LargeBinary, nullable=True, comment="압축된 문서 내용"))
     content_hash = Column(String(64), nullable=False, comment="문서 내용 해시")
     version = Column(Integer, nullable=False, default=1, comment="문서 버전")
+    source_version = Column(String(64), nullable=True, comment="출처 쪽 버전 (Notion last_edited_time 등)")
 
     # relation
     chunks = relationship("Chunk", back_populates="document")
@@ -75,3 +78,49 @@ class QueryLog(TimestampMixin, Base):
     output_tokens = Column(Integer, nullable=True, comment="출력 토큰 수")
     total_tokens = Column(Integer, nullable=True, comment="총 토큰 수")
     meta = Column(JSON, nullable=True, comment="메타데이터")
+    query_embedding = Column(LargeBinary, nullable=True, comment="질의 임베딩 (float32)")
+
+
+class IdSequence(TimestampMixin, Base):
+    """DB 에 쓰기 전에 id 를 정하기 위한 시퀀스 (query_log id 를 블록 단위로 미리 예약)"""
+
+    __tablename__ = "id_sequence"
+
+    name = Column(String(64), primary_key=True, comment="시퀀스 이름 (테이블명)")
+    next_id = Column(Integer, nullable=False, comment="다음에 예약할 id")
+
+
+class ChunkEmbedding(TimestampMixin, Base):
+    __tablename__ = "chunk_embedding"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="청크 임베딩 ID")
+    model = Column(String(128), nullable=False, comment="임베딩 모델")
+    dim = Column(Integer, nullable=False, comment="임베딩 차원")
+    chunk_hash = Column(String(64), nullable=False, comment="청크 내용 해시")
+    vector = Column(LargeBinary, nullable=False, comment="임베딩 (float16)")
+
+    __table_args__ = (
+        UniqueConstraint(
+            "model",
+            "dim",
+            "chunk_hash",
+            name="u_idx_model_dim_chunk_hash",
+        ),
+    )
+
+
+class SyncState(TimestampMixin, Base):
+    __tablename__ = "sync_state"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="동기화 상태 ID")
+    source_type = Column(Enum(SourceType), nullable=False, comment="출처 유형")
+    source_key = Column(String(255), nullable=False, comment="출처 내 동기화 단위 (Slack 채널 ID 등)")
+    value = Column(String(255), nullable=False, comment="마지막으로 반영한 위치 (Slack ts 등)")
+
+    __table_args__ = (
+        UniqueConstraint(
+            "source_type",
+            "source_key",
+            name="u_idx_source_type_source_key",
+        ),
+    )
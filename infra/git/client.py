@@ -0,0 +1,97 @@
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+# `git hash-object -t tree /dev/null`: 전체 목록을 "빈 트리 대비 diff" 로 구한다
+_EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+@dataclass(frozen=True, slots=True)
+class GitChange:
+    """커밋 사이 파일 변경 (status: A 추가 / M 수정 / D 삭제, rename 은 D + A 로 나뉨)"""
+
+    status: str
+    path: str
+    binary: bool = False
+
+
+class GitRepo:
+    """
+    로컬 clone 을 git CLI 로 읽는다 (작업 트리가 아니라 커밋 기준).
+    파일 내용은 `git cat-file --batch` 프로세스 하나로 읽어 파일마다 프로세스를 띄우지 않는다 (스레드 간 공유).
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._cat_file: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    def _git(self, *args: str) -> bytes:
+        return subprocess.run(
+            ["git", "-C", str(self.path), *args],
+            check=True,
+            capture_output=True,
+        ).stdout
+
+    def resolve(self, rev: str = "HEAD") -> str:
+        return self._git("rev-parse", "--verify", f"{rev}^{{commit}}").decode().strip()
+
+    def has_commit(self, sha: str) -> bool:
+        """force push / shallow clone 등으로 이전 커밋이 없어졌는지 확인"""
+        try:
+            self.resolve(sha)
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    def _diff(self, fmt: str, old: str, new: str) -> list[bytes]:
+        out = self._git("diff", fmt, "-z", "--no-renames", "--ignore-submodules=all", old, new)
+        return out.split(b"\0")[:-1]
+
+    def changes(self, old: str | None, new: str) -> list[GitChange]:
+        """old -> new 사이 변경된 파일. old 가 없으면 new 의 모든 파일을 A 로 반환"""
+        base = old or _EMPTY_TREE
+
+        # numstat 의 "-\t-\t<path>" 는 바이너리 파일
+        binary = {
+            entry.split(b"\t", 2)[2].decode()
+            for entry in self._diff("--numstat", base, new)
+            if entry.startswith(b"-\t")
+        }
+
+        fields = self._diff("--name-status", base, new)
+        # T(타입 변경) 등은 수정으로 취급
+        return [
+            GitChange(status=status if status in ("A", "D") else "M", path=path, binary=path in binary)
+            for status, path in ((fields[i].decode(), fields[i + 1].decode()) for i in range(0, len(fields), 2))
+        ]
+
+    def read_blob(self, rev: str, path: str) -> tuple[str, bytes]:
+        """(blob sha, 내용). 해당 커밋에 파일이 없으면 FileNotFoundError"""
+        with self._lock:
+            if self._cat_file is None or self._cat_file.poll() is not None:
+                self._cat_file = subprocess.Popen(
+                    ["git", "-C", str(self.path), "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                )
+            proc = self._cat_file
+            proc.stdin.write(f"{rev}:{path}\n".encode())
+            proc.stdin.flush()
+
+            header = proc.stdout.readline().decode().split()
+            if len(header) != 3:
+                # "<object> missing" 또는 "<object> ambiguous"
+                raise FileNotFoundError(f"Not found in {rev}: {path}")
+            oid, _, size = header
+            data = proc.stdout.read(int(size))
+            proc.stdout.read(1)  # 내용 뒤의 개행
+            return oid, data
+
+    def close(self) -> None:
+        with self._lock:
+            if self._cat_file is not None:
+                self._cat_file.stdin.close()
+                self._cat_file.wait()
+                self._cat_file = None
@@ -1,13 +1,30 @@
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
 
 from app.enums import SourceType
-from app.models.base import Document
+from app.models.base import Chunk, Document, StreamedContent
 from app.repositories.ingestor import Ingestor
+from app.utils import ContentDigest
+from config import settings
 
 
 class FileIngestor(Ingestor):
+    """
+    파일 하나 = 문서 하나. stream_threshold 보다 큰 파일은 전체를 메모리에 올리지 않는다:
+    build_document 에서 한 번 훑으며 해시만 계산하고 (Document.raw_content 는 비우고 streamed 에 담음),
+    get_chunks 에서 다시 읽으면서 청크를 하나씩 만든다.
+    """
+
     source_type = SourceType.FILE
 
+    _READ_BUFFER = 1024 * 1024
+
+    def __init__(self, *args, stream_threshold: int | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream_threshold = settings.FILE_STREAM_THRESHOLD if stream_threshold is None else stream_threshold
+
     def build_document(self) -> Document:
         path = Path(self.source_id)
 
@@ -17,6 +34,9 @@ class FileIngestor(Ingestor):
         if not path.is_file():
             raise ValueError(f"Not a file: {path}")
 
+        if path.stat().st_size > self.stream_threshold:
+            return self._build_streamed_document(path)
+
         raw = path.read_text(encoding="utf-8")
         return Document(
             domain=self.domain,
@@ -25,3 +45,110 @@ class FileIngestor(Ingestor):
             title=path.name,
             raw_content=raw,
         )
+
+    def _read_blocks(self, path: Path) -> Iterator[str]:
+        # read_text 와 같은 디코딩/개행 변환
+        with path.open(encoding="utf-8") as f:
+            while block := f.read(self._READ_BUFFER):
+                yield block
+
+    def _build_streamed_document(self, path: Path) -> Document:
+        digest = ContentDigest()
+        for block in self._read_blocks(path):
+            digest.update(block)
+        content_hash = digest.finish()
+
+        return Document(
+            domain=self.domain,
+            source_type=self.source_type,
+            source_id=str(path),
+            title=path.name,
+            raw_content="",
+            streamed=StreamedContent(content_hash=content_hash),
+        )
+
+    def _iter_streamed_chunks(self, path: Path, content_hash: str) -> Iterator[Chunk]:
+        digest = ContentDigest()
+
+        def lines() -> Iterator[str]:
+            # 블록 단위로 읽고 마지막 "\n" 까지만 나눠서 전체 텍스트에 splitlines() 를 한 것과 같은 줄을 내보낸다
+            pending: list[str] = []
+            for block in self._read_blocks(path):
+                digest.update(block)
+                cut = block.rfind("\n")
+                if cut < 0:
+                    pending.append(block)
+                    continue
+                yield from "".join([*pending, block[:cut]]).splitlines()
+                pending = [block[cut + 1 :]]
+            yield from "".join(pending).splitlines()
+
+        for idx, (context_id, text) in enumerate(self.iter_context_chunks(lines())):
+            yield Chunk(chunk_index=idx, chunk_text=text, context_id=context_id)
+
+        # build_document 이후 파일이 바뀌었으면 저장한 해시와 청크가 맞지 않으므로 실패 처리 (다음 적재에서 다시)
+        if digest.finish() != content_hash:
+            raise RuntimeError(f"File changed while ingesting: {path}")
+
+    def get_chunks(self, doc: Document) -> Iterable[Chunk]:
+        if doc.streamed is None:
+            return super().get_chunks(doc)
+
+        # build_document 와 다른 프로세스에서 호출될 수 있으므로 상태 없이 파일을 다시 읽는다
+        return self._iter_streamed_chunks(Path(doc.source_id), doc.streamed.content_hash)
+
+
+def _glob_regex(pattern: str) -> re.Pattern[str]:
+    """root 기준 상대 경로용 glob: `**/` 는 0개 이상 디렉토리, `*`/`?` 는 `/` 를 넘지 않음"""
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out))
+
+
+def glob_filter(include: list[str], exclude: list[str] | None = None) -> Callable[[str], bool]:
+    """상대 경로(`/` 구분)가 include 글롭 중 하나에 맞고 exclude 글롭에는 맞지 않으면 True"""
+    includes = [_glob_regex(p) for p in include]
+    excludes = [_glob_regex(p) for p in exclude or []]
+
+    def match(rel: str) -> bool:
+        return any(r.fullmatch(rel) for r in includes) and not any(r.fullmatch(rel) for r in excludes)
+
+    return match
+
+
+def find_files(root: str | Path, include: list[str], exclude: list[str] | None = None) -> Iterator[Path]:
+    """
+    root 아래에서 include 글롭 중 하나에 맞고 exclude 글롭에는 맞지 않는 파일을 경로 순으로 반환.
+    exclude 에 걸리는 디렉토리(예: `**/node_modules/**`)는 내려가지 않는다.
+    """
+    root = Path(root)
+    match = glob_filter(include, exclude)
+    excludes = [_glob_regex(p) for p in exclude or []]
+
+    def excluded(rel: str) -> bool:
+        return any(r.fullmatch(rel) for r in excludes)
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else f"{rel_dir}/"
+
+        dirnames[:] = sorted(d for d in dirnames if not (excluded(prefix + d) or excluded(f"{prefix}{d}/")))
+        for name in sorted(filenames):
+            if match(prefix + name):
+                yield Path(dirpath) / name
@@ -0,0 +1,88 @@
+from pathlib import PurePosixPath
+
+from app.enums import SourceType
+from app.models.base import Chunk, Document
+from app.repositories.ingestor import Ingestor
+from infra.git.client import GitRepo
+
+# 헤딩 기준 컨텍스트 청킹을 적용할 확장자 (그 외에는 `#` 주석이 헤딩으로 잘리지 않도록 코드로 취급)
+_MARKDOWN_SUFFIXES = {".md", ".markdown", ".mdx"}
+
+
+class GitIngestor(Ingestor):
+    """
+    로컬 git clone 의 파일 하나 = 문서 하나 (source_id = "{repo_name}:{path}").
+    작업 트리가 아니라 commit 시점의 내용을 읽고, blob sha 를 source_version 으로 저장한다.
+    """
+
+    source_type = SourceType.GITHUB
+
+    def __init__(self, *args, repo: GitRepo | None = None, commit: str = "HEAD", **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if repo is None:
+            raise ValueError("GitIngestor requires repo (GitRepo of the local clone).")
+
+        self.repo = repo
+        self.commit = commit
+
+    @staticmethod
+    def file_source_id(repo_name: str, path: str) -> str:
+        return f"{repo_name}:{path}"
+
+    @property
+    def path(self) -> str:
+        return self.source_id.split(":", 1)[1]
+
+    def build_document(self) -> Document:
+        blob_sha, data = self.repo.read_blob(self.commit, self.path)
+
+        return Document(
+            domain=self.domain,
+            source_type=self.source_type,
+            source_id=self.source_id,
+            title=self.title or self.path,
+            raw_content=self._decode(data),
+            source_version=blob_sha,
+        )
+
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        """
+        바이너리는 git diff(numstat) 에서 이미 걸러지므로 여기까지 온 파일은 텍스트로 읽는다.
+        UTF-8 이 아닌 바이트는 U+FFFD 로 바꾸고 NUL 은 버린다 (한 파일 때문에 적재가 실패해 커밋이 기록되지 않는 일이 없도록).
+        """
+        return data.decode("utf-8", errors="replace").replace("\0", "")
+
+    def get_chunks(self, doc: Document) -> list[Chunk]:
+        if PurePosixPath(self.path).suffix.lower() in _MARKDOWN_SUFFIXES:
+            return super().get_chunks(doc)
+
+        # 코드는 파일 전체가 하나의 컨텍스트, 들여쓰기를 유지한 채 줄 단위로 자른다
+        return [
+            Chunk(chunk_index=idx, chunk_text=text, context_id=0)
+            for idx, text in enumerate(self._chunk_code(doc.raw_content.splitlines()))
+        ]
+
+    @staticmethod
+    def _chunk_code(lines: list[str], max_chars: int = 900) -> list[str]:
+        chunks: list[str] = []
+        buf: list[str] = []
+        size = 0
+
+        for ln in lines:
+            ln = ln.rstrip()
+            if not ln and not buf:
+                continue
+
+            if size + len(ln) + 1 > max_chars and buf:
+                chunks.append("\n".join(buf).rstrip())
+                buf, size = [], 0
+                if not ln:
+                    continue
+            buf.append(ln)
+            size += len(ln) + 1
+
+        if buf and "\n".join(buf).strip():
+            chunks.append("\n".join(buf).rstrip())
+        return chunks
@@ -1,4 +1,6 @@
-from typing import Any, Iterable
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
 
 from app.enums import SourceType
 from app.models.base import Document
@@ -10,17 +12,34 @@ from infra.notion.client import NotionClient
 class NotionIngestor(Ingestor):
     source_type = SourceType.NOTION
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        client: NotionClient | None = None,
+        max_workers: int | None = None,
+        last_edited_time: str | None = None,
+        **kwargs,
+    ):
+        """last_edited_time: 목록 조회(notion-sync)에서 이미 받은 경우 페이지 조회를 생략하고 title 을 그대로 사용"""
         super().__init__(*args, **kwargs)
 
-        if not settings.NOTION_API_TOKEN:
-            raise ValueError("NOTION_API_TOKEN is not set in settings.")
+        if client is None:
+            if not settings.NOTION_API_TOKEN:
+                raise ValueError("NOTION_API_TOKEN is not set in settings.")
+            client = NotionClient(token=settings.NOTION_API_TOKEN, rate_limit=settings.NOTION_RATE_LIMIT)
 
-        self.client = NotionClient(token=settings.NOTION_API_TOKEN)
+        self.client = client
+        self.max_workers = max_workers or settings.NOTION_MAX_WORKERS
+        self.last_edited_time = last_edited_time
 
     def build_document(self) -> Document:
-        page = self.client.get_page(self.source_id)
-        title = self._extract_page_title(page) or self.title or "(Untitled)"
+        if self.last_edited_time is None:
+            page = self.client.get_page(self.source_id)
+            title = self._extract_page_title(page) or self.title or "(Untitled)"
+            last_edited_time = page.get("last_edited_time")
+        else:
+            title = self.title or "(Untitled)"
+            last_edited_time = self.last_edited_time
 
         blocks = self._get_blocks_recursive(self.source_id)
         content = self.blocks_to_text(blocks).strip()
@@ -31,6 +50,7 @@ class NotionIngestor(Ingestor):
             source_id=self.source_id,
             title=title,
             raw_content=content,
+            source_version=last_edited_time,
         )
 
     # -------------------------
@@ -53,32 +73,40 @@ class NotionIngestor(Ingestor):
         return None
 
     def _get_blocks_recursive(self, block_id: str) -> list[dict[str, Any]]:
-        """Fetch blocks and their children recursively."""
-        blocks = self.client.get_page_blocks(block_id)
-
-        out: list[dict[str, Any]] = []
-        for b in blocks:
-            out.append(b)
-            if b.get("has_children") and b.get("id"):
-                out.extend(self._get_block_children_recursive(b["id"]))
-        return out
-
-    def _get_block_children_recursive(self, block_id: str) -> list[dict[str, Any]]:
-        # NotionClient wraps the SDK; for recursion we access the underlying client.
-        sdk = getattr(self.client, "_client", None)
-        if sdk is None:
-            return []
-
+        """
+        블록 트리를 BFS 로 가져온다 (블록별 자식 조회를 max_workers 개까지 동시에, 속도 제한은 client 에서).
+        반환 순서는 DFS 와 같다: 블록 바로 뒤에 그 자식들.
+        """
+        children: dict[str, list[dict[str, Any]]] = {}
+        seen = {block_id}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="koo-notion") as executor:
+            pending: dict[Future, str] = {executor.submit(self._get_block_children, block_id): block_id}
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        parent_id = pending.pop(future)
+                        children[parent_id] = future.result()
+                        for b in children[parent_id]:
+                            child_id = b.get("id")
+                            if b.get("has_children") and child_id and child_id not in seen:
+                                seen.add(child_id)
+                                pending[executor.submit(self._get_block_children, child_id)] = child_id
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        return self._flatten_blocks(block_id, children)
+
+    def _get_block_children(self, block_id: str) -> list[dict[str, Any]]:
+        """한 블록의 자식 전체 (페이지네이션은 cursor 때문에 순차)"""
         collected: list[dict[str, Any]] = []
         cursor: str | None = None
         while True:
-            resp = sdk.blocks.children.list(block_id=block_id, start_cursor=cursor)
-            children = resp.get("results") or []
-
-            for c in children:
-                collected.append(c)
-                if c.get("has_children") and c.get("id"):
-                    collected.extend(self._get_block_children_recursive(c["id"]))
+            resp = self.client.list_block_children(block_id, cursor)
+            collected.extend(resp.get("results") or [])
 
             if not resp.get("has_more"):
                 break
@@ -86,6 +114,21 @@ class NotionIngestor(Ingestor):
 
         return collected
 
+    @staticmethod
+    def _flatten_blocks(root_id: str, children: dict[str, list[dict[str, Any]]]) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        stack = [iter(children.get(root_id, []))]
+        while stack:
+            b = next(stack[-1], None)
+            if b is None:
+                stack.pop()
+                continue
+
+            out.append(b)
+            if b.get("has_children") and b.get("id") in children:
+                stack.append(iter(children[b["id"]]))
+        return out
+
     # -------------------------
     # Block → text
     # -------------------------
@@ -0,0 +1,70 @@
+from datetime import UTC, datetime
+
+from app.enums import SourceType
+from app.models.base import Chunk, Document
+from app.repositories.ingestor import Ingestor
+from config import settings
+from infra.slack.client import SlackClient
+
+
+class SlackIngestor(Ingestor):
+    """
+    Slack 스레드 하나 = 문서 하나 (source_id = "{channel_id}:{thread_ts}").
+    답글 없는 메시지는 메시지 하나짜리 스레드로 취급하고, 스레드 전체를 하나의 컨텍스트로 청킹한다.
+    """
+
+    source_type = SourceType.SLACK
+
+    def __init__(self, *args, client: SlackClient | None = None, message: dict | None = None, **kwargs):
+        """message: history 에서 받은 부모 메시지 (답글이 없으면 conversations_replies 조회를 생략)"""
+        super().__init__(*args, **kwargs)
+
+        if client is None:
+            if not settings.SLACK_BOT_TOKEN:
+                raise ValueError("SLACK_BOT_TOKEN is not set in settings.")
+            client = SlackClient(token=settings.SLACK_BOT_TOKEN)
+
+        self.client = client
+        self.message = message
+
+    @staticmethod
+    def thread_source_id(channel_id: str, thread_ts: str) -> str:
+        return f"{channel_id}:{thread_ts}"
+
+    def build_document(self) -> Document:
+        channel_id, thread_ts = self.source_id.rsplit(":", 1)
+
+        if self.message is not None and not self.message.get("reply_count"):
+            messages = [self.message]
+        else:
+            messages = list(self.client.iter_thread_messages(channel_id, thread_ts))
+
+        lines = [line for line in (self._format_message(m) for m in messages) if line]
+        root_text = (messages[0].get("text") or "").strip() if messages else ""
+        title = self.title or f"#{channel_id} {root_text.splitlines()[0][:80] if root_text else thread_ts}"
+
+        return Document(
+            domain=self.domain,
+            source_type=self.source_type,
+            source_id=self.source_id,
+            title=title,
+            raw_content="\n".join(lines),
+            source_version=max((m["ts"] for m in messages), key=float, default=thread_ts),
+        )
+
+    def get_chunks(self, doc: Document) -> list[Chunk]:
+        # 스레드가 하나의 컨텍스트: 메시지 본문의 `#` 으로 나누지 않는다
+        lines = [ln for ln in doc.raw_content.splitlines() if ln.strip()]
+        return [
+            Chunk(chunk_index=idx, chunk_text=text, context_id=0) for idx, text in enumerate(self._chunk_lines(lines))
+        ]
+
+    @staticmethod
+    def _format_message(message: dict) -> str | None:
+        text = (message.get("text") or "").strip()
+        if not text:
+            return None
+
+        at = datetime.fromtimestamp(float(message["ts"]), UTC).strftime("%Y-%m-%d %H:%M")
+        user = message.get("user") or message.get("username") or message.get("bot_id") or "unknown"
+        return f"[{at}] {user}: {text}"
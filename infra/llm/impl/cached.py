@@ -0,0 +1,188 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.repositories.llm import Embedder as EmbedderRepository
+from app.utils import normalize_content, pack_embedding, unpack_embedding
+
+
+@dataclass(slots=True)
+class EmbeddingCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+
+class _SqliteEmbeddingStore:
+    """질의 임베딩 디스크 캐시 (key -> float32 blob), 최근 접근 순으로 max_entries 유지"""
+
+    def __init__(self, path: str, max_entries: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embedding ("
+            " cache_key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " accessed_at REAL NOT NULL"
+            ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON query_embedding (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> list[float] | None:
+        row = self._conn.execute("SELECT vector FROM query_embedding WHERE cache_key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        self._conn.execute("UPDATE query_embedding SET accessed_at = ? WHERE cache_key = ?", (time.time(), key))
+        self._conn.commit()
+
+        return unpack_embedding(row[0])
+
+    def put(self, key: str, vector: list[float]) -> int:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO query_embedding (cache_key, vector, accessed_at) VALUES (?, ?, ?)",
+            (key, pack_embedding(vector), time.time()),
+        )
+        cur = self._conn.execute(
+            "DELETE FROM query_embedding WHERE cache_key IN ("
+            " SELECT cache_key FROM query_embedding ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self._max_entries,),
+        )
+        self._conn.commit()
+        return cur.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachedEmbedder(EmbedderRepository):
+    """
+    Embedder 데코레이터: embed_query 결과를 (모델, 차원, 정규화된 질의) 키로 캐싱.
+    - 1차: 프로세스 내 LRU
+    - 2차(선택): SQLite 디스크 캐시
+    embed_queries 는 캐시에 없는 질의만 모아 한 번에 위임하고, embed_documents 는 그대로 위임한다.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbedderRepository,
+        *,
+        model: str,
+        max_entries: int = 1024,
+        disk_path: str | None = None,
+        disk_max_entries: int = 100_000,
+    ) -> None:
+        self._embedder = embedder
+        self._model = model
+        self._max_entries = max_entries
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._disk = _SqliteEmbeddingStore(disk_path, disk_max_entries) if disk_path else None
+        self._lock = threading.Lock()
+        self.stats = EmbeddingCacheStats()
+
+    @property
+    def dim(self) -> int:
+        return self._embedder.dim
+
+    def _cache_key(self, text: str) -> str:
+        raw = f"{self._model}\x00{self.dim}\x00{normalize_content(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _lookup(self, key: str) -> list[float] | None:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return list(vector)
+
+            if self._disk is not None:
+                vector = self._disk.get(key)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self.stats.disk_hits += 1
+                    return list(vector)
+
+            self.stats.misses += 1
+            return None
+
+    def _store(self, key: str, vector: list[float]) -> None:
+        with self._lock:
+            self._remember(key, vector)
+            if self._disk is not None:
+                self.stats.evictions += self._disk.put(key, vector)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._cache_key(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector
+
+        vector = self._embedder.embed_query(text)
+        self._store(key, vector)
+        return list(vector)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._cache_key(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector
+
+        vector = await self._embedder.aembed_query(text)
+        self._store(key, vector)
+        return list(vector)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._cache_key(text) for text in texts]
+        vectors: dict[str, list[float]] = {}
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            vector = self._lookup(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                vectors[key] = vector
+
+        if missing:
+            for key, vector in zip(missing, self._embedder.embed_queries(list(missing.values()))):
+                self._store(key, vector)
+                vectors[key] = vector
+
+        return [list(vectors[key]) for key in keys]
+
+    def count_tokens(self, text: str) -> int:
+        return self._embedder.count_tokens(text)
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return self._embedder._embed_batch(texts)
+
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        return await self._embedder._aembed_batch(texts)
+
+    def embed_documents(self, texts: list[str], token_counts: list[int] | None = None) -> list[list[float]]:
+        return self._embedder.embed_documents(texts, token_counts)
+
+    async def aembed_documents(self, texts: list[str], token_counts: list[int] | None = None) -> list[list[float]]:
+        return await self._embedder.aembed_documents(texts, token_counts)
@@ -1,13 +1,15 @@
-from typing import Sequence
+from collections.abc import Iterator, Sequence
 
 import httpx
 from pydantic_ai import Agent, RunUsage
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.ollama import OllamaProvider
 
+from app.context_packer import ContextPacker
 from app.models.base import VectorSearchChunk
 from app.models.llm import Output, RAGPrompt
 from app.repositories.llm import Answerer as AnswererRepository
+from app.repositories.llm import AnswerStreamEvent, EmbedBatchPolicy
 from app.repositories.llm import Embedder as EmbedderRepository
 from config import settings
 
@@ -18,6 +20,14 @@ class OllamaEmbedder(EmbedderRepository):
         self._model: str = settings.EMBEDDING_MODEL
         self._dim = settings.EMBEDDING_DIM
         self._client = httpx.Client(base_url=self._base_url, timeout=60)
+        self._aclient: httpx.AsyncClient | None = None
+        self._batch_policy = EmbedBatchPolicy(
+            max_items=settings.EMBEDDING_BATCH_MAX_ITEMS,
+            max_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+            concurrency=settings.EMBEDDING_CONCURRENCY,
+            retries=settings.EMBEDDING_BATCH_RETRIES,
+        )
+        self._token_model = settings.EMBEDDING_MODEL
 
     def _probe_dim(self) -> int:
         vec = self._embed_one("dimension probe")
@@ -34,14 +44,13 @@ class OllamaEmbedder(EmbedderRepository):
 
         raise RuntimeError(f"Unexpected Ollama embedding response shape: keys={list(data.keys())}")
 
-    def _embed_batch(self, texts: Sequence[str]) -> list[list[float]]:
-        url = "/api/embed"
-        payload = {
+    def _embed_payload(self, texts: Sequence[str]) -> dict:
+        return {
             "model": self._model,
             "input": list(texts) if len(texts) > 1 else texts[0],
         }
 
-        resp = self._client.post(url, json=payload)
+    def _parse_response(self, resp: httpx.Response) -> list[list[float]]:
         try:
             resp.raise_for_status()
         except httpx.HTTPStatusError as e:
@@ -51,6 +60,17 @@ class OllamaEmbedder(EmbedderRepository):
         vectors = self._parse_embeddings(data)
         return vectors
 
+    def _embed_batch(self, texts: Sequence[str]) -> list[list[float]]:
+        resp = self._client.post("/api/embed", json=self._embed_payload(texts))
+        return self._parse_response(resp)
+
+    async def _aembed_batch(self, texts: Sequence[str]) -> list[list[float]]:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(base_url=self._base_url, timeout=60)
+
+        resp = await self._aclient.post("/api/embed", json=self._embed_payload(texts))
+        return self._parse_response(resp)
+
     def _embed_one(self, text: str) -> list[float]:
         vecs = self._embed_batch([text])
         return vecs[0] if vecs else []
@@ -64,10 +84,13 @@ class OllamaEmbedder(EmbedderRepository):
     def embed_query(self, text: str) -> list[float]:
         return self._embed_one(text)
 
-    def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        if not texts:
-            return []
-        return self._embed_batch(texts)
+    async def aembed_query(self, text: str) -> list[float]:
+        vecs = await self._aembed_batch([text])
+        return vecs[0] if vecs else []
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # Ollama 는 질의/문서 임베딩 구분이 없으므로 문서 배치 경로를 그대로 사용
+        return self.embed_documents(texts)
 
 
 class OllamaAnswerer(AnswererRepository):
@@ -78,6 +101,7 @@ class OllamaAnswerer(AnswererRepository):
         )
 
         self._prompt = prompt or RAGPrompt.default()
+        self._packer = ContextPacker(max_tokens=settings.CONTEXT_MAX_TOKENS, model=settings.LLM_MODEL)
         self._agent = Agent(
             model,
             output_type=Output,
@@ -90,3 +114,16 @@ class OllamaAnswerer(AnswererRepository):
 
         result = self._agent.run_sync(prompt)
         return result.output, result.usage()
+
+    async def aanswer(self, question: str, contexts: list[VectorSearchChunk]) -> tuple[Output, RunUsage]:
+        ctx = self._build_context(contexts)
+        prompt = self._prompt.render(question=question, context=ctx)
+
+        result = await self._agent.run(prompt)
+        return result.output, result.usage()
+
+    def answer_stream(self, question: str, contexts: list[VectorSearchChunk]) -> Iterator[AnswerStreamEvent]:
+        ctx = self._build_context(contexts)
+        prompt = self._prompt.render(question=question, context=ctx)
+
+        yield from self._stream_agent(self._agent, prompt)
@@ -1,11 +1,14 @@
 import asyncio
+from collections.abc import Iterator
 
 from pydantic_ai import Agent, Embedder, RunUsage
 from pydantic_ai.embeddings import EmbeddingSettings
 
+from app.context_packer import ContextPacker
 from app.models.base import VectorSearchChunk
 from app.models.llm import Output, RAGPrompt
 from app.repositories.llm import Answerer as AnswererRepository
+from app.repositories.llm import AnswerStreamEvent, EmbedBatchPolicy
 from app.repositories.llm import Embedder as EmbedderRepository
 from config import settings
 
@@ -19,24 +22,41 @@ class OpenaiEmbedder(EmbedderRepository):
 
         emb_settings = EmbeddingSettings(dimensions=self._dim) if self._dim else None
         self._embedder = Embedder(settings.EMBEDDING_MODEL, settings=emb_settings)
+        self._batch_policy = EmbedBatchPolicy(
+            max_items=settings.EMBEDDING_BATCH_MAX_ITEMS,
+            max_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+            concurrency=settings.EMBEDDING_CONCURRENCY,
+            retries=settings.EMBEDDING_BATCH_RETRIES,
+        )
+        self._token_model = settings.EMBEDDING_MODEL
 
     @property
     def dim(self) -> int:
         return self._dim
 
     def embed_query(self, text: str) -> list[float]:
-        async def _run() -> list[float]:
-            result = await self._embedder.embed_query(text)
-            return list(result.embeddings[0])
+        return asyncio.run(self.aembed_query(text))
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        result = asyncio.run(self._embedder.embed_query(texts))
+        return [list(v) for v in result.embeddings]
+
+    def embed_documents(self, texts: list[str], token_counts: list[int] | None = None) -> list[list[float]]:
+        # 배치 동시 요청은 하나의 이벤트 루프에서 처리
+        return asyncio.run(self.aembed_documents(texts, token_counts))
 
-        return asyncio.run(_run())
+    async def aembed_query(self, text: str) -> list[float]:
+        result = await self._embedder.embed_query(text)
+        return list(result.embeddings[0])
 
-    def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        async def _run() -> list[list[float]]:
-            result = await self._embedder.embed_documents(texts)
-            return [list(v) for v in result.embeddings]
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return asyncio.run(self._aembed_batch(texts))
 
-        return asyncio.run(_run())
+    async def _aembed_batch(self, texts: list[str]) -> list[list[float]]:
+        result = await self._embedder.embed_documents(texts)
+        return [list(v) for v in result.embeddings]
 
 
 class OpenaiAnswerer(AnswererRepository):
@@ -45,6 +65,7 @@ class OpenaiAnswerer(AnswererRepository):
             raise ValueError("OPENAI_API_KEY must be set")
 
         self._prompt = prompt or RAGPrompt.default()
+        self._packer = ContextPacker(max_tokens=settings.CONTEXT_MAX_TOKENS, model=settings.LLM_MODEL)
         self._agent = Agent(
             settings.LLM_MODEL,
             output_type=Output,
@@ -57,3 +78,16 @@ class OpenaiAnswerer(AnswererRepository):
 
         result = self._agent.run_sync(prompt)
         return result.output, result.usage()
+
+    async def aanswer(self, question: str, contexts: list[VectorSearchChunk]) -> tuple[Output, RunUsage]:
+        ctx = self._build_context(contexts)
+        prompt = self._prompt.render(question=question, context=ctx)
+
+        result = await self._agent.run(prompt)
+        return result.output, result.usage()
+
+    def answer_stream(self, question: str, contexts: list[VectorSearchChunk]) -> Iterator[AnswerStreamEvent]:
+        ctx = self._build_context(contexts)
+        prompt = self._prompt.render(question=question, context=ctx)
+
+        yield from self._stream_agent(self._agent, prompt)
@@ -1,22 +1,97 @@
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
 from notion_client import Client as NotionSDKClient
+from notion_client.errors import APIResponseError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class NotionPageRef:
+    """목록 조회 결과 (블록은 가져오지 않음)"""
+
+    id: str
+    last_edited_time: str
+    title: str | None = None
+
+
+class _Throttle:
+    """
+    스레드 간 공유하는 요청 간격 제한 (초당 rate 회).
+    429 를 받으면 pause() 로 모든 스레드의 다음 요청을 Retry-After 이후로 미룬다.
+    """
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + self._interval
+        if at > now:
+            time.sleep(at - now)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._next_at = max(self._next_at, time.monotonic() + seconds)
 
 
 class NotionClient:
-    def __init__(self, token: str):
-        self._client = NotionSDKClient(auth=token)
+    def __init__(
+        self,
+        token: str | None = None,
+        *,
+        sdk: Any | None = None,
+        rate_limit: float = 3.0,
+        max_retries: int = 5,
+    ):
+        """sdk: notion_client.Client 와 같은 인터페이스 (테스트/오프라인용 FakeNotionSDK 주입 가능)"""
+        self._client = sdk if sdk is not None else NotionSDKClient(auth=token)
+        self._throttle = _Throttle(rate_limit)
+        self._max_retries = max_retries
+
+    def _call(self, fn, **kwargs) -> dict:
+        for attempt in range(self._max_retries + 1):
+            self._throttle.wait()
+            try:
+                return fn(**kwargs)
+            except APIResponseError as e:
+                if e.status != 429 or attempt >= self._max_retries:
+                    raise
+                delay = self._retry_after(e, attempt)
+                logger.warning("notion rate limited, retrying in %.1fs", delay)
+                self._throttle.pause(delay)
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _retry_after(error: APIResponseError, attempt: int) -> float:
+        """Retry-After 헤더(초)를 따르고, 없으면 지수 backoff"""
+        try:
+            return float(error.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            return min(2.0**attempt, 30.0)
 
     def get_page(self, page_id: str) -> dict:
-        return self._client.pages.retrieve(page_id=page_id)
+        return self._call(self._client.pages.retrieve, page_id=page_id)
+
+    def list_block_children(self, block_id: str, cursor: str | None = None) -> dict:
+        """blocks.children.list 한 페이지"""
+        return self._call(self._client.blocks.children.list, block_id=block_id, start_cursor=cursor)
 
     def get_page_blocks(self, page_id: str) -> list[dict]:
         blocks: list[dict] = []
         cursor: str | None = None
 
         while True:
-            resp = self._client.blocks.children.list(
-                block_id=page_id,
-                start_cursor=cursor,
-            )
+            resp = self.list_block_children(page_id, cursor)
             blocks.extend(resp["results"])
 
             if not resp.get("has_more"):
@@ -24,3 +99,37 @@ class NotionClient:
             cursor = resp.get("next_cursor")
 
         return blocks
+
+    def _paginate(self, fn, **kwargs) -> Iterator[dict]:
+        cursor: str | None = None
+        while True:
+            resp = self._call(fn, start_cursor=cursor, **kwargs)
+            yield from resp.get("results") or []
+
+            if not resp.get("has_more"):
+                return
+            cursor = resp.get("next_cursor")
+
+    def iter_database_pages(self, database_id: str) -> Iterator[NotionPageRef]:
+        """데이터베이스(의 모든 data source) 에 속한 페이지"""
+        database = self._call(self._client.databases.retrieve, database_id=database_id)
+        for source in database.get("data_sources") or []:
+            for page in self._paginate(self._client.data_sources.query, data_source_id=source["id"], page_size=100):
+                if page.get("object", "page") != "page" or page.get("in_trash") or page.get("archived"):
+                    continue
+                yield NotionPageRef(id=page["id"], last_edited_time=page["last_edited_time"], title=_page_title(page))
+
+    def iter_child_pages(self, page_id: str) -> Iterator[NotionPageRef]:
+        """루트 페이지 바로 아래의 하위 페이지 (child_page 블록)"""
+        for block in self._paginate(self._client.blocks.children.list, block_id=page_id):
+            if block.get("type") != "child_page" or block.get("in_trash") or block.get("archived"):
+                continue
+            title = (block.get("child_page") or {}).get("title") or None
+            yield NotionPageRef(id=block["id"], last_edited_time=block["last_edited_time"], title=title)
+
+
+def _page_title(page: dict) -> str | None:
+    for prop in (page.get("properties") or {}).values():
+        if isinstance(prop, dict) and prop.get("type") == "title":
+            return "".join(t.get("plain_text") or "" for t in prop.get("title") or []).strip() or None
+    return None
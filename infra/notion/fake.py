@@ -0,0 +1,202 @@
+import itertools
+import threading
+import time
+from typing import Any
+
+import httpx
+from notion_client.errors import APIErrorCode, APIResponseError
+
+
+class FakeNotionSDK:
+    """
+    notion_client.Client 중 NotionClient 가 쓰는 엔드포인트만 흉내내는 오프라인 SDK
+    (pages.retrieve / blocks.children.list / databases.retrieve / data_sources.query).
+    NotionClient(sdk=FakeNotionSDK(...)) 로 주입해서 네트워크 없이 적재/동시성/재시도를 확인한다.
+    - page_size 단위 페이지네이션 (start_cursor = 다음 시작 위치)
+    - latency: 요청마다 지연(초)
+    - rate_limit_every: N 번째 요청마다 429 (Retry-After: retry_after 초)
+    """
+
+    def __init__(
+        self,
+        pages: dict[str, dict] | None = None,
+        children: dict[str, list[dict]] | None = None,
+        *,
+        page_size: int = 100,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.0,
+    ):
+        self._pages_by_id = pages if pages is not None else {}
+        self._children = children if children is not None else {}
+        # database_id -> page_id 목록 (data source 는 database 당 하나: f"{database_id}-ds")
+        self._databases: dict[str, list[str]] = {}
+        self.page_size = page_size
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+
+        self.calls = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self.pages = _Pages(self)
+        self.blocks = _Blocks(self)
+        self.databases = _Databases(self)
+        self.data_sources = _DataSources(self)
+
+    @classmethod
+    def from_tree(cls, page_id: str, blocks: list[dict], *, title: str = "", **kwargs) -> "FakeNotionSDK":
+        sdk = cls(**kwargs)
+        sdk.add_page(page_id, blocks, title=title)
+        return sdk
+
+    def add_page(
+        self,
+        page_id: str,
+        blocks: list[dict],
+        *,
+        title: str = "",
+        last_edited_time: str = "2026-01-01T00:00:00.000Z",
+        database_id: str | None = None,
+        parent_page_id: str | None = None,
+    ) -> None:
+        """
+        페이지 추가/교체. blocks 의 각 블록은 "children" 에 자식 블록 목록을 가질 수 있고,
+        id / has_children 은 비어 있으면 채운다. 예: {"type": "paragraph", "text": "...", "children": [...]}
+        """
+
+        def build(parent_id: str, nodes: list[dict]) -> None:
+            out: list[dict] = []
+            for node in nodes:
+                node = dict(node)
+                sub = node.pop("children", None) or []
+                text = node.pop("text", None)
+                block_type = node.setdefault("type", "paragraph")
+                if text is not None:
+                    node[block_type] = {"rich_text": [{"plain_text": text}]}
+                node.setdefault("id", f"{page_id}-{next(self._ids)}")
+                node["has_children"] = bool(sub)
+                out.append(node)
+                if sub:
+                    build(node["id"], sub)
+            self._children[parent_id] = out
+
+        build(page_id, blocks)
+        self._pages_by_id[page_id] = {
+            "object": "page",
+            "id": page_id,
+            "last_edited_time": last_edited_time,
+            "properties": {"title": {"type": "title", "title": [{"plain_text": title}]}},
+        }
+
+        if database_id is not None and page_id not in self._databases.setdefault(database_id, []):
+            self._databases[database_id].append(page_id)
+
+        if parent_page_id is not None:
+            siblings = self._children.setdefault(parent_page_id, [])
+            child = {
+                "object": "block",
+                "id": page_id,
+                "type": "child_page",
+                "child_page": {"title": title},
+                "has_children": False,
+                "last_edited_time": last_edited_time,
+            }
+            idx = next((i for i, b in enumerate(siblings) if b.get("id") == page_id), None)
+            if idx is None:
+                siblings.append(child)
+            else:
+                siblings[idx] = child
+
+    def _paginate(self, items: list[dict], start_cursor: str | None) -> dict:
+        start = int(start_cursor or 0)
+        end = start + self.page_size
+        has_more = end < len(items)
+        return {
+            "object": "list",
+            "results": items[start:end],
+            "has_more": has_more,
+            "next_cursor": str(end) if has_more else None,
+        }
+
+    def _request(self) -> None:
+        with self._lock:
+            self.calls += 1
+            limited = self.rate_limit_every and self.calls % self.rate_limit_every == 0
+            if limited:
+                self.rate_limited += 1
+            else:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        if limited:
+            raise _api_error(429, APIErrorCode.RateLimited, "Rate limited", {"Retry-After": str(self.retry_after)})
+
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _not_found(self, object_id: str) -> APIResponseError:
+        return _api_error(404, APIErrorCode.ObjectNotFound, f"Could not find object with ID: {object_id}")
+
+
+def _api_error(status: int, code: APIErrorCode, message: str, headers: dict | None = None) -> APIResponseError:
+    return APIResponseError(httpx.Response(status, headers=headers), message, code)
+
+
+class _Pages:
+    def __init__(self, sdk: FakeNotionSDK):
+        self._sdk = sdk
+
+    def retrieve(self, page_id: str, **kwargs: Any) -> dict:
+        self._sdk._request()
+        page = self._sdk._pages_by_id.get(page_id)
+        if page is None:
+            raise self._sdk._not_found(page_id)
+        return page
+
+
+class _BlockChildren:
+    def __init__(self, sdk: FakeNotionSDK):
+        self._sdk = sdk
+
+    def list(self, block_id: str, start_cursor: str | None = None, **kwargs: Any) -> dict:
+        self._sdk._request()
+        if block_id not in self._sdk._children:
+            raise self._sdk._not_found(block_id)
+        return self._sdk._paginate(self._sdk._children[block_id], start_cursor)
+
+
+class _Blocks:
+    def __init__(self, sdk: FakeNotionSDK):
+        self.children = _BlockChildren(sdk)
+
+
+class _Databases:
+    def __init__(self, sdk: FakeNotionSDK):
+        self._sdk = sdk
+
+    def retrieve(self, database_id: str, **kwargs: Any) -> dict:
+        self._sdk._request()
+        if database_id not in self._sdk._databases:
+            raise self._sdk._not_found(database_id)
+        return {"object": "database", "id": database_id, "data_sources": [{"id": f"{database_id}-ds", "name": ""}]}
+
+
+class _DataSources:
+    def __init__(self, sdk: FakeNotionSDK):
+        self._sdk = sdk
+
+    def query(self, data_source_id: str, start_cursor: str | None = None, **kwargs: Any) -> dict:
+        self._sdk._request()
+        page_ids = self._sdk._databases.get(data_source_id.removesuffix("-ds"))
+        if page_ids is None:
+            raise self._sdk._not_found(data_source_id)
+        return self._sdk._paginate([self._sdk._pages_by_id[pid] for pid in page_ids], start_cursor)
@@ -1,28 +1,101 @@
+from collections.abc import Iterator
+from typing import Any
+
 from slack_sdk import WebClient
+from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
+
+# 채널 이벤트성 메시지는 적재하지 않음
+_SKIP_SUBTYPES = {
+    "channel_join",
+    "channel_leave",
+    "channel_topic",
+    "channel_purpose",
+    "channel_name",
+    "channel_archive",
+    "channel_unarchive",
+}
+
+
+def _ts(value: str | None) -> float:
+    return float(value) if value else 0.0
 
 
 class SlackClient:
-    def __init__(self, token: str):
-        self._client = WebClient(token=token)
+    def __init__(self, token: str | None = None, *, web_client: Any | None = None, max_retries: int = 5):
+        """web_client: slack_sdk.WebClient 와 같은 인터페이스 (테스트/오프라인용 FakeWebClient 주입 가능)"""
+        if web_client is None:
+            web_client = WebClient(token=token)
+            # 429 는 Retry-After 만큼 기다렸다가 재시도
+            web_client.retry_handlers.append(RateLimitErrorRetryHandler(max_retry_count=max_retries))
+        self._client = web_client
 
-    def fetch_channel_messages(
+    def iter_history_pages(
         self,
         channel_id: str,
+        *,
+        oldest: str | None = None,
         limit: int = 200,
-    ) -> list[dict]:
-        messages: list[dict] = []
+    ) -> Iterator[list[dict]]:
+        """conversations_history 를 페이지 단위로 (최신 메시지부터)"""
         cursor: str | None = None
+        while True:
+            kwargs: dict[str, Any] = {"channel": channel_id, "limit": limit, "cursor": cursor}
+            if oldest:
+                kwargs["oldest"] = oldest
+            resp = self._client.conversations_history(**kwargs)
+            yield resp["messages"]
+
+            cursor = (resp.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                return
 
+    def iter_thread_messages(self, channel_id: str, thread_ts: str, *, limit: int = 200) -> Iterator[dict]:
+        """스레드의 부모 메시지와 답글 (오래된 순)"""
+        cursor: str | None = None
         while True:
-            resp = self._client.conversations_history(
-                channel=channel_id,
-                limit=limit,
-                cursor=cursor,
-            )
-            messages.extend(resp["messages"])
-
-            cursor = resp.get("response_metadata", {}).get("next_cursor")
+            resp = self._client.conversations_replies(channel=channel_id, ts=thread_ts, limit=limit, cursor=cursor)
+            yield from resp["messages"]
+
+            cursor = (resp.get("response_metadata") or {}).get("next_cursor")
             if not cursor:
-                break
+                return
 
+    def iter_updated_threads(
+        self,
+        channel_id: str,
+        *,
+        since: str | None = None,
+        lookback: float = 0.0,
+        limit: int = 200,
+    ) -> Iterator[dict]:
+        """
+        since(ts) 이후에 생겼거나 답글이 달린 스레드의 부모 메시지 (답글 없는 메시지는 메시지 하나짜리 스레드).
+        since 이전 스레드에 달린 답글은 history 에 나타나지 않으므로, lookback 초만큼 앞에서부터 훑어서
+        latest_reply 가 since 이후인 스레드를 다시 가져온다.
+        """
+        oldest = f"{max(_ts(since) - lookback, 0.0):.6f}" if since else None
+        for page in self.iter_history_pages(channel_id, oldest=oldest, limit=limit):
+            for message in page:
+                if message.get("subtype") in _SKIP_SUBTYPES:
+                    continue
+                # 채널에도 보낸 스레드 답글(thread_broadcast)은 부모 스레드에서 함께 가져옴
+                if message.get("thread_ts") not in (None, message["ts"]):
+                    continue
+                if since and max(_ts(message["ts"]), _ts(message.get("latest_reply"))) <= _ts(since):
+                    continue
+                yield message
+
+    @staticmethod
+    def thread_watermark(message: dict) -> str:
+        """스레드 부모 메시지 기준으로 반영된 가장 최근 ts"""
+        return max(message["ts"], message.get("latest_reply") or message["ts"], key=_ts)
+
+    def fetch_channel_messages(
+        self,
+        channel_id: str,
+        limit: int = 200,
+    ) -> list[dict]:
+        messages: list[dict] = []
+        for page in self.iter_history_pages(channel_id, limit=limit):
+            messages.extend(page)
         return messages
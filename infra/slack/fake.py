@@ -0,0 +1,97 @@
+import itertools
+import threading
+from typing import Any
+
+
+class FakeWebClient:
+    """
+    slack_sdk.WebClient 중 SlackClient 가 쓰는 conversations_history / conversations_replies 만 흉내내는 오프라인 클라이언트.
+    SlackClient(web_client=FakeWebClient()) 로 주입하고 post() 로 메시지를 쌓는다.
+    - history 는 최신 메시지부터, replies 는 오래된 순 (Slack 과 동일), limit 단위 cursor 페이지네이션
+    - calls / max_page_size 로 페이지 단위 조회 여부를 확인할 수 있다
+    """
+
+    def __init__(self, start_ts: float = 1_700_000_000.0):
+        self._channels: dict[str, list[dict]] = {}
+        self._replies: dict[tuple[str, str], list[dict]] = {}
+        self._clock = itertools.count()
+        self._start_ts = start_ts
+        self._lock = threading.Lock()
+
+        self.calls: dict[str, int] = {"conversations_history": 0, "conversations_replies": 0}
+        self.max_page_size = 0
+
+    def post(
+        self,
+        channel: str,
+        text: str,
+        *,
+        user: str = "U0001",
+        thread_ts: str | None = None,
+        reply_broadcast: bool = False,
+        **extra,
+    ) -> str:
+        """
+        메시지 추가, ts 반환. thread_ts 를 주면 해당 스레드의 답글 (부모의 reply_count / latest_reply 갱신).
+        reply_broadcast 면 답글 사본(subtype=thread_broadcast)을 채널 history 에도 남긴다.
+        """
+        with self._lock:
+            ts = f"{self._start_ts + next(self._clock):.6f}"
+            message = {"type": "message", "user": user, "text": text, "ts": ts, **extra}
+
+            if thread_ts is None:
+                self._channels.setdefault(channel, []).append(message)
+                return ts
+
+            parent = next(m for m in self._channels[channel] if m["ts"] == thread_ts)
+            parent["thread_ts"] = thread_ts
+            parent["reply_count"] = parent.get("reply_count", 0) + 1
+            parent["latest_reply"] = ts
+            self._replies.setdefault((channel, thread_ts), []).append({**message, "thread_ts": thread_ts})
+            if reply_broadcast:
+                self._channels[channel].append({**message, "thread_ts": thread_ts, "subtype": "thread_broadcast"})
+            return ts
+
+    def _page(self, method: str, items: list[dict], cursor: str | None, limit: int) -> dict:
+        start = int(cursor or 0)
+        end = start + limit
+        page = items[start:end]
+        with self._lock:
+            self.calls[method] += 1
+            self.max_page_size = max(self.max_page_size, len(page))
+        return {
+            "ok": True,
+            "messages": page,
+            "has_more": end < len(items),
+            "response_metadata": {"next_cursor": str(end) if end < len(items) else ""},
+        }
+
+    def conversations_history(
+        self,
+        *,
+        channel: str,
+        cursor: str | None = None,
+        limit: int = 100,
+        oldest: str | None = None,
+        latest: str | None = None,
+        **kwargs: Any,
+    ) -> dict:
+        messages = [
+            dict(m)
+            for m in reversed(self._channels.get(channel, []))
+            if (oldest is None or float(m["ts"]) > float(oldest)) and (latest is None or float(m["ts"]) < float(latest))
+        ]
+        return self._page("conversations_history", messages, cursor, limit)
+
+    def conversations_replies(
+        self,
+        *,
+        channel: str,
+        ts: str,
+        cursor: str | None = None,
+        limit: int = 100,
+        **kwargs: Any,
+    ) -> dict:
+        parent = next(m for m in self._channels.get(channel, []) if m["ts"] == ts)
+        messages = [dict(parent)] + [dict(m) for m in self._replies.get((channel, ts), [])]
+        return self._page("conversations_replies", messages, cursor, limit)
@@ -0,0 +1,6 @@
+from .numpy_store import AsyncNumpyRepositoryImpl, NumpyRepositoryImpl
+
+__all__ = [
+    "AsyncNumpyRepositoryImpl",
+    "NumpyRepositoryImpl",
+]
@@ -0,0 +1,365 @@
+import asyncio
+import atexit
+import json
+import os
+import re
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from app.enums import Domain, SourceType
+from app.repositories.vector_store import AsyncVectorStoreRepository, VectorStoreRepository
+
+# row 별 source_type 코드 = 이 목록의 인덱스 (-1: 모름, source_type 저장 전에 만든 파일)
+_SOURCE_TYPES = list(SourceType)
+_SOURCE_TYPE_CODES = {source_type.value: code for code, source_type in enumerate(_SOURCE_TYPES)}
+
+# Milvus filter_expr 중 source_type 비교만 지원: source_type == "FILE" / source_type in ["FILE", "NOTION"]
+_SOURCE_TYPE_FILTER = re.compile(r"""^\s*source_type\s*(?:==\s*(?P<eq>"[^"]*"|'[^']*')|in\s*\[(?P<in>[^\]]*)\])\s*$""")
+_QUOTED = re.compile(r"""^\s*(?:"([^"]*)"|'([^']*)')\s*$""")
+
+
+def _parse_filter(filter_expr: str | None) -> list[int] | None:
+    """filter_expr -> 허용할 source_type 코드 목록 (None 이면 필터 없음)"""
+    if not filter_expr:
+        return None
+
+    m = _SOURCE_TYPE_FILTER.match(filter_expr)
+    if m is None:
+        raise NotImplementedError(f"NumpyRepositoryImpl only supports source_type filters, got: {filter_expr}")
+
+    values = [m.group("eq")] if m.group("eq") is not None else [v for v in m.group("in").split(",") if v.strip()]
+    names = []
+    for value in values:
+        quoted = _QUOTED.match(value)
+        if quoted is None:
+            raise NotImplementedError(f"NumpyRepositoryImpl only supports source_type filters, got: {filter_expr}")
+        names.append(quoted.group(1) if quoted.group(1) is not None else quoted.group(2))
+    # 없는 source_type 은 Milvus 와 마찬가지로 아무것도 매치하지 않음
+    return [_SOURCE_TYPE_CODES[name] for name in names if name in _SOURCE_TYPE_CODES]
+
+
+class _DomainIndex:
+    """
+    도메인 하나의 임베딩 저장소.
+    - vectors: (capacity, dim) 연속 배열, 앞의 size 행만 유효 (L2 정규화된 값 저장 -> 내적 = 코사인)
+    - ids: (capacity,) int64, row -> chunk_id
+    - source_types: (capacity,) int8, row -> source_type 코드 (filter_expr 용)
+    - 파일: vectors.npy / ids.npy / source_types.npy / meta.json (로드 시 mmap)
+    """
+
+    _SEARCH_BLOCK_ROWS = 65_536
+
+    def __init__(self, path: Path, dim: int, dtype: np.dtype):
+        self.path = path
+        self.dim = dim
+        self.dtype = dtype
+        self.lock = threading.RLock()
+
+        self._vectors = np.empty((0, dim), dtype=dtype)
+        self._ids = np.empty((0,), dtype=np.int64)
+        self._source_types = np.empty((0,), dtype=np.int8)
+        self._size = 0
+        self._rows: dict[int, int] = {}
+        self._load()
+
+    # -------------------------
+    # persistence
+    # -------------------------
+    def _load(self) -> None:
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return
+
+        meta = json.loads(meta_path.read_text())
+        if meta["dim"] != self.dim or meta["dtype"] != np.dtype(self.dtype).name:
+            raise ValueError(f"Vector store at {self.path} was built with dim={meta['dim']} dtype={meta['dtype']}")
+
+        # 읽기 전용 mmap 으로 열고, 첫 쓰기 시점에 메모리로 복사
+        self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        self._ids = np.load(self.path / "ids.npy", mmap_mode="r")
+        self._size = len(self._ids)
+        self._rows = {int(chunk_id): row for row, chunk_id in enumerate(self._ids)}
+
+        source_types_path = self.path / "source_types.npy"
+        if not source_types_path.exists():
+            self._source_types = np.full((self._size,), -1, dtype=np.int8)
+            return
+        # 저장 당시의 SourceType 순서로 기록된 코드를 현재 순서로 변환
+        saved = meta.get("source_types", [])
+        # 마지막 -1 은 코드 -1 (모름) 을 그대로 -1 로
+        remap = np.array([_SOURCE_TYPE_CODES.get(name, -1) for name in saved] + [-1], dtype=np.int8)
+        self._source_types = remap[np.load(source_types_path)]
+
+    def save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        arrays = (
+            ("vectors", self._vectors[: self._size]),
+            ("ids", self._ids[: self._size]),
+            ("source_types", self._source_types[: self._size]),
+        )
+        for name, arr in arrays:
+            tmp = self.path / f"{name}.tmp.npy"
+            np.save(tmp, arr)
+            os.replace(tmp, self.path / f"{name}.npy")
+
+        meta = {
+            "dim": self.dim,
+            "dtype": np.dtype(self.dtype).name,
+            "size": self._size,
+            "source_types": [source_type.value for source_type in _SOURCE_TYPES],
+        }
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    # -------------------------
+    # write
+    # -------------------------
+    def _ensure_writable(self, extra: int) -> None:
+        need = self._size + extra
+        writable = isinstance(self._vectors, np.ndarray) and not isinstance(self._vectors, np.memmap)
+        if writable and need <= len(self._vectors):
+            return
+
+        capacity = max(need, len(self._vectors) * 2 if writable else need, 1024)
+        vectors = np.empty((capacity, self.dim), dtype=self.dtype)
+        ids = np.empty((capacity,), dtype=np.int64)
+        source_types = np.empty((capacity,), dtype=np.int8)
+        vectors[: self._size] = self._vectors[: self._size]
+        ids[: self._size] = self._ids[: self._size]
+        source_types[: self._size] = self._source_types[: self._size]
+        self._vectors, self._ids, self._source_types = vectors, ids, source_types
+
+    def upsert(self, chunk_ids: list[int], embeddings: np.ndarray, source_type: int) -> None:
+        self._ensure_writable(len(chunk_ids))
+        for chunk_id, vec in zip(chunk_ids, embeddings):
+            row = self._rows.get(chunk_id)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._rows[chunk_id] = row
+                self._ids[row] = chunk_id
+            self._vectors[row] = vec
+            self._source_types[row] = source_type
+
+    def delete(self, chunk_ids: list[int]) -> None:
+        self._ensure_writable(0)
+        for chunk_id in chunk_ids:
+            row = self._rows.pop(chunk_id, None)
+            if row is None:
+                continue
+
+            # 마지막 행을 빈 자리로 옮겨 배열을 연속으로 유지
+            last = self._size - 1
+            if row != last:
+                moved = int(self._ids[last])
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved
+                self._source_types[row] = self._source_types[last]
+                self._rows[moved] = row
+            self._size -= 1
+
+    # -------------------------
+    # read
+    # -------------------------
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        source_types: list[int] | None = None,
+    ) -> list[list[tuple[int, float]]]:
+        """source_types 가 있으면 해당 source_type 코드의 행만 검색"""
+        rows = None
+        if source_types is not None:
+            rows = np.flatnonzero(np.isin(self._source_types[: self._size], source_types))
+        size = self._size if rows is None else len(rows)
+        if size == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        # (size, dim) @ (dim, q) -> (size, q), float16 은 블록 단위로 float32 로 올려서 계산
+        scores = np.empty((size, len(queries)), dtype=np.float32)
+        for start in range(0, size, self._SEARCH_BLOCK_ROWS):
+            end = min(start + self._SEARCH_BLOCK_ROWS, size)
+            vectors = self._vectors[start:end] if rows is None else self._vectors[rows[start:end]]
+            scores[start:end] = np.asarray(vectors, dtype=np.float32) @ queries.T
+        ids = self._ids[: self._size] if rows is None else self._ids[rows]
+        k = min(top_k, size)
+
+        out: list[list[tuple[int, float]]] = []
+        for col in range(scores.shape[1]):
+            column = scores[:, col]
+            top = np.argpartition(-column, k - 1)[:k] if k < size else np.arange(size)
+            top = top[np.argsort(-column[top])]
+            out.append([(int(ids[row]), float(column[row])) for row in top])
+        return out
+
+
+class NumpyRepositoryImpl(VectorStoreRepository):
+    """
+    Milvus 없이 프로세스 안에서 동작하는 VectorStoreRepository.
+    작은 코퍼스(수십만 청크 이하) / CI / 로컬 개발용. 검색은 정확한(brute-force) 코사인 top-k.
+    filter_expr 는 source_type 비교 (source_type == "FILE" / source_type in [...]) 만 지원한다.
+    쓰기는 메모리에 바로 반영하고, 파일 저장은 변경된 도메인만 flush_interval 뒤에 한 번 (ingest_session 중에는 세션 끝에)
+    수행한다. 프로세스 종료 시(atexit) 남은 변경을 저장하므로, 비정상 종료 시 마지막 flush_interval 동안의 쓰기는 유실될 수 있다.
+    """
+
+    def __init__(self, path: str, dim: int, dtype: str = "float32", flush_interval: float = 1.0):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+        self._path = Path(path)
+        self._dim = dim
+        self._dtype = np.dtype(dtype)
+        self._indexes: dict[Domain, _DomainIndex] = {}
+        self._lock = threading.Lock()
+
+        self._flush_interval = flush_interval
+        # ingest_session 중에는 파일 저장을 미루고 종료 시 한 번만 저장
+        self._deferred = 0
+        self._dirty: set[Domain] = set()
+        self._timer: threading.Timer | None = None
+        atexit.register(self.flush)
+
+    def _get_index(self, domain: Domain) -> _DomainIndex:
+        with self._lock:
+            index = self._indexes.get(domain)
+            if index is None:
+                index = _DomainIndex(self._path / domain.value.lower(), self._dim, self._dtype)
+                self._indexes[domain] = index
+            return index
+
+    def _normalize(self, embeddings: list[list[float]]) -> np.ndarray:
+        arr = np.asarray(embeddings, dtype=np.float32)
+        if arr.ndim != 2 or arr.shape[1] != self._dim:
+            raise ValueError(f"Expected embeddings of shape (n, {self._dim}), got {arr.shape}")
+
+        norms = np.linalg.norm(arr, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return arr / norms
+
+    def _mark_dirty(self, domain: Domain) -> None:
+        # 매 쓰기마다 전체 파일을 다시 쓰지 않도록 변경된 도메인만 기록하고 저장은 모아서 한 번에
+        with self._lock:
+            self._dirty.add(domain)
+            if self._deferred or self._timer is not None:
+                return
+            self._timer = threading.Timer(self._flush_interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._deferred:
+                # 세션이 끝날 때 저장
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """변경된 도메인을 파일로 저장"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+
+        for domain in dirty:
+            index = self._get_index(domain)
+            with index.lock:
+                index.save()
+
+    @contextmanager
+    def ingest_session(self, flush_rows: int | None = None) -> Iterator["NumpyRepositoryImpl"]:
+        """쓰기는 바로 메모리에 반영되므로 flush_rows 는 사용하지 않고, 파일 저장만 세션 끝으로 미룬다"""
+        with self._lock:
+            self._deferred += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deferred -= 1
+                done = not self._deferred
+            if done:
+                self.flush()
+
+    def upsert(
+        self,
+        domain: Domain,
+        source_type: SourceType,
+        chunk_id: int,
+        embedding: list[float],
+    ) -> None:
+        self.bulk_upsert(domain=domain, source_type=source_type, chunk_ids=[chunk_id], embeddings=[embedding])
+
+    def bulk_upsert(
+        self,
+        domain: Domain,
+        source_type: SourceType,
+        chunk_ids: list[int],
+        embeddings: list[list[float]],
+    ) -> None:
+        if not chunk_ids:
+            return
+
+        if len(chunk_ids) != len(embeddings):
+            raise ValueError("chunk_ids and embeddings must have the same length")
+
+        vectors = self._normalize(embeddings).astype(self._dtype)
+        index = self._get_index(domain)
+        with index.lock:
+            index.upsert([int(c) for c in chunk_ids], vectors, _SOURCE_TYPE_CODES[source_type.value])
+        self._mark_dirty(domain)
+
+    def delete(self, domain: Domain, chunk_id: int) -> None:
+        self.bulk_delete(domain=domain, chunk_ids=[chunk_id])
+
+    def bulk_delete(self, domain: Domain, chunk_ids: list[int]) -> None:
+        if not chunk_ids:
+            return
+
+        index = self._get_index(domain)
+        with index.lock:
+            index.delete([int(c) for c in chunk_ids])
+        self._mark_dirty(domain)
+
+    def search(
+        self,
+        domain: Domain,
+        embedding: list[float],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[tuple[int, float]]:
+        return self.search_batch(domain=domain, embeddings=[embedding], top_k=top_k, filter_expr=filter_expr)[0]
+
+    def search_batch(
+        self,
+        domain: Domain,
+        embeddings: list[list[float]],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[list[tuple[int, float]]]:
+        source_types = _parse_filter(filter_expr)
+        if not embeddings:
+            return []
+
+        queries = self._normalize(embeddings)
+        index = self._get_index(domain)
+        with index.lock:
+            return index.search(queries, top_k, source_types)
+
+
+class AsyncNumpyRepositoryImpl(AsyncVectorStoreRepository):
+    """ask_async 경로용 어댑터: 검색은 CPU 작업이므로 스레드에서 실행"""
+
+    def __init__(self, repo: NumpyRepositoryImpl):
+        self._repo = repo
+
+    async def search(
+        self,
+        domain: Domain,
+        embedding: list[float],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[tuple[int, float]]:
+        return await asyncio.to_thread(self._repo.search, domain, embedding, top_k, filter_expr)
@@ -1,15 +1,37 @@
 # app/infra/milvus.py
 
 
+import logging
 import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 
-from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, connections, utility
+from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, MilvusException, connections, utility
+from pymilvus.client.types import LoadState
+
+from infra.vector_store.milvus.index import IndexPlan, advise_index, plan_for_index
+
+logger = logging.getLogger(__name__)
 
 _milvus_lock = threading.Lock()
 _initialized = False
 
+# layout="partitioned" 일 때 모든 도메인을 담는 단일 컬렉션 / partition key 필드
+PARTITIONED_COLLECTION = "koo_chunks"
+DOMAIN_FIELD = "domain"
 
-def init_milvus(host: str, port: int | str, dim: int) -> None:
+
+def init_milvus(
+    host: str,
+    port: int | str,
+    dim: int,
+    layout: str = "per_domain",
+    user: str = "",
+    password: str = "",
+    db_name: str = "default",
+) -> None:
     global _initialized
     if _initialized:
         return
@@ -19,38 +41,60 @@ def init_milvus(host: str, port: int | str, dim: int) -> None:
             return
 
         # connect (idempotent하게 한 번만)
-        connections.connect(alias="default", host=host, port=str(port))
+        connections.connect(
+            alias="default",
+            host=host,
+            port=str(port),
+            user=user,
+            password=password,
+            db_name=db_name,
+        )
 
-        ensure_collections(dim)
+        ensure_collections(dim, layout)
         _initialized = True
 
 
-def _ensure_collection(name: str, dim: int) -> None:
-    if utility.has_collection(name):
-        col = Collection(name=name)
-        # 이미 존재하면 load만 보장 (원하면 index 유무도 검사 가능)
-        col.load()
-        return
-
+def build_schema(dim: int, partitioned: bool = False) -> CollectionSchema:
     fields = [
         FieldSchema(name="chunk_id", dtype=DataType.INT64, is_primary=True, auto_id=False),
         FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dim),
         FieldSchema(name="source_type", dtype=DataType.VARCHAR, max_length=32),
         FieldSchema(name="updated_at", dtype=DataType.INT64),
     ]
-    schema = CollectionSchema(fields=fields, description="koo rag chunks")
-    col = Collection(name=name, schema=schema)
+    if partitioned:
+        # 도메인은 partition key: 도메인 추가 시 컬렉션/인덱스/load 추가 없이 같은 컬렉션에 적재
+        fields.append(FieldSchema(name=DOMAIN_FIELD, dtype=DataType.VARCHAR, max_length=32, is_partition_key=True))
+    return CollectionSchema(fields=fields, description="koo rag chunks")
+
+
+def is_partitioned(col: Collection) -> bool:
+    return any(f.name == DOMAIN_FIELD for f in col.schema.fields)
 
-    index_params = {
-        "index_type": "IVF_FLAT",
-        "metric_type": "COSINE",
-        "params": {"nlist": 1024},
-    }
-    col.create_index(field_name="embedding", index_params=index_params)
-    col.load()
 
+def _create_collection(name: str, dim: int, plan: IndexPlan, partitioned: bool = False) -> Collection:
+    col = Collection(name=name, schema=build_schema(dim, partitioned))
+    col.create_index(field_name="embedding", index_params=plan.index_params)
+    return col
+
+
+def _ensure_collection(name: str, dim: int, partitioned: bool = False) -> None:
+    """
+    name 은 alias 로 사용: 실제 컬렉션은 `{name}__{버전}` 으로 만들고 alias 를 건다 (index rebuild 시 무중단 전환).
+    load 는 첫 검색 시점에 CollectionManager 가 수행 (ingest 등 쓰기 전용 명령은 load 불필요)
+    """
+    if utility.has_collection(name):
+        return
+
+    physical = f"{name}__{int(time.time())}"
+    _create_collection(physical, dim, advise_index(0), partitioned)
+    utility.create_alias(collection_name=physical, alias=name)
+
+
+def ensure_collections(dim: int, layout: str = "per_domain") -> None:
+    if layout == "partitioned":
+        _ensure_collection(PARTITIONED_COLLECTION, dim, partitioned=True)
+        return
 
-def ensure_collections(dim: int) -> None:
     _ensure_collection("koo_cs_chunks", dim)
     _ensure_collection("koo_dev_chunks", dim)
 
@@ -58,3 +102,247 @@ def ensure_collections(dim: int) -> None:
 def get_collection(name: str) -> Collection:
     # init_milvus()가 먼저 호출된다는 가정
     return Collection(name=name)
+
+
+def resolve_alias(name: str) -> str | None:
+    """alias 가 가리키는 실제 컬렉션 이름 (alias 가 아니면 None)"""
+    for collection in utility.list_collections():
+        if name in utility.list_aliases(collection):
+            return collection
+    return None
+
+
+def describe_index_plan(col: Collection) -> IndexPlan:
+    """컬렉션에 실제로 만들어진 인덱스 기준 IndexPlan (인덱스가 없으면 FLAT 취급)"""
+    row_count = col.num_entities
+    for index in col.indexes:
+        if index.field_name != "embedding":
+            continue
+
+        params = dict(index.params)
+        index_type = params.pop("index_type", "FLAT")
+        params.pop("metric_type", None)
+        build_params = params.pop("params", None) or params
+        return plan_for_index(index_type, build_params, row_count)
+
+    return plan_for_index("FLAT", {}, row_count)
+
+
+@dataclass(slots=True)
+class RebuildResult:
+    name: str
+    previous: str
+    current: str
+    row_count: int
+    plan: IndexPlan
+    skipped: bool = False
+
+
+def rebuild_collection(name: str, dim: int, *, force: bool = False, batch_size: int = 1000) -> RebuildResult:
+    """
+    행 수 기준 추천 인덱스로 컬렉션 재구성 (검색 중단 없이).
+    1. 새 실제 컬렉션 `{name}__{버전}` 생성 + 추천 인덱스
+    2. 기존 컬렉션 데이터를 query_iterator 로 복사, 복사 중 갱신된 행(updated_at)은 한 번 더 upsert
+    3. 새 컬렉션 load 후 alias 전환, 기존 컬렉션 drop
+    재구성 중 발생한 delete 는 반영되지 않으므로 ingest 와 동시에 실행하지 않는다.
+    """
+    previous = resolve_alias(name) or name
+    old = Collection(name=previous)
+    row_count = old.num_entities
+    plan = advise_index(row_count)
+
+    current = describe_index_plan(old)
+    if not force and plan.matches(current.index_type, current.build_params):
+        return RebuildResult(name, previous, previous, row_count, plan, skipped=True)
+
+    started = int(time.time())
+    physical = f"{name}__{started}"
+    partitioned = is_partitioned(old)
+    new = _create_collection(physical, dim, plan, partitioned)
+
+    old.load()
+    output_fields = ["chunk_id", "embedding", "source_type", "updated_at"]
+    if partitioned:
+        output_fields.append(DOMAIN_FIELD)
+
+    def copy(expr: str, write) -> int:
+        copied = 0
+        iterator = old.query_iterator(batch_size=batch_size, expr=expr, output_fields=output_fields)
+        try:
+            while rows := iterator.next():
+                write(rows)
+                copied += len(rows)
+        finally:
+            iterator.close()
+        return copied
+
+    copied = copy("", new.insert)
+    caught_up = copy(f"updated_at >= {started}", new.upsert)
+    logger.info("copied %d rows (+%d updated during copy) into %s", copied, caught_up, physical)
+
+    new.flush()
+    utility.wait_for_index_building_complete(physical)
+    new.load()
+
+    if previous == name:
+        # alias 도입 이전 컬렉션: 같은 이름의 alias 를 걸려면 기존 컬렉션을 먼저 drop (짧은 공백 발생)
+        logger.warning("%s is not an alias yet; dropping it before aliasing %s", name, physical)
+        old.release()
+        old.drop()
+        utility.create_alias(collection_name=physical, alias=name)
+    else:
+        utility.alter_alias(collection_name=physical, alias=name)
+        old.release()
+        old.drop()
+
+    return RebuildResult(name, previous, physical, new.num_entities, plan)
+
+
+# Milvus 서버의 ErrCollectionNotLoaded
+_COLLECTION_NOT_LOADED = 101
+
+
+def is_not_loaded_error(e: MilvusException) -> bool:
+    """다른 프로세스(idle reaper 등)가 release 한 컬렉션을 검색했을 때의 오류인지"""
+    return e.code == _COLLECTION_NOT_LOADED or "not loaded" in (e.message or "").lower()
+
+
+class CollectionManager:
+    """
+    Collection 핸들 캐시 + load/release 정책.
+    - 핸들은 이름별로 한 번만 생성
+    - 검색용(use)은 첫 사용 시 load 상태를 한 번 확인하고 필요하면 load
+      (load 는 컬렉션별 lock 으로 직렬화하고 매니저 전체 lock 밖에서 수행해 다른 컬렉션 검색을 막지 않음)
+    - idle_ttl(초) 동안 검색되지 않은 컬렉션은 백그라운드에서 release (0 이하면 release 하지 않음)
+    - 다른 프로세스가 release 해 load 상태가 어긋난 경우 invalidate() 후 다시 use() 하면 재load
+    """
+
+    def __init__(self, idle_ttl: float = 0):
+        self.idle_ttl = idle_ttl
+
+        self._handles: dict[str, Collection] = {}
+        self._loaded: set[str] = set()
+        self._plans: dict[str, IndexPlan] = {}
+        self._last_used: dict[str, float] = {}
+        self._in_use: dict[str, int] = {}
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self._reaper: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def get(self, name: str) -> Collection:
+        """load 없이 핸들만 반환 (insert/delete/flush 용)"""
+        with self._lock:
+            return self._handle(name)
+
+    def _handle(self, name: str) -> Collection:
+        # self._lock 을 잡은 상태에서 호출
+        col = self._handles.get(name)
+        if col is None:
+            col = Collection(name=name)
+            self._handles[name] = col
+            self._load_locks[name] = threading.Lock()
+        return col
+
+    def _ensure_loaded(self, name: str, col: Collection) -> None:
+        with self._load_locks[name]:
+            with self._lock:
+                if name in self._loaded:
+                    return
+
+            # 느린 load 는 이 컬렉션의 lock 만 잡고 수행
+            if utility.load_state(name) != LoadState.Loaded:
+                col.load()
+            plan = describe_index_plan(col)
+
+            with self._lock:
+                self._plans[name] = plan
+                self._loaded.add(name)
+                self._start_reaper()
+
+    def invalidate(self, name: str) -> None:
+        """load 상태 캐시를 버려 다음 use() 에서 서버 상태를 다시 확인하게 함"""
+        with self._lock:
+            lock = self._load_locks.get(name)
+        if lock is None:
+            return
+        with lock, self._lock:
+            self._loaded.discard(name)
+            self._plans.pop(name, None)
+
+    def plan(self, name: str) -> IndexPlan:
+        """load 시점에 확인한 인덱스 기준 검색 계획 (use() 안에서 호출)"""
+        with self._lock:
+            return self._plans[name]
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Collection]:
+        """검색용: load 를 보장하고, 사용 중에는 release 대상에서 제외"""
+        with self._lock:
+            col = self._handle(name)
+            self._in_use[name] = self._in_use.get(name, 0) + 1
+        try:
+            self._ensure_loaded(name, col)
+            yield col
+        finally:
+            with self._lock:
+                self._in_use[name] -= 1
+                self._last_used[name] = time.monotonic()
+
+    def release_idle(self, now: float | None = None) -> list[str]:
+        if self.idle_ttl <= 0:
+            return []
+
+        now = time.monotonic() if now is None else now
+
+        def idle(name: str) -> bool:
+            # self._lock 을 잡은 상태에서 호출
+            return (
+                name in self._loaded
+                and self._in_use.get(name, 0) == 0
+                and now - self._last_used.get(name, now) >= self.idle_ttl
+            )
+
+        with self._lock:
+            candidates = [name for name in self._loaded if idle(name)]
+
+        released: list[str] = []
+        for name in candidates:
+            # load 와 같은 컬렉션별 lock 으로 직렬화, 그 사이 사용이 시작됐으면 건너뜀
+            with self._load_locks[name]:
+                with self._lock:
+                    if not idle(name):
+                        continue
+                    self._loaded.discard(name)
+                    self._plans.pop(name, None)
+                    self._last_used.pop(name, None)
+                    col = self._handles[name]
+                col.release()
+            released.append(name)
+
+        if released:
+            logger.info("released idle milvus collections: %s", ", ".join(released))
+        return released
+
+    def _start_reaper(self) -> None:
+        if self.idle_ttl <= 0 or self._reaper is not None:
+            return
+
+        interval = max(1.0, min(self.idle_ttl / 2, 60.0))
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.release_idle()
+                except Exception:
+                    logger.exception("failed to release idle milvus collections")
+
+        self._reaper = threading.Thread(target=run, name="milvus-collection-reaper", daemon=True)
+        self._reaper.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join(timeout=1.0)
+            self._reaper = None
@@ -1,5 +1,6 @@
-from .milvus import MilvusRepositoryImpl
+from .milvus import AsyncMilvusRepositoryImpl, MilvusRepositoryImpl
 
 __all__ = [
+    "AsyncMilvusRepositoryImpl",
     "MilvusRepositoryImpl",
 ]
@@ -1,9 +1,26 @@
+import logging
+import threading
 import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import batched
 
-from pymilvus import Collection
+from pymilvus import AsyncMilvusClient, Collection, MilvusException
+from pymilvus.client.types import LoadState
 
 from app.enums import Domain, SourceType
-from app.repositories.vector_store import VectorStoreRepository
+from app.repositories.vector_store import AsyncVectorStoreRepository, VectorStoreRepository, VectorStoreWriter
+from config import settings
+from infra.vector_store.milvus.base import (
+    DOMAIN_FIELD,
+    PARTITIONED_COLLECTION,
+    CollectionManager,
+    is_not_loaded_error,
+)
+from infra.vector_store.milvus.index import IndexPlan, plan_for_index, search_request
+
+logger = logging.getLogger(__name__)
 
 
 class MilvusRepositoryImpl(VectorStoreRepository):
@@ -12,6 +29,19 @@ class MilvusRepositoryImpl(VectorStoreRepository):
         Domain.DEV: "koo_dev_chunks",
     }
 
+    def __init__(self, idle_ttl: float | None = None, layout: str | None = None):
+        self.layout = layout or settings.MILVUS_LAYOUT
+        if self.layout not in ("per_domain", "partitioned"):
+            raise ValueError(f"Unsupported milvus layout: {self.layout}")
+
+        self._collections = CollectionManager(
+            idle_ttl=settings.MILVUS_COLLECTION_IDLE_TTL if idle_ttl is None else idle_ttl,
+        )
+
+    @property
+    def supports_cross_domain(self) -> bool:
+        return self.layout == "partitioned"
+
     @staticmethod
     def to_human_score(raw: float) -> float:
         """
@@ -27,11 +57,40 @@ class MilvusRepositoryImpl(VectorStoreRepository):
         s = 1.0 - raw
         return max(0.0, min(1.0, s))
 
+    def _collection_name(self, domain: Domain) -> str:
+        return PARTITIONED_COLLECTION if self.supports_cross_domain else self.collection_map[domain]
+
     def _get_collection(self, domain: Domain) -> Collection:
-        name = self.collection_map[domain]
-        col = Collection(name)
-        col.load()
-        return col
+        """쓰기용 핸들 (load 불필요)"""
+        return self._collections.get(self._collection_name(domain))
+
+    def _columns(
+        self,
+        domain: Domain,
+        source_type: SourceType,
+        chunk_ids: list[int],
+        embeddings: list[list[float]],
+    ) -> list[list]:
+        """스키마 필드 순서의 column 데이터 (partitioned 면 domain 컬럼 추가)"""
+        now = int(time.time())
+        data = [
+            chunk_ids,
+            embeddings,
+            [source_type.value for _ in chunk_ids],
+            [now] * len(chunk_ids),
+        ]
+        if self.supports_cross_domain:
+            data.append([domain.value] * len(chunk_ids))
+        return data
+
+    @staticmethod
+    def _domain_expr(domains: list[Domain], filter_expr: str | None) -> str | None:
+        values = ",".join(f'"{domain.value}"' for domain in domains)
+        expr = f"{DOMAIN_FIELD} in [{values}]"
+        return f"({expr}) and ({filter_expr})" if filter_expr else expr
+
+    def release_idle(self) -> list[str]:
+        return self._collections.release_idle()
 
     @staticmethod
     def _ids_expr(ids: list[int]) -> str:
@@ -65,18 +124,7 @@ class MilvusRepositoryImpl(VectorStoreRepository):
         chunk_id: int,
         embedding: list[float],
     ) -> None:
-        col = self._get_collection(domain)
-        col.delete(expr=f"chunk_id in {self._ids_expr([chunk_id])}")
-
-        now = int(time.time())
-        data = [
-            [chunk_id],
-            [embedding],
-            [source_type.value],
-            [now],
-        ]
-        col.insert(data)
-        col.flush()
+        self.bulk_upsert(domain=domain, source_type=source_type, chunk_ids=[chunk_id], embeddings=[embedding])
 
     def bulk_upsert(
         self,
@@ -91,25 +139,32 @@ class MilvusRepositoryImpl(VectorStoreRepository):
         if len(chunk_ids) != len(embeddings):
             raise ValueError("chunk_ids and embeddings must have the same length")
 
+        # 대화형/단건 경로: native upsert 후 바로 flush. 대량 적재는 ingest_session() 사용
         col = self._get_collection(domain)
-
-        col.delete(expr=f"chunk_id in {self._ids_expr(chunk_ids)}")
-
-        now = int(time.time())
-        data = [
-            chunk_ids,
-            embeddings,
-            [source_type.value for _ in chunk_ids],
-            [now] * len(chunk_ids),
-        ]
-        col.insert(data)
+        col.upsert(self._columns(domain, source_type, chunk_ids, embeddings))
         col.flush()
 
     def delete(self, domain: Domain, chunk_id: int) -> None:
+        self.bulk_delete(domain=domain, chunk_ids=[chunk_id])
+
+    def bulk_delete(self, domain: Domain, chunk_ids: list[int]) -> None:
+        if not chunk_ids:
+            return
+
         col = self._get_collection(domain)
-        col.delete(expr=f"chunk_id in {self._ids_expr([chunk_id])}")
+        col.delete(expr=f"chunk_id in {self._ids_expr(chunk_ids)}")
         col.flush()
 
+    @contextmanager
+    def ingest_session(self, flush_rows: int | None = None) -> Iterator["MilvusIngestSession"]:
+        session = MilvusIngestSession(
+            self, flush_rows=settings.VECTOR_STORE_FLUSH_ROWS if flush_rows is None else flush_rows
+        )
+        try:
+            yield session
+        finally:
+            session.close()
+
     def search(
         self,
         domain: Domain,
@@ -117,21 +172,289 @@ class MilvusRepositoryImpl(VectorStoreRepository):
         top_k: int,
         filter_expr: str | None = None,
     ) -> list[tuple[int, float]]:
-        col = self._get_collection(domain)
-        params = {"metric_type": "COSINE", "params": {"nprobe": 16}}
-
-        results = col.search(
-            data=[embedding],
-            anns_field="embedding",
-            param=params,
-            limit=top_k,
-            expr=filter_expr,
-            output_fields=["source_type", "updated_at"],
-        )
+        return self.search_batch(domain=domain, embeddings=[embedding], top_k=top_k, filter_expr=filter_expr)[0]
+
+    def search_batch(
+        self,
+        domain: Domain,
+        embeddings: list[list[float]],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[list[tuple[int, float]]]:
+        """여러 질의 벡터를 한 번의 search 호출로 검색 (입력 순서대로 결과 반환)"""
+        if not embeddings:
+            return []
+
+        if self.supports_cross_domain:
+            filter_expr = self._domain_expr([domain], filter_expr)
+
+        results = self._search(self._collection_name(domain), embeddings, top_k, filter_expr)
+
+        out: list[list[tuple[int, float]]] = []
+        for hits in results:
+            out.append([(self._hit_pk(hit), float(hit.score)) for hit in hits])
+        return out
+
+    def search_domains(
+        self,
+        domains: list[Domain],
+        embeddings: list[list[float]],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[list[tuple[Domain, int, float]]]:
+        """partitioned 레이아웃: 여러 도메인을 한 번의 search 로 검색 (전체 도메인이면 domain 필터 생략)"""
+        if not self.supports_cross_domain:
+            return VectorStoreRepository.search_domains(self, domains, embeddings, top_k, filter_expr)
+
+        if not embeddings or not domains:
+            return [[] for _ in embeddings]
+
+        if set(domains) != set(Domain):
+            filter_expr = self._domain_expr(domains, filter_expr)
+
+        results = self._search(PARTITIONED_COLLECTION, embeddings, top_k, filter_expr, with_domain=True)
+
+        out: list[list[tuple[Domain, int, float]]] = []
+        for hits in results:
+            out.append([(Domain(hit.entity.get(DOMAIN_FIELD)), self._hit_pk(hit), float(hit.score)) for hit in hits])
+        return out
+
+    def _search(
+        self,
+        name: str,
+        embeddings: list[list[float]],
+        top_k: int,
+        filter_expr: str | None,
+        *,
+        with_domain: bool = False,
+    ):
+        output_fields = ["source_type", "updated_at"]
+        if with_domain:
+            output_fields.append(DOMAIN_FIELD)
+
+        for attempt in range(2):
+            try:
+                with self._collections.use(name) as col:
+                    params, consistency_level = search_request(self._collections.plan(name), top_k)
+                    return col.search(
+                        data=embeddings,
+                        anns_field="embedding",
+                        param=params,
+                        limit=top_k,
+                        expr=filter_expr,
+                        output_fields=output_fields,
+                        consistency_level=consistency_level,
+                    )
+            except MilvusException as e:
+                # 다른 프로세스가 release 한 컬렉션: load 상태를 다시 확인하고 한 번만 재시도
+                if attempt or not is_not_loaded_error(e):
+                    raise
+                logger.info("milvus collection %s is not loaded; reloading", name)
+                self._collections.invalidate(name)
+        raise AssertionError("unreachable")
+
+
+class MilvusIngestSession(VectorStoreWriter):
+    """
+    여러 문서의 Milvus 쓰기를 모아서 반영.
+    - upsert/delete 는 컬렉션별 버퍼에 쌓고 (같은 chunk_id 는 마지막 요청만 유지)
+    - 버퍼가 flush_rows 에 도달하면 delete / native upsert 로 전송
+    - col.flush() 는 세션 종료 시 컬렉션별로 한 번만 호출
+    """
+
+    _WRITE_BATCH_ROWS = 5_000
+
+    def __init__(self, repo: MilvusRepositoryImpl, flush_rows: int):
+        self._repo = repo
+        self._flush_rows = flush_rows
+        self._upserts: dict[str, dict[int, tuple[Domain, SourceType, list[float]]]] = defaultdict(dict)
+        self._deletes: dict[str, set[int]] = defaultdict(set)
+        self._buffered = 0
+        self._touched: set[str] = set()
+        self._lock = threading.Lock()
+
+    def upsert(
+        self,
+        domain: Domain,
+        source_type: SourceType,
+        chunk_id: int,
+        embedding: list[float],
+    ) -> None:
+        self.bulk_upsert(domain=domain, source_type=source_type, chunk_ids=[chunk_id], embeddings=[embedding])
+
+    def bulk_upsert(
+        self,
+        domain: Domain,
+        source_type: SourceType,
+        chunk_ids: list[int],
+        embeddings: list[list[float]],
+    ) -> None:
+        if len(chunk_ids) != len(embeddings):
+            raise ValueError("chunk_ids and embeddings must have the same length")
+
+        name = self._repo._collection_name(domain)
+        with self._lock:
+            upserts, deletes = self._upserts[name], self._deletes[name]
+            for chunk_id, embedding in zip(chunk_ids, embeddings):
+                deletes.discard(chunk_id)
+                upserts[chunk_id] = (domain, source_type, embedding)
+            self._buffered += len(chunk_ids)
+            full = self._buffered >= self._flush_rows
+
+        if full:
+            self.write()
+
+    def delete(self, domain: Domain, chunk_id: int) -> None:
+        self.bulk_delete(domain=domain, chunk_ids=[chunk_id])
+
+    def bulk_delete(self, domain: Domain, chunk_ids: list[int]) -> None:
+        name = self._repo._collection_name(domain)
+        with self._lock:
+            upserts, deletes = self._upserts[name], self._deletes[name]
+            for chunk_id in chunk_ids:
+                upserts.pop(chunk_id, None)
+                deletes.add(chunk_id)
+            self._buffered += len(chunk_ids)
+            full = self._buffered >= self._flush_rows
+
+        if full:
+            self.write()
+
+    def write(self) -> None:
+        """버퍼를 Milvus 로 전송 (segment flush 는 하지 않음)"""
+        with self._lock:
+            upserts, self._upserts = self._upserts, defaultdict(dict)
+            deletes, self._deletes = self._deletes, defaultdict(set)
+            self._buffered = 0
+
+        for name, chunk_ids in deletes.items():
+            if not chunk_ids:
+                continue
+            col = self._repo._collections.get(name)
+            for batch in batched(sorted(chunk_ids), self._WRITE_BATCH_ROWS):
+                col.delete(expr=f"chunk_id in {self._repo._ids_expr(list(batch))}")
+            self._touched.add(name)
+
+        for name, rows in upserts.items():
+            if not rows:
+                continue
+            col = self._repo._collections.get(name)
+
+            groups: dict[tuple[Domain, SourceType], list[tuple[int, list[float]]]] = defaultdict(list)
+            for chunk_id, (domain, source_type, embedding) in rows.items():
+                groups[(domain, source_type)].append((chunk_id, embedding))
+
+            for (domain, source_type), items in groups.items():
+                for batch in batched(items, self._WRITE_BATCH_ROWS):
+                    chunk_ids = [chunk_id for chunk_id, _ in batch]
+                    embeddings = [embedding for _, embedding in batch]
+                    col.upsert(self._repo._columns(domain, source_type, chunk_ids, embeddings))
+            self._touched.add(name)
+
+    def flush(self) -> None:
+        self.write()
+        for name in sorted(self._touched):
+            self._repo._collections.get(name).flush()
+        self._touched.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class AsyncMilvusRepositoryImpl(AsyncVectorStoreRepository):
+    """
+    ask_async 경로용 Milvus 검색 (AsyncMilvusClient).
+    클라이언트는 실행 중인 이벤트 루프에 묶이므로 첫 호출 시점에 생성한다.
+    """
+
+    collection_map = MilvusRepositoryImpl.collection_map
+
+    _BUILD_PARAM_KEYS = ("nlist", "M", "efConstruction")
+
+    def __init__(self, layout: str | None = None) -> None:
+        self.layout = layout or settings.MILVUS_LAYOUT
+        self._client: AsyncMilvusClient | None = None
+        self._loaded: set[str] = set()
+        self._plans: dict[str, IndexPlan] = {}
+
+    def _get_client(self) -> AsyncMilvusClient:
+        if self._client is None:
+            # init_milvus(sync 연결)와 같은 접속 정보를 사용
+            self._client = AsyncMilvusClient(
+                uri=f"http://{settings.MILVUS_HOST}:{settings.MILVUS_PORT}",
+                user=settings.MILVUS_USER,
+                password=settings.MILVUS_PASSWORD,
+                db_name=settings.MILVUS_DB_NAME,
+            )
+        return self._client
+
+    async def _ensure_loaded(self, name: str) -> None:
+        """init_milvus 는 load 하지 않으므로 첫 검색 시 load 상태를 한 번 확인"""
+        if name in self._loaded:
+            return
+
+        client = self._get_client()
+        state = await client.get_load_state(collection_name=name)
+        if state["state"] != LoadState.Loaded:
+            await client.load_collection(collection_name=name)
+        self._plans[name] = await self._describe_plan(name)
+        self._loaded.add(name)
+
+    async def _describe_plan(self, name: str) -> IndexPlan:
+        client = self._get_client()
+        stats = await client.get_collection_stats(collection_name=name)
+        row_count = int(stats.get("row_count", 0))
+
+        for index_name in await client.list_indexes(collection_name=name, field_name="embedding"):
+            index = await client.describe_index(collection_name=name, index_name=index_name)
+            build_params = {k: index[k] for k in self._BUILD_PARAM_KEYS if k in index}
+            return plan_for_index(index.get("index_type", "FLAT"), build_params, row_count)
+
+        return plan_for_index("FLAT", {}, row_count)
+
+    async def search(
+        self,
+        domain: Domain,
+        embedding: list[float],
+        top_k: int,
+        filter_expr: str | None = None,
+    ) -> list[tuple[int, float]]:
+        if self.layout == "partitioned":
+            name = PARTITIONED_COLLECTION
+            filter_expr = MilvusRepositoryImpl._domain_expr([domain], filter_expr)
+        else:
+            name = self.collection_map[domain]
+
+        for attempt in range(2):
+            await self._ensure_loaded(name)
+            params, consistency_level = search_request(self._plans[name], top_k)
+            try:
+                results = await self._get_client().search(
+                    collection_name=name,
+                    data=[embedding],
+                    anns_field="embedding",
+                    search_params=params,
+                    limit=top_k,
+                    filter=filter_expr or "",
+                    output_fields=["source_type", "updated_at"],
+                    consistency_level=consistency_level,
+                )
+                break
+            except MilvusException as e:
+                # 다른 프로세스가 release 한 컬렉션: load 상태를 다시 확인하고 한 번만 재시도
+                if attempt or not is_not_loaded_error(e):
+                    raise
+                logger.info("milvus collection %s is not loaded; reloading", name)
+                self._loaded.discard(name)
 
         out: list[tuple[int, float]] = []
         for hit in results[0]:
-            chunk_id = self._hit_pk(hit)
-            score = float(hit.score)
-            out.append((chunk_id, score))
+            out.append((int(hit["id"]), float(hit["distance"])))
         return out
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._loaded.clear()
+            self._plans.clear()
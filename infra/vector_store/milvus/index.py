@@ -0,0 +1,98 @@
+import math
+from dataclasses import dataclass, field
+
+from config import settings
+
+# 행 수 구간별 인덱스 선택 기준
+FLAT_MAX_ROWS = 20_000
+IVF_FLAT_MAX_ROWS = 500_000
+HNSW_MAX_ROWS = 5_000_000
+
+METRIC_TYPE = "COSINE"
+
+
+@dataclass(frozen=True, slots=True)
+class IndexPlan:
+    index_type: str
+    build_params: dict = field(default_factory=dict)
+    search_params: dict = field(default_factory=dict)
+    consistency_level: str = "Bounded"
+
+    @property
+    def index_params(self) -> dict:
+        return {"index_type": self.index_type, "metric_type": METRIC_TYPE, "params": dict(self.build_params)}
+
+    def matches(self, index_type: str, build_params: dict) -> bool:
+        """같은 인덱스 타입이고 수치 파라미터가 2배 이내면 재구성 불필요로 본다"""
+        if self.index_type != index_type:
+            return False
+
+        for key, advised in self.build_params.items():
+            current = int(build_params.get(key, 0))
+            if not advised / 2 <= current <= advised * 2:
+                return False
+        return True
+
+
+def _nlist(row_count: int) -> int:
+    # 권장치: 4 * sqrt(n)
+    return max(128, min(65_536, int(4 * math.sqrt(max(row_count, 1)))))
+
+
+def _ivf_search_params(nlist: int) -> dict:
+    return {"nprobe": min(nlist, max(16, nlist // 32))}
+
+
+def _consistency_level(row_count: int) -> str:
+    # 작은 컬렉션은 Strong 비용이 작고, 적재 직후 질의도 바로 보이게 한다
+    return "Strong" if row_count < FLAT_MAX_ROWS else "Bounded"
+
+
+def advise_index(row_count: int) -> IndexPlan:
+    """
+    컬렉션 행 수 기준 인덱스 추천.
+    - ~2만: FLAT (정확 검색, 빌드 비용 없음)
+    - ~50만: IVF_FLAT
+    - ~500만: HNSW (메모리 여유가 있는 구간에서 지연/리콜 우선)
+    - 그 이상: IVF_SQ8 (벡터 양자화로 메모리 1/4)
+    """
+    consistency_level = _consistency_level(row_count)
+
+    if row_count < FLAT_MAX_ROWS:
+        return IndexPlan("FLAT", {}, {}, consistency_level)
+
+    if row_count < IVF_FLAT_MAX_ROWS:
+        nlist = _nlist(row_count)
+        return IndexPlan("IVF_FLAT", {"nlist": nlist}, _ivf_search_params(nlist), consistency_level)
+
+    if row_count < HNSW_MAX_ROWS:
+        m = 16 if row_count < 1_000_000 else 32
+        return IndexPlan("HNSW", {"M": m, "efConstruction": 200}, {"ef": 64}, consistency_level)
+
+    nlist = _nlist(row_count)
+    return IndexPlan("IVF_SQ8", {"nlist": nlist}, _ivf_search_params(nlist), consistency_level)
+
+
+def plan_for_index(index_type: str, build_params: dict, row_count: int) -> IndexPlan:
+    """이미 만들어진 인덱스에 맞는 검색 파라미터 구성"""
+    if index_type.startswith("IVF"):
+        search_params = _ivf_search_params(int(build_params.get("nlist", 1024)))
+    elif index_type == "HNSW":
+        search_params = {"ef": 64}
+    else:
+        search_params = {}
+    return IndexPlan(index_type, dict(build_params), search_params, _consistency_level(row_count))
+
+
+def search_request(plan: IndexPlan, top_k: int) -> tuple[dict, str]:
+    """
+    (search param, consistency level).
+    MILVUS_SEARCH_PARAMS / MILVUS_CONSISTENCY_LEVEL 설정이 있으면 추천값보다 우선한다.
+    """
+    params = {**plan.search_params, **settings.MILVUS_SEARCH_PARAMS}
+    if plan.index_type == "HNSW":
+        # HNSW 는 ef >= top_k 여야 함
+        params["ef"] = max(int(params.get("ef", 64)), top_k)
+
+    consistency_level = settings.MILVUS_CONSISTENCY_LEVEL or plan.consistency_level
+    return {"metric_type": METRIC_TYPE, "params": params}, consistency_level
@@ -0,0 +1,4 @@
+import os
+
+# config.Settings 는 DATABASE_URL 이 필수라 import 전에 채워 둔다 (테스트는 DB 에 접속하지 않음)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
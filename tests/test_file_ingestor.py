@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from app.enums import Domain
+from app.utils import compute_content_hash
+from infra.ingestor.file import FileIngestor
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    rng = random.Random(0)
+    path = tmp_path / "big.md"
+    with path.open("w", newline="") as f:
+        for i in range(3000):
+            r = rng.random()
+            if r < 0.03:
+                f.write(f"# Section {i}\r\n")
+            elif r < 0.95:
+                f.write(f"  line {i} \t with   text {'x' * rng.randint(0, 200)}\n")
+            else:
+                f.write("\n")
+    return path
+
+
+def _ingestor(path, stream_threshold: int) -> FileIngestor:
+    # _READ_BUFFER 보다 작은 블록으로 읽어서 블록 경계에 걸친 줄/개행도 확인
+    ingestor = FileIngestor(
+        domain=Domain.CS,
+        source_id=str(path),
+        title=None,
+        content=None,
+        stream_threshold=stream_threshold,
+    )
+    ingestor._READ_BUFFER = 4096
+    return ingestor
+
+
+def test_streamed_document_matches_full_read(big_file):
+    full = _ingestor(big_file, stream_threshold=10**12)
+    full_doc = full.build_document()
+
+    streamed = _ingestor(big_file, stream_threshold=0)
+    doc = streamed.build_document()
+
+    assert doc.raw_content == ""
+    assert doc.streamed.content_hash == compute_content_hash(full_doc.raw_content)
+
+    chunks = streamed.get_chunks(doc)
+    # 큰 파일의 청크는 미리 만들어 두지 않고 순회하면서 읽는다
+    assert not isinstance(chunks, list)
+    assert list(chunks) == list(full.get_chunks(full_doc))
+
+
+def test_streamed_chunks_fail_when_file_changed(big_file):
+    ingestor = _ingestor(big_file, stream_threshold=0)
+    doc = ingestor.build_document()
+
+    with big_file.open("a") as f:
+        f.write("appended\n")
+
+    with pytest.raises(RuntimeError, match="File changed"):
+        list(ingestor.get_chunks(doc))
+
+
+def test_streamed_chunks_do_not_depend_on_build_document_instance(big_file):
+    # 프로세스 풀에서는 build_document 와 get_chunks 가 서로 다른 인스턴스에서 호출된다
+    doc = _ingestor(big_file, stream_threshold=0).build_document()
+    full = _ingestor(big_file, stream_threshold=10**12)
+
+    chunks = list(_ingestor(big_file, stream_threshold=0).get_chunks(doc))
+
+    assert chunks == list(full.get_chunks(full.build_document()))
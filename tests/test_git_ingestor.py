@@ -0,0 +1,54 @@
+import subprocess
+
+import pytest
+
+from app.enums import Domain
+from infra.git.client import GitRepo
+from infra.ingestor.git import GitIngestor
+
+
+@pytest.fixture
+def repo(tmp_path):
+    def git(*args: str) -> None:
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / "utf8.md").write_text("# 제목\n본문\n", encoding="utf-8")
+    (tmp_path / "latin1.md").write_bytes("# café\nnaïve\n".encode("latin-1"))
+    # git 의 바이너리 판별(앞 8000 바이트의 NUL) 에 걸리지 않는 NUL
+    (tmp_path / "nul.md").write_bytes(b"# head\n" + b"a" * 9000 + b"\0tail\n")
+    git("add", "-A")
+    git("-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", "init")
+
+    repo = GitRepo(tmp_path)
+    yield repo
+    repo.close()
+
+
+def _build(repo: GitRepo, path: str):
+    ingestor = GitIngestor(
+        domain=Domain.DEV,
+        source_id=GitIngestor.file_source_id("repo", path),
+        title=None,
+        content=None,
+        repo=repo,
+    )
+    return ingestor.build_document()
+
+
+def test_utf8_file_is_read_as_is(repo):
+    doc = _build(repo, "utf8.md")
+
+    assert doc.raw_content == "# 제목\n본문\n"
+    assert doc.title == "utf8.md"
+    assert doc.source_version == repo.read_blob("HEAD", "utf8.md")[0]
+
+
+def test_non_utf8_and_nul_files_do_not_fail(repo):
+    assert [c.binary for c in repo.changes(None, repo.resolve())] == [False, False, False]
+
+    assert _build(repo, "latin1.md").raw_content == "# caf�\nna�ve\n"
+
+    content = _build(repo, "nul.md").raw_content
+    assert "\0" not in content
+    assert content.endswith("atail\n")
@@ -0,0 +1,146 @@
+import itertools
+from dataclasses import replace
+
+import pytest
+
+from app.enums import Domain, SourceType
+from app.models.base import Chunk, Document
+from app.repositories.llm import Embedder
+from app.services import IngestService
+from app.utils import compute_content_hash
+
+
+class _Embedder(Embedder):
+    dim = 2
+
+    def __init__(self):
+        self.batches: list[int] = []
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0]
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(len(texts))
+        return [self.embed_query(text) for text in texts]
+
+
+class _ChunkRepo:
+    def __init__(self):
+        self.rows: dict[int, Chunk] = {}
+        self.created_batches: list[int] = []
+        self._ids = itertools.count(1)
+
+    def bulk_create(self, document_id: int, chunks: list[Chunk]) -> list[Chunk]:
+        self.created_batches.append(len(chunks))
+        created = [
+            replace(c, id=next(self._ids), document_id=document_id, chunk_hash=compute_content_hash(c.chunk_text))
+            for c in chunks
+        ]
+        self.rows.update((c.id, c) for c in created)
+        return created
+
+    def list_keys_by_document(self, document_id: int, after_id: int = 0, limit: int = 500) -> list[Chunk]:
+        rows = sorted(
+            (c for c in self.rows.values() if c.document_id == document_id and c.id > after_id), key=lambda c: c.id
+        )
+        return [replace(c, chunk_text="") for c in rows[:limit]]
+
+    def update_positions(self, document_id: int, chunks: list[Chunk]) -> None:
+        for c in chunks:
+            self.rows[c.id] = replace(self.rows[c.id], context_id=c.context_id, chunk_index=c.chunk_index)
+
+    def delete_by_ids(self, document_id: int, chunk_ids: list[int]) -> None:
+        for chunk_id in chunk_ids:
+            self.rows.pop(chunk_id, None)
+
+
+class _VectorStore:
+    def __init__(self):
+        self.vectors: dict[int, list[float]] = {}
+
+    def bulk_upsert(self, domain, source_type, chunk_ids, embeddings) -> None:
+        assert len(chunk_ids) == len(embeddings)
+        self.vectors.update(zip(chunk_ids, embeddings))
+
+    def bulk_delete(self, domain, chunk_ids) -> None:
+        for chunk_id in chunk_ids:
+            self.vectors.pop(chunk_id, None)
+
+
+class _Ingestor:
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.consumed = 0
+
+    def get_chunks(self, doc: Document):
+        for idx, text in enumerate(self.texts):
+            self.consumed += 1
+            yield Chunk(chunk_index=idx, chunk_text=text, context_id=0)
+
+
+@pytest.fixture
+def service():
+    return IngestService(
+        chunk_repo=_ChunkRepo(),
+        document_repo=None,
+        query_log_repo=None,
+        vector_store_repo=_VectorStore(),
+        embedder=_Embedder(),
+    )
+
+
+def _sync(service: IngestService, ingestor: _Ingestor) -> dict:
+    doc = Document(domain=Domain.CS, source_type=SourceType.FILE, source_id="f", title=None, raw_content="")
+    return service._sync_chunks(ingestor, doc, 1, service.vector_store_repo)
+
+
+def test_added_chunks_are_embedded_and_written_in_batches(service, monkeypatch):
+    monkeypatch.setattr(IngestService, "_WRITE_BATCH_ROWS", 4)
+
+    result = _sync(service, _Ingestor([f"text {i}" for i in range(10)]))
+
+    assert result["chunks"] == 10
+    assert service.chunk_repo.created_batches == [4, 4, 2]
+    assert service.embedder.batches == [4, 4, 2]
+    assert sorted(service.vector_store_repo.vectors) == sorted(service.chunk_repo.rows)
+
+
+def test_batched_sync_keeps_moves_and_removes_chunks(service, monkeypatch):
+    monkeypatch.setattr(IngestService, "_WRITE_BATCH_ROWS", 3)
+    _sync(service, _Ingestor([f"text {i}" for i in range(8)]))
+    before = {c.chunk_text: c.id for c in service.chunk_repo.rows.values()}
+    service.chunk_repo.created_batches.clear()
+
+    texts = ["new 0", *(f"text {i}" for i in range(0, 8, 2)), "new 1"]
+    result = _sync(service, _Ingestor(texts))
+
+    assert (result["chunks"], result["kept"], result["deleted"]) == (2, 4, 4)
+    assert service.chunk_repo.created_batches == [2]
+
+    rows = sorted(service.chunk_repo.rows.values(), key=lambda c: c.chunk_index)
+    assert [c.chunk_text for c in rows] == texts
+    # 그대로인 텍스트는 id(=벡터)를 유지
+    assert all(before[c.chunk_text] == c.id for c in rows if c.chunk_text.startswith("text"))
+    assert sorted(service.vector_store_repo.vectors) == sorted(service.chunk_repo.rows)
+
+
+def test_failed_batch_keeps_written_batches_and_stops_reading(service, monkeypatch):
+    monkeypatch.setattr(IngestService, "_WRITE_BATCH_ROWS", 2)
+    embed_batch = service.embedder._embed_batch
+
+    def fail_third(texts):
+        if len(service.embedder.batches) == 2:
+            raise RuntimeError("embedding failed")
+        return embed_batch(texts)
+
+    monkeypatch.setattr(service.embedder, "_embed_batch", fail_third)
+    monkeypatch.setattr(service.embedder, "_batch_policy", replace(service.embedder._batch_policy, retries=0))
+    ingestor = _Ingestor([f"text {i}" for i in range(10)])
+
+    with pytest.raises(RuntimeError, match="embedding failed"):
+        _sync(service, ingestor)
+
+    # 앞 배치는 벡터와 함께 저장되고, 실패한 배치 이후의 청크는 읽지 않음
+    assert service.chunk_repo.created_batches == [2, 2]
+    assert sorted(service.vector_store_repo.vectors) == sorted(service.chunk_repo.rows)
+    assert ingestor.consumed == 6
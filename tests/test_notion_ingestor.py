@@ -0,0 +1,148 @@
+import random
+import time
+
+import pytest
+from notion_client.errors import APIResponseError
+
+from app.enums import Domain
+from infra.ingestor.notion import NotionIngestor
+from infra.notion.client import NotionClient
+from infra.notion.fake import FakeNotionSDK
+
+PAGE_ID = "page"
+
+
+def _random_tree(seed: int, max_depth: int = 4) -> list[dict]:
+    rng = random.Random(seed)
+    counter = 0
+
+    def build(depth: int) -> list[dict]:
+        nonlocal counter
+        nodes = []
+        for _ in range(rng.randint(1, 6 if depth else 60)):
+            counter += 1
+            node = {
+                "type": rng.choice(["paragraph", "heading_2", "bulleted_list_item", "toggle"]),
+                "text": f"block {counter}",
+            }
+            if depth < max_depth and rng.random() < 0.35:
+                node["children"] = build(depth + 1)
+            nodes.append(node)
+        return nodes
+
+    return build(0)
+
+
+def _dfs_blocks(client: NotionClient, block_id: str) -> list[dict]:
+    """이전 구현과 같은 순차 DFS (블록 바로 뒤에 그 자식들)"""
+    out: list[dict] = []
+    cursor: str | None = None
+    while True:
+        resp = client.list_block_children(block_id, cursor)
+        for block in resp["results"]:
+            out.append(block)
+            if block.get("has_children"):
+                out.extend(_dfs_blocks(client, block["id"]))
+        if not resp.get("has_more"):
+            return out
+        cursor = resp.get("next_cursor")
+
+
+def _ingestor(sdk: FakeNotionSDK, *, max_workers: int = 4, rate_limit: float = 0.0) -> NotionIngestor:
+    client = NotionClient(sdk=sdk, rate_limit=rate_limit, max_retries=5)
+    return NotionIngestor(
+        domain=Domain.CS,
+        source_id=PAGE_ID,
+        title=None,
+        content=None,
+        client=client,
+        max_workers=max_workers,
+    )
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("max_workers", [1, 8])
+def test_bfs_matches_dfs_order(seed, max_workers):
+    # page_size 를 작게 해서 자식 목록 페이지네이션도 함께 확인
+    sdk = FakeNotionSDK.from_tree(PAGE_ID, _random_tree(seed), title="Page", page_size=5)
+    ingestor = _ingestor(sdk, max_workers=max_workers)
+
+    expected = _dfs_blocks(ingestor.client, PAGE_ID)
+    blocks = ingestor._get_blocks_recursive(PAGE_ID)
+
+    assert [b["id"] for b in blocks] == [b["id"] for b in expected]
+
+
+def test_build_document_matches_dfs_text():
+    sdk = FakeNotionSDK.from_tree(PAGE_ID, _random_tree(7), title="Page", page_size=5)
+    ingestor = _ingestor(sdk, max_workers=8)
+
+    doc = ingestor.build_document()
+
+    assert doc.title == "Page"
+    assert doc.source_version == "2026-01-01T00:00:00.000Z"
+    assert doc.raw_content == ingestor.blocks_to_text(_dfs_blocks(ingestor.client, PAGE_ID)).strip()
+
+
+def test_rate_limited_requests_wait_for_retry_after(monkeypatch):
+    blocks = [{"text": f"a{i}", "children": [{"text": f"b{i}"}]} for i in range(10)]
+    sdk = FakeNotionSDK.from_tree(PAGE_ID, blocks, page_size=3, rate_limit_every=4, retry_after=0.05)
+    ingestor = _ingestor(sdk, max_workers=4)
+
+    pauses: list[float] = []
+    pause = ingestor.client._throttle.pause
+
+    def record(seconds: float) -> None:
+        pauses.append(seconds)
+        pause(seconds)
+
+    monkeypatch.setattr(ingestor.client._throttle, "pause", record)
+
+    started = time.monotonic()
+    result = ingestor._get_blocks_recursive(PAGE_ID)
+    elapsed = time.monotonic() - started
+
+    clean = _ingestor(FakeNotionSDK.from_tree(PAGE_ID, blocks, page_size=3))
+    assert [b["id"] for b in result] == [b["id"] for b in clean._get_blocks_recursive(PAGE_ID)]
+    assert sdk.rate_limited > 0
+    assert pauses == [0.05] * sdk.rate_limited
+    assert elapsed >= 0.05
+
+
+def test_rate_limit_gives_up_after_max_retries():
+    sdk = FakeNotionSDK.from_tree(PAGE_ID, [{"text": "a"}], rate_limit_every=1, retry_after=0.0)
+    client = NotionClient(sdk=sdk, rate_limit=0, max_retries=2)
+
+    with pytest.raises(APIResponseError) as exc_info:
+        client.get_page(PAGE_ID)
+
+    assert exc_info.value.status == 429
+    assert sdk.calls == 3
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_concurrent_requests_bounded_by_max_workers(max_workers):
+    # 자식이 있는 블록이 많아서 동시에 조회할 블록이 max_workers 보다 항상 많다
+    blocks = [{"text": f"a{i}", "children": [{"text": f"b{i}-{j}"} for j in range(2)]} for i in range(30)]
+    sdk = FakeNotionSDK.from_tree(PAGE_ID, blocks, latency=0.01)
+    ingestor = _ingestor(sdk, max_workers=max_workers)
+
+    ingestor._get_blocks_recursive(PAGE_ID)
+
+    assert sdk.calls == 31
+    assert sdk.max_in_flight <= max_workers
+    # 실제로 병렬로 조회했는지 (max_workers > 1 인 경우)
+    assert sdk.max_in_flight >= min(max_workers, 2)
+
+
+def test_rate_limit_spaces_requests_across_workers():
+    blocks = [{"text": f"a{i}", "children": [{"text": f"b{i}"}]} for i in range(5)]
+    sdk = FakeNotionSDK.from_tree(PAGE_ID, blocks)
+    ingestor = _ingestor(sdk, max_workers=8, rate_limit=50)
+
+    started = time.monotonic()
+    ingestor._get_blocks_recursive(PAGE_ID)
+    elapsed = time.monotonic() - started
+
+    # 첫 요청 이후 요청마다 1/50 초 간격
+    assert elapsed >= (sdk.calls - 1) / 50
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from app.enums import Domain, SourceType
+from infra.vector_store.local.impl import NumpyRepositoryImpl
+
+
+@pytest.fixture
+def store(tmp_path):
+    repo = NumpyRepositoryImpl(path=str(tmp_path), dim=2, flush_interval=3600)
+    repo.bulk_upsert(Domain.CS, SourceType.FILE, [1, 2], [[1.0, 0.0], [0.9, 0.1]])
+    repo.bulk_upsert(Domain.CS, SourceType.NOTION, [3, 4], [[0.95, 0.05], [0.0, 1.0]])
+    return repo
+
+
+def _ids(hits: list[tuple[int, float]]) -> list[int]:
+    return [chunk_id for chunk_id, _ in hits]
+
+
+def test_source_type_filter(store):
+    query = [1.0, 0.0]
+
+    assert _ids(store.search(Domain.CS, query, top_k=4)) == [1, 3, 2, 4]
+    assert _ids(store.search(Domain.CS, query, top_k=4, filter_expr='source_type == "FILE"')) == [1, 2]
+    assert _ids(store.search(Domain.CS, query, top_k=1, filter_expr="source_type in ['NOTION']")) == [3]
+    assert _ids(store.search(Domain.CS, query, top_k=4, filter_expr='source_type in ["SLACK", "NOTION"]')) == [3, 4]
+    assert store.search(Domain.CS, query, top_k=4, filter_expr='source_type == "UNKNOWN"') == []
+
+
+def test_source_type_survives_delete_and_reload(store, tmp_path):
+    # 삭제 시 마지막 행이 빈 자리로 옮겨지므로 source_type 도 함께 옮겨져야 한다
+    store.bulk_delete(Domain.CS, [1])
+    store.flush()
+
+    reloaded = NumpyRepositoryImpl(path=str(tmp_path), dim=2, flush_interval=3600)
+    hits = reloaded.search(Domain.CS, [1.0, 0.0], top_k=4, filter_expr='source_type == "NOTION"')
+    assert _ids(hits) == [3, 4]
+    assert np.isclose(hits[0][1], store.search(Domain.CS, [1.0, 0.0], top_k=1)[0][1])
+
+
+def test_unsupported_filter_expr(store):
+    with pytest.raises(NotImplementedError):
+        store.search(Domain.CS, [1.0, 0.0], top_k=1, filter_expr="updated_at > 0")
@@ -0,0 +1,129 @@
+from app.enums import Domain
+from infra.ingestor.slack import SlackIngestor
+from infra.slack.client import SlackClient
+from infra.slack.fake import FakeWebClient
+
+CHANNEL = "C1"
+
+
+def _ingestor(client: SlackClient, message: dict) -> SlackIngestor:
+    return SlackIngestor(
+        domain=Domain.CS,
+        source_id=SlackIngestor.thread_source_id(CHANNEL, message["ts"]),
+        title=None,
+        content=None,
+        client=client,
+        message=message,
+    )
+
+
+def test_history_is_read_page_by_page():
+    web = FakeWebClient()
+    posted = [web.post(CHANNEL, f"message {i}") for i in range(25)]
+    client = SlackClient(web_client=web)
+
+    pages = client.iter_history_pages(CHANNEL, limit=10)
+    first = next(pages)
+
+    # 첫 페이지만 요청한 상태에서 나머지는 아직 조회하지 않음
+    assert web.calls["conversations_history"] == 1
+    assert [m["ts"] for m in first] == posted[::-1][:10]
+
+    rest = list(pages)
+    assert [len(page) for page in rest] == [10, 5]
+    assert web.calls["conversations_history"] == 3
+    assert web.max_page_size == 10
+
+
+def test_updated_threads_group_replies_under_parent():
+    web = FakeWebClient()
+    root = web.post(CHANNEL, "question")
+    replies = [web.post(CHANNEL, f"answer {i}", thread_ts=root, user="U2") for i in range(3)]
+    single = web.post(CHANNEL, "standalone")
+    web.post(CHANNEL, "joined", subtype="channel_join")
+    client = SlackClient(web_client=web)
+
+    threads = list(client.iter_updated_threads(CHANNEL))
+
+    # 답글은 history 에 따로 나오지 않고, 채널 이벤트 메시지는 제외
+    assert [m["ts"] for m in threads] == [single, root]
+
+    by_ts = {m["ts"]: m for m in threads}
+    doc = _ingestor(client, by_ts[root]).build_document()
+    assert doc.source_id == f"{CHANNEL}:{root}"
+    assert doc.source_version == replies[-1]
+    assert [line.split(": ", 1)[1] for line in doc.raw_content.splitlines()] == [
+        "question",
+        "answer 0",
+        "answer 1",
+        "answer 2",
+    ]
+    assert web.calls["conversations_replies"] == 1
+
+    # 답글 없는 메시지는 conversations_replies 를 호출하지 않음
+    doc = _ingestor(client, by_ts[single]).build_document()
+    assert doc.raw_content.endswith("U0001: standalone")
+    assert doc.source_version == single
+    assert web.calls["conversations_replies"] == 1
+
+
+def test_thread_chunks_use_single_context():
+    web = FakeWebClient()
+    root = web.post(CHANNEL, "# not a heading")
+    web.post(CHANNEL, "# still not a heading", thread_ts=root)
+    client = SlackClient(web_client=web)
+
+    ingestor = _ingestor(client, next(client.iter_updated_threads(CHANNEL)))
+    chunks = ingestor.get_chunks(ingestor.build_document())
+
+    assert len(chunks) == 1
+    assert chunks[0].context_id == 0
+
+
+def test_watermark_skips_unchanged_threads():
+    web = FakeWebClient()
+    for i in range(5):
+        web.post(CHANNEL, f"message {i}")
+    client = SlackClient(web_client=web)
+    watermark = max((client.thread_watermark(m) for m in client.iter_updated_threads(CHANNEL)), key=float)
+
+    assert list(client.iter_updated_threads(CHANNEL, since=watermark, lookback=3600)) == []
+
+    new = web.post(CHANNEL, "new message")
+    assert [m["ts"] for m in client.iter_updated_threads(CHANNEL, since=watermark, lookback=3600)] == [new]
+
+
+def test_lookback_reingests_old_thread_with_new_reply():
+    web = FakeWebClient()
+    old_root = web.post(CHANNEL, "old question")
+    for i in range(9):
+        web.post(CHANNEL, f"message {i}")
+    client = SlackClient(web_client=web)
+    watermark = max((client.thread_watermark(m) for m in client.iter_updated_threads(CHANNEL)), key=float)
+
+    late = web.post(CHANNEL, "late answer", thread_ts=old_root)
+
+    # FakeWebClient 의 ts 는 1초 간격: old_root 는 watermark 보다 9초 앞
+    threads = list(client.iter_updated_threads(CHANNEL, since=watermark, lookback=60))
+    assert [m["ts"] for m in threads] == [old_root]
+    assert client.thread_watermark(threads[0]) == late
+    assert "late answer" in _ingestor(client, threads[0]).build_document().raw_content
+
+    # lookback 밖의 스레드에 달린 답글은 history 조회 범위에 들어오지 않음
+    assert list(client.iter_updated_threads(CHANNEL, since=watermark, lookback=5)) == []
+
+
+def test_thread_broadcast_copies_are_skipped():
+    web = FakeWebClient()
+    root = web.post(CHANNEL, "question")
+    web.post(CHANNEL, "answer", thread_ts=root, reply_broadcast=True)
+    client = SlackClient(web_client=web)
+
+    history = [m for page in client.iter_history_pages(CHANNEL) for m in page]
+    assert [m.get("subtype") for m in history] == ["thread_broadcast", None]
+
+    threads = list(client.iter_updated_threads(CHANNEL))
+    assert [m["ts"] for m in threads] == [root]
+
+    lines = _ingestor(client, threads[0]).build_document().raw_content.splitlines()
+    assert [line.split(": ", 1)[1] for line in lines] == ["question", "answer"]